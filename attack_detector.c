@@ -1,4 +1,5 @@
 #include "attack_detector.h"
+#include "project-conf.h"
 #include <stdio.h>
 #include <string.h>
 
@@ -8,7 +9,7 @@
  */
 void analyze_behavioral_trust(const trust_attack_indicators_t *indicators) {
   // Example: log anomaly if trust variation is high
-  if(indicators->trust_variation > 0.5f) {
+  if(indicators->trust_variation > TRUST_VARIATION_THRESHOLD) {
     printf("[TRUST_ANOMALY] trust_variation=%.2f\n", indicators->trust_variation);
   }
 }
@@ -19,7 +20,7 @@ void analyze_behavioral_trust(const trust_attack_indicators_t *indicators) {
  */
 int detect_attack(const trust_attack_indicators_t *indicators) {
   // Example: simple threshold-based detection
-  if(indicators->ack_ratio < 0.3f) {
+  if(indicators->ack_ratio < ACK_RATIO_THRESHOLD) {
     printf("[ATTACK] Sinkhole detected (ack_ratio=%.2f)\n", indicators->ack_ratio);
     return 1;
   }
@@ -31,7 +32,7 @@ int detect_attack(const trust_attack_indicators_t *indicators) {
  * \brief Report/log detected attack event.
  */
 void report_attack_event(const char *attack_type, float confidence) {
-  if(confidence < 0.5f) {
+  if(confidence < ATTACK_CONFIDENCE_THRESHOLD) {
     printf("[FP] False positive: %s (confidence=%.2f)\n", attack_type, confidence);
   } else {
     printf("[ATTACK] %s detected (confidence=%.2f)\n", attack_type, confidence);
@@ -6,21 +6,34 @@ Collecte des données réelles pour les figures de l'article
 
 import subprocess
 import os
+import sys
+import tempfile
 import time
 import json
 import re
 import argparse
-from typing import Dict, List, Tuple
+from contextlib import nullcontext
+from typing import Dict, List, Optional, Tuple
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from campaign_manifest import CampaignManifest, config_hash
+from metrics_exporter import MetricsExporter, MetricsRegistry, RunMonitor
+from powertracker import DEFAULT_RADIO_MODEL, parse_powertracker
+
 class CoojaSimulationRunner:
     def __init__(self, contiki_path: str = "/home/belacel/contiki-ng"):
         self.contiki_path = contiki_path
         self.project_dir = "/home/belacel/contiki-ng/examples/RPL_AER"
-        self.results_dir = "cooja_results"
+        # Chemin absolu : build_firmware() change le répertoire courant
+        self.results_dir = os.path.abspath("cooja_results")
         self.log_file = "cooja_simulation.log"
+        self.firmware_built = False
+        # Registre des métriques exposées (enable_metrics), None sinon
+        self.metrics: Optional[MetricsRegistry] = None
+        self.monitors: Dict[str, RunMonitor] = {}
 
         # Créer le dossier de résultats
         os.makedirs(self.results_dir, exist_ok=True)
@@ -47,6 +60,7 @@ class CoojaSimulationRunner:
             ], check=True, capture_output=True)
 
             print(" Firmwares compilés avec succès")
+            self.firmware_built = True
             return True
 
         except subprocess.CalledProcessError as e:
@@ -55,7 +69,9 @@ class CoojaSimulationRunner:
 
     def generate_simulation_scenario(self, num_nodes: int = 40,
                                    solar_ratio: float = 0.3,
-                                   mobile_ratio: float = 0.3) -> str:
+                                   mobile_ratio: float = 0.3,
+                                   random_seed: int = 12345,
+                                   output: str = "rpl-aer-simulation-cooja.csc") -> str:
         """Génère un scénario de simulation Cooja"""
         print(f"📋 Génération du scénario: {num_nodes} nœuds...")
 
@@ -65,17 +81,20 @@ class CoojaSimulationRunner:
             "-n", str(num_nodes),
             "-s", str(solar_ratio),
             "-m", str(mobile_ratio),
-            "-o", "rpl-aer-simulation-cooja.csc"
+            "-r", str(random_seed),
+            "-o", output
         ]
 
         try:
             subprocess.run(cmd, check=True, cwd=self.project_dir)
-            return "rpl-aer-simulation-cooja.csc"
+            return output
         except subprocess.CalledProcessError as e:
             return None
 
-    def run_cooja_simulation(self, scenario_file: str, duration: int = 3600) -> bool:
+    def run_cooja_simulation(self, scenario_file: str, duration: int = 3600,
+                             log_path: Optional[str] = None) -> bool:
         """Lance une simulation Cooja"""
+        log_path = log_path or f"{self.results_dir}/{self.log_file}"
         print(f" Lancement de la simulation Cooja...")
         print(f"   Scénario: {scenario_file}")
         print(f"   Durée: {duration} secondes")
@@ -88,25 +107,27 @@ class CoojaSimulationRunner:
         ]
 
         try:
-            # Lancer la simulation
-            process = subprocess.Popen(
-                cmd,
-                cwd=self.project_dir,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-
-            # Attendre la fin de la simulation
-            print("⏳ Simulation en cours...")
-            stdout, stderr = process.communicate(timeout=duration + 300)  # +5 min de marge
-
-            # Sauvegarder les logs
-            with open(f"{self.results_dir}/{self.log_file}", "w") as f:
-                f.write("=== STDOUT ===\n")
-                f.write(stdout)
-                f.write("\n=== STDERR ===\n")
-                f.write(stderr)
+            # Lancer la simulation : stdout est écrit au fil de l'eau dans le
+            # log (suivi en direct), stderr ajouté à la fin
+            with open(log_path, "w") as log, tempfile.TemporaryFile("w+") as errors:
+                log.write("=== STDOUT ===\n")
+                log.flush()
+                process = subprocess.Popen(
+                    cmd,
+                    cwd=self.project_dir,
+                    stdout=log,
+                    stderr=errors,
+                    text=True
+                )
+
+                # Attendre la fin de la simulation
+                print("⏳ Simulation en cours...")
+                process.wait(timeout=duration + 300)  # +5 min de marge
+
+                errors.seek(0)
+                log.seek(0, os.SEEK_END)
+                log.write("\n=== STDERR ===\n")
+                log.write(errors.read())
 
             if process.returncode == 0:
                 print(" Simulation terminée avec succès")
@@ -123,11 +144,11 @@ class CoojaSimulationRunner:
             print(f"❌ Erreur lors de la simulation: {e}")
             return False
 
-    def parse_simulation_logs(self) -> Dict:
+    def parse_simulation_logs(self, log_path: Optional[str] = None) -> Dict:
         """Parse les logs de simulation pour extraire les métriques"""
         print(" Analyse des logs de simulation...")
 
-        log_path = f"{self.results_dir}/{self.log_file}"
+        log_path = log_path or f"{self.results_dir}/{self.log_file}"
         if not os.path.exists(log_path):
             print("❌ Fichier de log non trouvé")
             return {}
@@ -174,16 +195,27 @@ class CoojaSimulationRunner:
                 metrics['throughput'] = [float(x) for x in throughput_matches]
 
             print(f" Métriques extraites: {len(energy_matches)} échantillons")
+
+            # Temps radio PowerTracker (relevés radioStatistics() du log)
+            radio = parse_powertracker(log_path)
+            if radio.mote_ids.size:
+                radio.save(os.path.join(os.path.dirname(log_path), "radio_stats.npz"))
+                metrics['radio_mote_ids'] = radio.mote_ids.tolist()
+                metrics['radio_duty_cycle'] = (np.nanmean(radio.duty_cycle(), axis=0) * 100).tolist()
+                metrics['radio_energy_mj'] = radio.energy_mj(DEFAULT_RADIO_MODEL)["total"].sum(axis=0).tolist()
+                print(f" PowerTracker: {len(radio.mote_ids)} motes, {radio.num_windows} relevés")
             return metrics
 
         except Exception as e:
             print(f"❌ Erreur lors de l'analyse des logs: {e}")
             return {}
 
-    def generate_figures_from_real_data(self, metrics: Dict):
+    def generate_figures_from_real_data(self, metrics: Dict, output_dir: Optional[str] = None):
         """Génère les figures à partir des données réelles de Cooja"""
         print("🎨 Génération des figures à partir des données réelles...")
 
+        output_dir = output_dir or self.results_dir
+
         if not metrics:
             print("❌ Aucune métrique disponible")
             return
@@ -196,7 +228,7 @@ class CoojaSimulationRunner:
             plt.xlabel('Temps (intervalles)')
             plt.ylabel('Consommation (mWh)')
             plt.grid(True, alpha=0.3)
-            plt.savefig(f"{self.results_dir}/real_energy_consumption.png", dpi=300, bbox_inches='tight')
+            plt.savefig(f"{output_dir}/real_energy_consumption.png", dpi=300, bbox_inches='tight')
             plt.close()
 
         # Figure 2: PDR
@@ -207,7 +239,7 @@ class CoojaSimulationRunner:
             plt.xlabel('Temps (intervalles)')
             plt.ylabel('PDR (%)')
             plt.grid(True, alpha=0.3)
-            plt.savefig(f"{self.results_dir}/real_pdr.png", dpi=300, bbox_inches='tight')
+            plt.savefig(f"{output_dir}/real_pdr.png", dpi=300, bbox_inches='tight')
             plt.close()
 
         # Figure 3: Latence
@@ -218,19 +250,38 @@ class CoojaSimulationRunner:
             plt.xlabel('Temps (intervalles)')
             plt.ylabel('Latence (ms)')
             plt.grid(True, alpha=0.3)
-            plt.savefig(f"{self.results_dir}/real_latency.png", dpi=300, bbox_inches='tight')
+            plt.savefig(f"{output_dir}/real_latency.png", dpi=300, bbox_inches='tight')
+            plt.close()
+
+        # Figure 4: Énergie radio par mote (PowerTracker)
+        if metrics.get('radio_energy_mj'):
+            plt.figure(figsize=(10, 6))
+            plt.bar([str(m) for m in metrics['radio_mote_ids']], metrics['radio_energy_mj'], color='orange')
+            plt.title('Énergie Radio par Mote (PowerTracker)')
+            plt.xlabel('Mote')
+            plt.ylabel('Énergie radio (mJ)')
+            plt.grid(True, alpha=0.3, axis='y')
+            plt.savefig(f"{output_dir}/real_radio_energy.png", dpi=300, bbox_inches='tight')
             plt.close()
 
         # Sauvegarder les métriques en JSON
-        with open(f"{self.results_dir}/real_metrics.json", 'w') as f:
+        with open(f"{output_dir}/real_metrics.json", 'w') as f:
             json.dump(metrics, f, indent=2)
         print(" Métriques sauvegardées en JSON")
 
     def run_complete_simulation(self, num_nodes: int = 40,
                                solar_ratio: float = 0.3,
                                mobile_ratio: float = 0.3,
-                               duration: int = 3600) -> bool:
-        """Exécute une simulation complète avec Cooja"""
+                               duration: int = 3600,
+                               random_seed: int = 12345,
+                               manifest: Optional[CampaignManifest] = None) -> bool:
+        """
+        Exécute une simulation complète avec Cooja
+
+        Si un manifeste est fourni, chaque étape terminée y est enregistrée
+        et les étapes déjà terminées lors d'une exécution précédente sont
+        sautées (reprise après interruption).
+        """
         print(" === SIMULATION COOJA RPL-AER ===")
         print(f" Configuration:")
         print(f"   - Nœuds: {num_nodes}")
@@ -239,30 +290,143 @@ class CoojaSimulationRunner:
         print(f"   - Durée: {duration}s")
         print()
 
-        # Étape 1: Compilation
-        if not self.build_firmware():
-            return False
+        config = self.normalize_config({
+            "num_nodes": num_nodes,
+            "solar_ratio": solar_ratio,
+            "mobile_ratio": mobile_ratio,
+            "duration": duration,
+            "random_seed": random_seed
+        })
+        run_id = config_hash(config)
+        monitor = self.monitor(run_id, duration)
+
+        if manifest is None:
+            output_dir = self.results_dir
+            scenario_file = "rpl-aer-simulation-cooja.csc"
+            log_path = f"{self.results_dir}/{self.log_file}"
+        else:
+            output_dir = os.path.join(self.results_dir, "runs", run_id)
+            scenario_file = os.path.join(output_dir, "rpl-aer-simulation.csc")
+            log_path = os.path.join(output_dir, self.log_file)
+            os.makedirs(output_dir, exist_ok=True)
+
+            if manifest.is_done(run_id, "parsed"):
+                print(f" Exécution {run_id} déjà terminée, ignorée")
+                if monitor is not None:
+                    monitor.finish()
+                return True
+            if manifest.state(run_id):
+                print(f" Reprise de l'exécution {run_id} après l'étape '{manifest.state(run_id)}'")
 
-        # Étape 2: Génération du scénario
-        scenario_file = self.generate_simulation_scenario(num_nodes, solar_ratio, mobile_ratio)
-        if not scenario_file:
-            return False
+        def done(stage: str) -> bool:
+            return manifest is not None and manifest.is_done(run_id, stage)
 
-        # Étape 3: Simulation
-        if not self.run_cooja_simulation(scenario_file, duration):
+        def record(stage: str, outputs: Dict[str, str]):
+            if manifest is not None:
+                manifest.record(run_id, stage, config, outputs)
+
+        def stage(name: str):
+            return monitor.stage(name) if monitor is not None else nullcontext()
+
+        def fail() -> bool:
+            if monitor is not None:
+                monitor.finish(success=False)
             return False
 
+        if monitor is not None:
+            monitor.start()
+
+        # Étape 1: Compilation (une seule fois par processus)
+        if not done("built"):
+            with stage("build"):
+                if not self.firmware_built and not self.build_firmware():
+                    return fail()
+            record("built", {"project_dir": self.project_dir})
+
+        # Étapes 2 et 3: Génération du scénario et simulation
+        if not done("simulated") or not os.path.exists(log_path):
+            with stage("scenario"):
+                scenario_file = self.generate_simulation_scenario(num_nodes, solar_ratio, mobile_ratio,
+                                                                  random_seed, scenario_file)
+            if not scenario_file:
+                return fail()
+
+            if monitor is not None:
+                monitor.follow(log_path)
+            with stage("simulate"):
+                if not self.run_cooja_simulation(scenario_file, duration, log_path):
+                    return fail()
+            record("simulated", {"scenario": scenario_file, "log": log_path})
+
         # Étape 4: Analyse des résultats
-        metrics = self.parse_simulation_logs()
+        with stage("parse"):
+            metrics = self.parse_simulation_logs(log_path)
 
         # Étape 5: Génération des figures
-        self.generate_figures_from_real_data(metrics)
+        with stage("figures"):
+            self.generate_figures_from_real_data(metrics, output_dir)
+        record("parsed", {"metrics": os.path.join(output_dir, "real_metrics.json")})
+        if monitor is not None:
+            monitor.finish()
 
         print(" Simulation Cooja terminée avec succès!")
-        print(f" Résultats dans: {self.results_dir}/")
+        print(f" Résultats dans: {output_dir}/")
 
         return True
 
+    def enable_metrics(self, port: int) -> MetricsExporter:
+        """Expose les métriques de la campagne sur http://127.0.0.1:port/metrics"""
+        self.metrics = MetricsRegistry()
+        return MetricsExporter(self.metrics, port).start()
+
+    def monitor(self, run_id: str, duration: Optional[float] = None) -> Optional[RunMonitor]:
+        """Suivi d'une exécution (None si les métriques ne sont pas exposées)"""
+        if self.metrics is None:
+            return None
+        if run_id not in self.monitors:
+            self.monitors[run_id] = RunMonitor(self.metrics, run_id, duration)
+        return self.monitors[run_id]
+
+    @staticmethod
+    def normalize_config(config: Dict) -> Dict:
+        """Complète une configuration avec les valeurs par défaut (empreinte stable)"""
+        normalized = {
+            "num_nodes": 40,
+            "solar_ratio": 0.3,
+            "mobile_ratio": 0.3,
+            "duration": 3600,
+            "random_seed": 12345
+        }
+        normalized.update(config)
+        return normalized
+
+    def run_campaign(self, configs: List[Dict], manifest_path: str) -> bool:
+        """
+        Exécute une campagne de simulations reprenable
+
+        Args:
+            configs: Liste de configurations (arguments de run_complete_simulation)
+            manifest_path: Fichier manifeste de la campagne
+        """
+        manifest = CampaignManifest(manifest_path)
+        configs = [self.normalize_config(c) for c in configs]
+        pending = manifest.pending(configs)
+        for config in pending:
+            self.monitor(config_hash(config), config["duration"])
+
+        print(f" === CAMPAGNE COOJA RPL-AER: {len(configs)} exécutions ===")
+        print(f"   - Déjà terminées: {len(configs) - len(pending)}")
+        print(f"   - Restantes: {len(pending)}")
+
+        failures = 0
+        for i, config in enumerate(pending, 1):
+            print(f"\n[{i}/{len(pending)}] Exécution {config_hash(config)}")
+            if not self.run_complete_simulation(manifest=manifest, **config):
+                failures += 1
+
+        print(f"\n Campagne terminée: {manifest.summary()}")
+        return failures == 0
+
 def main():
     parser = argparse.ArgumentParser(description="Runner de simulation Cooja pour RPL-AER")
     parser.add_argument("-n", "--nodes", type=int, default=40,
@@ -273,20 +437,36 @@ def main():
                        help="Ratio de nœuds mobiles (défaut: 0.3)")
     parser.add_argument("-d", "--duration", type=int, default=3600,
                        help="Durée de simulation en secondes (défaut: 3600)")
+    parser.add_argument("-r", "--random-seed", type=int, default=12345,
+                       help="Seed aléatoire du scénario (défaut: 12345)")
     parser.add_argument("-c", "--contiki-path", type=str,
                        default="/home/belacel/contiki-ng",
                        help="Chemin vers Contiki-NG")
+    parser.add_argument("--campaign", type=str, default=None,
+                       help="Fichier JSON listant les configurations d'une campagne")
+    parser.add_argument("--manifest", type=str, default="cooja_results/campaign_manifest.jsonl",
+                       help="Manifeste de reprise de la campagne (défaut: cooja_results/campaign_manifest.jsonl)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                       help="Exposer les métriques Prometheus sur 127.0.0.1:PORT (défaut: désactivé)")
 
     args = parser.parse_args()
 
     # Créer et exécuter le runner
     runner = CoojaSimulationRunner(args.contiki_path)
-    success = runner.run_complete_simulation(
-        num_nodes=args.nodes,
-        solar_ratio=args.solar,
-        mobile_ratio=args.mobile,
-        duration=args.duration
-    )
+    if args.metrics_port is not None:
+        runner.enable_metrics(args.metrics_port)
+    if args.campaign:
+        with open(args.campaign, "r") as f:
+            configs = json.load(f)
+        success = runner.run_campaign(configs, args.manifest)
+    else:
+        success = runner.run_complete_simulation(
+            num_nodes=args.nodes,
+            solar_ratio=args.solar,
+            mobile_ratio=args.mobile,
+            duration=args.duration,
+            random_seed=args.random_seed
+        )
 
     if success:
         print("\n Simulation Cooja réussie!")
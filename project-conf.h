@@ -124,5 +124,9 @@
 #define ATTACK_DETECTOR_ENABLED  1        // Enable attack detection
 #define ATTACK_CONFIDENCE_THRESHOLD 0.5f  // Confidence threshold for reporting attacks
 #define ATTACK_LOG_ENABLED       1        // Enable [ATTACK], [FP], [TRUST_ANOMALY] logs
+#define ACK_RATIO_THRESHOLD      0.3f     // Sinkhole suspected below this ACK ratio
+#define FORWARDING_RATIO_THRESHOLD 0.8f   // Trust anomaly below this forwarding ratio
+#define RANK_CONSISTENCY_THRESHOLD 0.9f   // Trust anomaly below this rank consistency
+#define TRUST_VARIATION_THRESHOLD 0.5f    // [TRUST_ANOMALY] above this trust variation
 
 #endif /* PROJECT_CONF_H_ */
\ No newline at end of file
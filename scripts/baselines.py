@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Comparaison de RPL-AER aux fonctions objectif de référence
+RPL-ETX (MRHOF), RPL-Energy et RPL-Security émulés en une seule passe sur
+le même réseau, avec des nombres aléatoires communs (topologie, irradiance,
+tirages d'attaques et bruit des indicateurs partagés)
+"""
+
+import argparse
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from firmware_emulator import FirmwareEmulator, summarize
+
+# Protocole -> fonction objectif de l'émulateur (poids MCS de project-conf.h)
+PROTOCOLS = {
+    "RPL-AER": "mcs",
+    "RPL-ETX": "etx",
+    "RPL-Energy": "energy",
+    "RPL-Security": "security",
+}
+
+# Colonnes du tableau comparatif -> (résultat de l'émulateur, facteur d'échelle)
+TABLE_COLUMNS = {
+    "PDR (%)": ("pdr", 100.0),
+    "Latence (ms)": ("latency_ms", 1.0),
+    "Throughput (pkt/min)": ("throughput", 1.0),
+    "Durée de vie (min)": ("network_lifetime", 1.0 / 60.0),
+    "Consommation (mWh/pkt)": ("energy_per_packet", 1.0),
+    "F1-Score (%)": ("f1", 100.0),
+}
+
+
+def compare_protocols(emulator: FirmwareEmulator, protocols: Optional[Dict[str, str]] = None,
+                      traces: Optional[Dict[str, np.ndarray]] = None) -> pd.DataFrame:
+    """
+    Émule tous les protocoles dans un même appel à run()
+
+    Chaque protocole occupe une ligne de l'axe des lots : les traces de
+    prepare() et les tirages par période sont générés une seule fois, les
+    écarts entre lignes ne viennent donc que du choix des parents.
+
+    Args:
+        emulator: Émulateur du scénario commun
+        protocols: Nom du protocole -> fonction objectif (PROTOCOLS par défaut)
+        traces: Résultat de emulator.prepare() (recalculé si absent)
+
+    Returns:
+        Tableau comparatif, une ligne par protocole (colonnes de TABLE_COLUMNS)
+    """
+    protocols = protocols or PROTOCOLS
+    results = emulator.run(traces=traces, objectives=tuple(protocols.values()))
+    rows = [summarize(results, i) for i in range(len(protocols))]
+    data = {column: [row[key] * scale for row in rows] for column, (key, scale) in TABLE_COLUMNS.items()}
+    return pd.DataFrame(data, index=list(protocols))
+
+
+def improvement(table: pd.DataFrame, column: str, reference: str = "RPL-ETX",
+                protocol: str = "RPL-AER", lower_is_better: bool = False) -> float:
+    """Gain relatif (%) de protocol sur reference pour une colonne du tableau"""
+    ours, theirs = table.loc[protocol, column], table.loc[reference, column]
+    if theirs == 0:
+        return float("nan")
+    gain = (theirs - ours) if lower_is_better else (ours - theirs)
+    return gain / abs(theirs) * 100.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comparaison de RPL-AER aux protocoles RPL de référence")
+    parser.add_argument("-n", "--nodes", type=int, default=39,
+                       help="Nombre de nœuds clients (défaut: 39)")
+    parser.add_argument("-d", "--duration", type=int, default=3600,
+                       help="Durée émulée en secondes (défaut: 3600)")
+    parser.add_argument("-s", "--seed", type=int, default=12345,
+                       help="Graine aléatoire (défaut: 12345)")
+    parser.add_argument("-o", "--output", type=str, default=None,
+                       help="Fichier CSV du tableau comparatif (défaut: aucun)")
+    args = parser.parse_args()
+
+    emulator = FirmwareEmulator(num_clients=args.nodes, simulation_duration=args.duration,
+                                random_seed=args.seed)
+    table = compare_protocols(emulator)
+    print(table.round(3).to_string())
+    if args.output:
+        table.to_csv(args.output)
+
+
+if __name__ == "__main__":
+    main()
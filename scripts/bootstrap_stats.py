@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Intervalles de confiance bootstrap pour la comparaison RPL-AER / RPL
+Rééchantillonnage par matrices d'indices (NumPy), réparti sur un pool
+de processus pour les grands nombres de réplications
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from datasets import load_dataset
+
+# Nombre de réplications traitées par bloc (borne la mémoire à G × bloc × n)
+REPLICATE_BLOCK = 2000
+
+
+def _bootstrap_means(samples: np.ndarray, replicates: int, seed) -> np.ndarray:
+    """
+    Moyennes bootstrap de G groupes de même taille n
+
+    Une seule matrice d'indices (réplications × n) est tirée par bloc et
+    appliquée à tous les groupes à la fois.
+
+    Returns:
+        Tableau (G, réplications)
+    """
+    rng = np.random.default_rng(seed)
+    num_groups, n = samples.shape
+    means = np.empty((num_groups, replicates))
+    for start in range(0, replicates, REPLICATE_BLOCK):
+        stop = min(start + REPLICATE_BLOCK, replicates)
+        idx = rng.integers(0, n, size=(stop - start, n))
+        means[:, start:stop] = samples[:, idx].mean(axis=2)
+    return means
+
+
+def bootstrap_means(samples: np.ndarray, replicates: int = 10000, seed: int = 12345,
+                    workers: Optional[int] = None) -> np.ndarray:
+    """
+    Moyennes bootstrap, réparties sur un pool de processus si workers > 1
+
+    Chaque processus reçoit une graine indépendante (SeedSequence.spawn)
+    et une part des réplications.
+    """
+    samples = np.asarray(samples, dtype=np.float64)
+    if not workers or workers <= 1:
+        return _bootstrap_means(samples, replicates, seed)
+
+    shares = [replicates // workers + (1 if i < replicates % workers else 0) for i in range(workers)]
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = pool.map(_bootstrap_means, [samples] * workers, shares, seeds)
+        return np.concatenate(list(parts), axis=1)
+
+
+def percentile_interval(means: np.ndarray, confidence: float = 0.95) -> Tuple[np.ndarray, np.ndarray]:
+    """Intervalle percentile de chaque ligne de réplications"""
+    alpha = (1.0 - confidence) / 2.0
+    low, high = np.quantile(means, [alpha, 1.0 - alpha], axis=1)
+    return low, high
+
+
+def compare_protocols(frame: pd.DataFrame, protocol: str = "RPL-AER", baseline: str = "RPL",
+                      replicates: int = 10000, confidence: float = 0.95,
+                      seed: int = 12345, workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    IC bootstrap par métrique, type et valeur d'axe (ex. mois)
+
+    Pour chaque cellule, la moyenne de chaque protocole et la différence
+    appariée (protocol - baseline, échantillons appariés par rang) sont
+    accompagnées de leur intervalle de confiance.
+
+    Returns:
+        Table (source, metric, type, axis_name, axis, estimate, n, mean, ci_low, ci_high)
+        où estimate vaut le protocole ou "protocol - baseline"
+    """
+    keys = ["source", "metric", "type", "axis_name", "axis"]
+    frame = frame[frame["protocol"].isin([protocol, baseline])].copy()
+    for column in ("source", "metric", "type", "axis_name", "protocol"):
+        frame[column] = frame[column].astype(str)
+    frame["rank"] = frame.groupby(keys + ["protocol"]).cumcount()
+
+    wide = frame.pivot_table(index=keys + ["rank"], columns="protocol", values="value").reset_index()
+    wide = wide.dropna(subset=[protocol, baseline])
+    wide["difference"] = wide[protocol] - wide[baseline]
+
+    rows: List[dict] = []
+    estimates = [(protocol, protocol), (baseline, baseline), ("difference", f"{protocol} - {baseline}")]
+    sizes = wide.groupby(keys).size()
+
+    # Les cellules de même taille n sont rééchantillonnées ensemble
+    for n, cells in sizes.groupby(sizes):
+        if n < 2:
+            continue
+        ordered = wide.merge(cells.index.to_frame(index=False), on=keys).sort_values(keys + ["rank"])
+        cell_keys = list(ordered[keys].iloc[::n].itertuples(index=False, name=None))
+        for column, label in estimates:
+            samples = ordered[column].to_numpy().reshape(len(cell_keys), n)
+            means = bootstrap_means(samples, replicates, seed, workers)
+            low, high = percentile_interval(means, confidence)
+            for cell, point, lo, hi in zip(cell_keys, samples.mean(axis=1), low, high):
+                rows.append(dict(zip(keys, cell), estimate=label, n=int(n),
+                                 mean=point, ci_low=lo, ci_high=hi))
+
+    return pd.DataFrame(rows).sort_values(keys + ["estimate"]).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IC bootstrap RPL-AER vs RPL")
+    parser.add_argument("-B", "--replicates", type=int, default=10000,
+                       help="Nombre de réplications bootstrap (défaut: 10000)")
+    parser.add_argument("-c", "--confidence", type=float, default=0.95,
+                       help="Niveau de confiance (défaut: 0.95)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                       help="Nombre de processus (défaut: un seul)")
+    parser.add_argument("--source", type=str, default=None,
+                       help="Fichier source à analyser (défaut: tous les *_Realistic)")
+    parser.add_argument("-o", "--output", type=str, default="bootstrap_ci.csv",
+                       help="Fichier CSV de sortie (défaut: bootstrap_ci.csv)")
+    args = parser.parse_args()
+
+    frame = load_dataset(source=args.source)
+    if args.source is None:
+        frame = frame[frame["source"].astype(str).str.endswith("_Realistic")]
+
+    table = compare_protocols(frame, replicates=args.replicates,
+                              confidence=args.confidence, workers=args.workers)
+    table.to_csv(args.output, index=False)
+    print(f"{len(table)} intervalles écrits dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
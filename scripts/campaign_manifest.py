@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Manifeste de campagne RPL-AER
+Journal append-only des exécutions (compilation, simulation, analyse)
+permettant de reprendre une campagne interrompue
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+# Étapes d'une exécution, dans l'ordre où elles sont franchies
+STAGES = ("built", "simulated", "parsed")
+
+
+def config_hash(config: Dict) -> str:
+    """Calcule l'empreinte stable d'une configuration de simulation"""
+    payload = json.dumps(config, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class CampaignManifest:
+    def __init__(self, path: str):
+        """
+        Ouvre (ou crée) le manifeste d'une campagne
+
+        Args:
+            path: Fichier JSON Lines du manifeste. Chaque ligne enregistre
+                  l'étape franchie par une exécution ; le fichier n'est
+                  jamais réécrit, seulement complété.
+        """
+        self.path = os.path.abspath(path)
+        self.runs: Dict[str, Dict] = {}
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._replay()
+
+    def _replay(self):
+        """Reconstruit l'état des exécutions à partir du journal"""
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            content = f.read()
+
+        if content and not content.endswith("\n"):
+            # Terminer la ligne tronquée pour que les ajouts suivants restent lisibles
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n")
+
+        for line in content.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Ligne tronquée par un arrêt brutal : ignorée
+                continue
+            self._apply(record)
+
+    def _apply(self, record: Dict):
+        run = self.runs.setdefault(record["run"], {
+            "config": record.get("config", {}),
+            "state": None,
+            "outputs": {}
+        })
+        if record.get("config"):
+            run["config"] = record["config"]
+        run["outputs"].update(record.get("outputs", {}))
+        if STAGES.index(record["state"]) >= self._stage_index(run["state"]):
+            run["state"] = record["state"]
+
+    @staticmethod
+    def _stage_index(state: Optional[str]) -> int:
+        return -1 if state is None else STAGES.index(state)
+
+    def state(self, run_id: str) -> Optional[str]:
+        """Retourne la dernière étape terminée d'une exécution (ou None)"""
+        run = self.runs.get(run_id)
+        return run["state"] if run else None
+
+    def outputs(self, run_id: str) -> Dict[str, str]:
+        """Retourne les chemins de sortie enregistrés pour une exécution"""
+        run = self.runs.get(run_id)
+        return dict(run["outputs"]) if run else {}
+
+    def is_done(self, run_id: str, stage: str) -> bool:
+        """Indique si l'étape donnée (ou une étape ultérieure) est terminée"""
+        return self._stage_index(self.state(run_id)) >= STAGES.index(stage)
+
+    def record(self, run_id: str, state: str, config: Optional[Dict] = None,
+               outputs: Optional[Dict[str, str]] = None):
+        """Ajoute une étape terminée au journal et la rend durable sur disque"""
+        if state not in STAGES:
+            raise ValueError(f"Étape inconnue: {state}")
+
+        record = {
+            "run": run_id,
+            "state": state,
+            "time": time.time(),
+            "config": config or {},
+            "outputs": outputs or {}
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, sort_keys=True) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._apply(record)
+
+    def pending(self, configs: List[Dict]) -> List[Dict]:
+        """Retourne les configurations dont l'analyse n'est pas terminée"""
+        return [c for c in configs if not self.is_done(config_hash(c), "parsed")]
+
+    def summary(self) -> Dict[str, int]:
+        """Compte les exécutions par dernière étape terminée"""
+        counts = {stage: 0 for stage in STAGES}
+        for run in self.runs.values():
+            if run["state"] is not None:
+                counts[run["state"]] += 1
+        return counts
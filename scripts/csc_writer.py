@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Écriture en flux des fichiers .csc (scénarios Cooja)
+En-tête, nœuds et pied de page émis au fil de l'eau à partir de gabarits
+préformatés, vers un fichier texte ou compressé (.gz)
+"""
+
+import gzip
+import io
+from typing import IO, Optional, Sequence, Tuple
+
+import numpy as np
+
+HEADER_TEMPLATE = '''<?xml version="1.0" encoding="UTF-8"?>
+<simconf xmlns="http://www.sics.se/contiki/cooja">
+  <simulation>
+    <title>RPL-AER Simulation (Generated)</title>
+    <randomseed>%(random_seed)d</randomseed>
+    <motedelay_us>10000</motedelay_us>
+    <radiomedium>org.contikios.cooja.radiomediums.UDGM</radiomedium>
+    <motetype>
+      <identifier>RPL_AER_CLIENT</identifier>
+      <description>RPL-AER UDP Client</description>
+      <source>udp-client.c</source>
+      <firmware>rpl-aer-client.csc</firmware>
+    </motetype>
+    <motetype>
+      <identifier>RPL_AER_SERVER</identifier>
+      <description>RPL-AER UDP Server (Sink)</description>
+      <source>rpl-aer-sink.c</source>
+      <firmware>rpl-aer-sink.csc</firmware>
+    </motetype>
+    <motes>
+      <!-- Sink node -->
+      <mote>
+        <motetype_identifier>RPL_AER_SERVER</motetype_identifier>
+        <interface_config>
+          <interface_class>org.contikios.cooja.interfaces.Position</interface_class>
+          <x>%(sink_x).1f</x>
+          <y>%(sink_y).1f</y>
+        </interface_config>
+      </mote>'''
+
+# Un nœud client ; les libellés (Solar/Battery, Mobile/Static) sont
+# précalculés une seule fois par type plutôt que re-découpés par nœud.
+CLIENT_MOTE_TEMPLATE = '''
+      <!-- Client %d: %s + %s -->
+      <mote>
+        <motetype_identifier>RPL_AER_CLIENT</motetype_identifier>
+        <interface_config>
+          <interface_class>org.contikios.cooja.interfaces.Position</interface_class>
+          <x>%.1f</x>
+          <y>%.1f</y>
+        </interface_config>
+        <interface_config>
+          <interface_class>org.contikios.cooja.interfaces.MoteAttributes</interface_class>
+          <attributes>energy=%s;mobility=%s;type=client;id=%d</attributes>
+        </interface_config>
+      </mote>'''
+
+FOOTER_TEMPLATE = '''
+    </motes>
+    <events>
+      <!-- Démarrage de la simulation -->
+      <event>
+        <time>0</time>
+        <command>log.log("=== RPL-AER Simulation démarrée (Generated) ===\\n");</command>
+      </event>
+      <!-- Arrêt de la simulation après %(duration)ds -->
+      <event>
+        <time>%(duration_ms)d</time>
+        <command>log.log("=== RPL-AER Simulation terminée ===\\n"); sim.stop();</command>
+      </event>
+    </events>
+    <plugin>
+      <classname>org.contikios.cooja.plugins.LogListener</classname>
+      <plugin_config/>
+      <width>800</width>
+      <height>200</height>
+      <location_x>0</location_x>
+      <location_y>0</location_y>
+    </plugin>
+    <plugin>
+      <classname>org.contikios.cooja.plugins.PowerTracker</classname>
+      <plugin_config/>
+      <width>400</width>
+      <height>200</height>
+      <location_x>0</location_x>
+      <location_y>210</location_y>
+    </plugin>
+    <plugin>
+      <classname>org.contikios.cooja.plugins.PacketLossTracker</classname>
+      <plugin_config/>
+      <width>400</width>
+      <height>200</height>
+      <location_x>410</location_x>
+      <location_y>210</location_y>
+    </plugin>
+    <plugin>
+      <classname>org.contikios.cooja.plugins.Visualizer</classname>
+      <plugin_config/>
+      <width>800</width>
+      <height>600</height>
+      <location_x>0</location_x>
+      <location_y>420</location_y>
+    </plugin>%(extra_plugins)s
+  </simulation>
+</simconf>'''
+
+# Plugin Mobility de Cooja, rejouant un fichier de positions "index temps x y"
+MOBILITY_PLUGIN_TEMPLATE = '''
+    <plugin>
+      <classname>Mobility</classname>
+      <plugin_config>
+        <positions EXPORT="copy">%(positions)s</positions>
+      </plugin_config>
+      <width>400</width>
+      <height>200</height>
+      <location_x>820</location_x>
+      <location_y>0</location_y>
+    </plugin>'''
+
+ENERGY_TYPES = ("battery", "solar")
+MOBILITY_TYPES = ("static", "mobile")
+_ENERGY_LABELS = tuple(t.title() for t in ENERGY_TYPES)
+_MOBILITY_LABELS = tuple(t.title() for t in MOBILITY_TYPES)
+
+
+class CSCStreamWriter:
+    def __init__(self, target, compress: Optional[bool] = None,
+                 chunk_size: int = 4096, compresslevel: int = 6):
+        """
+        Prépare l'écriture en flux d'un scénario .csc
+
+        Args:
+            target: Chemin du fichier de sortie ou flux texte déjà ouvert
+            compress: Compression gzip ; par défaut, activée si le chemin
+                      se termine par .gz
+            chunk_size: Nombre de nœuds formatés par écriture
+            compresslevel: Niveau de compression gzip (1-9)
+        """
+        self.target = target
+        self.compress = compress
+        self.chunk_size = chunk_size
+        self.compresslevel = compresslevel
+        self.stream: Optional[IO[str]] = None
+        self._owned = False
+        self.motes_written = 0
+
+    def __enter__(self):
+        if isinstance(self.target, io.TextIOBase):
+            self.stream = self.target
+        else:
+            compress = self.compress
+            if compress is None:
+                compress = str(self.target).endswith(".gz")
+            if compress:
+                self.stream = gzip.open(self.target, "wt", encoding="utf-8",
+                                        compresslevel=self.compresslevel)
+            else:
+                self.stream = open(self.target, "w", encoding="utf-8", buffering=1 << 20)
+            self._owned = True
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._owned and self.stream is not None:
+            self.stream.close()
+        self.stream = None
+
+    def write_header(self, random_seed: int, sink_position: Tuple[float, float]):
+        """Écrit l'en-tête du scénario (types de nœuds et sink)"""
+        self.stream.write(HEADER_TEMPLATE % {
+            "random_seed": random_seed,
+            "sink_x": sink_position[0],
+            "sink_y": sink_position[1]
+        })
+
+    def write_motes(self, mote_ids: Sequence[int], positions: np.ndarray,
+                    is_solar: Sequence[bool], is_mobile: Sequence[bool]):
+        """
+        Écrit une suite de nœuds clients, par blocs de chunk_size
+
+        Seul le bloc en cours est formaté en mémoire : l'empreinte reste
+        constante quel que soit le nombre total de nœuds.
+        """
+        ids = np.asarray(mote_ids, dtype=np.int64)
+        positions = np.asarray(positions, dtype=np.float64)
+        solar = np.asarray(is_solar, dtype=bool)
+        mobile = np.asarray(is_mobile, dtype=bool)
+
+        for start in range(0, len(ids), self.chunk_size):
+            stop = start + self.chunk_size
+            rows = zip(ids[start:stop].tolist(),
+                       positions[start:stop, 0].tolist(),
+                       positions[start:stop, 1].tolist(),
+                       solar[start:stop].tolist(),
+                       mobile[start:stop].tolist())
+            self.stream.write("".join([
+                CLIENT_MOTE_TEMPLATE % (
+                    mote_id, _ENERGY_LABELS[s], _MOBILITY_LABELS[m],
+                    x, y, ENERGY_TYPES[s], MOBILITY_TYPES[m], mote_id)
+                for mote_id, x, y, s, m in rows
+            ]))
+            self.motes_written += len(ids[start:stop])
+
+    def write_footer(self, simulation_duration: int, mobility_positions: Optional[str] = None):
+        """
+        Écrit les événements, plugins et la fermeture du scénario
+
+        Args:
+            mobility_positions: Fichier de positions à rejouer par le plugin
+                                Mobility (aucun plugin si None)
+        """
+        extra_plugins = ""
+        if mobility_positions:
+            extra_plugins = MOBILITY_PLUGIN_TEMPLATE % {"positions": mobility_positions}
+        self.stream.write(FOOTER_TEMPLATE % {
+            "duration": simulation_duration,
+            "duration_ms": simulation_duration * 1000,
+            "extra_plugins": extra_plugins
+        })
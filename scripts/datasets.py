@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Couche d'accès unifiée aux jeux de données data/*.csv
+Normalisation au format long (source, metric, protocol, type, axis_name,
+axis, value) et cache colonne par colonne projetable en mémoire
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+import uuid
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+CACHE_SUBDIR = os.path.join(".cache", "dataset")
+
+CATEGORICAL_COLUMNS = ("source", "metric", "protocol", "type", "axis_name")
+NUMERIC_COLUMNS = {"axis": np.float64, "value": np.float64}
+COLUMNS = CATEGORICAL_COLUMNS + tuple(NUMERIC_COLUMNS)
+
+# Traduction des en-têtes et valeurs françaises
+HEADER_ALIASES = {"Mois": "Month", "Protocole": "Protocol", "Énergie (mJ)": "Energy (mJ)"}
+TYPE_ALIASES = {"Simulé": "Simulated", "Réel": "Real", "Sim": "Simulated"}
+AXIS_COLUMNS = ("Month", "DataSize", "Nodes", "Day")
+UNSPECIFIED_TYPE = "Unspecified"
+
+# En-têtes du format large de PDR.csv, ex. "RPL-AER PDR (Sim)"
+_WIDE_COLUMN = re.compile(r"^(?P<protocol>.+?) (?P<metric>\S+) \((?P<type>[^)]+)\)$")
+
+
+def _normalize_long(frame: pd.DataFrame, source: str) -> pd.DataFrame:
+    """Convertit une table Month/Protocol/Type/<mesures...> au format long"""
+    frame = frame.rename(columns=HEADER_ALIASES)
+    axis_name = next(c for c in frame.columns if c in AXIS_COLUMNS)
+    if "Type" not in frame.columns:
+        frame["Type"] = UNSPECIFIED_TYPE
+
+    metrics = [c for c in frame.columns if c not in (axis_name, "Protocol", "Type")]
+    long = frame.melt(id_vars=[axis_name, "Protocol", "Type"], value_vars=metrics,
+                      var_name="metric", value_name="value")
+    return pd.DataFrame({
+        "source": source,
+        "metric": long["metric"],
+        "protocol": long["Protocol"],
+        "type": long["Type"].replace(TYPE_ALIASES),
+        "axis_name": axis_name,
+        "axis": long[axis_name].astype(np.float64),
+        "value": long["value"].astype(np.float64)
+    })
+
+
+def _normalize_wide(frame: pd.DataFrame, source: str) -> pd.DataFrame:
+    """Convertit une table large (une colonne par protocole/type, ex. PDR.csv)"""
+    label_column = frame.columns[0]
+    axis_name, _ = str(frame[label_column].iloc[0]).split(" ", 1)
+    axis = frame[label_column].str.split(" ", n=1).str[1].astype(np.float64)
+
+    pieces = []
+    for column in frame.columns[1:]:
+        match = _WIDE_COLUMN.match(column)
+        if match is None:
+            raise ValueError(f"Colonne non reconnue dans {source}: {column}")
+        metric = match.group("metric")
+        pieces.append(pd.DataFrame({
+            "source": source,
+            "metric": f"{metric} (%)" if metric == "PDR" else metric,
+            "protocol": match.group("protocol"),
+            "type": TYPE_ALIASES.get(match.group("type"), match.group("type")),
+            "axis_name": axis_name,
+            "axis": axis.values,
+            "value": frame[column].astype(np.float64).values
+        }))
+    return pd.concat(pieces, ignore_index=True)
+
+
+def normalize_csv(path: str) -> pd.DataFrame:
+    """Lit un CSV de data/ et le ramène au schéma long commun"""
+    source = os.path.splitext(os.path.basename(path))[0]
+    frame = pd.read_csv(path)
+    first = frame.columns[0]
+    if first.startswith("Unnamed") or first == "":
+        return _normalize_wide(frame, source)
+    return _normalize_long(frame, source)
+
+
+def _fingerprint(path: str, with_hash: bool = True) -> Dict:
+    stat = os.stat(path)
+    fingerprint = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    if with_hash:
+        with open(path, "rb") as f:
+            fingerprint["sha256"] = hashlib.sha256(f.read()).hexdigest()
+    return fingerprint
+
+
+class DatasetCache:
+    def __init__(self, data_dir: str = DEFAULT_DATA_DIR, cache_dir: Optional[str] = None):
+        """
+        Cache colonne par colonne des CSV de data/
+
+        Args:
+            data_dir: Répertoire des CSV sources
+            cache_dir: Répertoire du cache (défaut: data/.cache/dataset)
+        """
+        self.data_dir = os.path.abspath(data_dir)
+        self.cache_dir = cache_dir or os.path.join(self.data_dir, CACHE_SUBDIR)
+        self.meta_path = os.path.join(self.cache_dir, "meta.json")
+
+    def sources(self) -> List[str]:
+        return sorted(glob.glob(os.path.join(self.data_dir, "*.csv")))
+
+    def _read_meta(self) -> Optional[Dict]:
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_meta(self, meta: Dict):
+        tmp_path = f"{self.meta_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.meta_path)
+
+    def is_fresh(self, meta: Optional[Dict]) -> bool:
+        """
+        Vérifie que le cache correspond aux CSV sources
+
+        Seule la date de modification est comparée ; si elle a changé, le
+        contenu est haché et, s'il est identique, la date est simplement
+        mise à jour sans reconstruire le cache.
+        """
+        if meta is None:
+            return False
+
+        names = {os.path.basename(p): p for p in self.sources()}
+        if set(names) != set(meta["sources"]):
+            return False
+
+        touched = False
+        for name, path in names.items():
+            known = meta["sources"][name]
+            current = _fingerprint(path, with_hash=False)
+            if current["mtime_ns"] == known["mtime_ns"] and current["size"] == known["size"]:
+                continue
+            current = _fingerprint(path)
+            if current["sha256"] != known["sha256"]:
+                return False
+            meta["sources"][name] = current
+            touched = True
+
+        if touched:
+            self._write_meta(meta)
+        return True
+
+    def rebuild(self) -> Dict:
+        """Relit tous les CSV et réécrit le cache"""
+        frame = pd.concat([normalize_csv(p) for p in self.sources()], ignore_index=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # Fichiers préfixés par un identifiant de construction : le cache
+        # n'est basculé qu'à l'écriture finale de meta.json
+        build = uuid.uuid4().hex[:12]
+        meta = {"build": build, "rows": len(frame), "categories": {},
+                "sources": {os.path.basename(p): _fingerprint(p) for p in self.sources()}}
+
+        for column in CATEGORICAL_COLUMNS:
+            categorical = pd.Categorical(frame[column])
+            meta["categories"][column] = [str(c) for c in categorical.categories]
+            np.save(os.path.join(self.cache_dir, f"{build}_{column}.npy"),
+                    categorical.codes.astype(np.int16))
+        for column, dtype in NUMERIC_COLUMNS.items():
+            np.save(os.path.join(self.cache_dir, f"{build}_{column}.npy"),
+                    frame[column].to_numpy(dtype=dtype))
+
+        previous = self._read_meta()
+        self._write_meta(meta)
+        if previous is not None and previous.get("build") != build:
+            for column in COLUMNS:
+                stale = os.path.join(self.cache_dir, f"{previous['build']}_{column}.npy")
+                if os.path.exists(stale):
+                    os.remove(stale)
+        return meta
+
+    def columns(self) -> Dict:
+        """
+        Retourne les colonnes du cache en projection mémoire
+
+        Returns:
+            Dictionnaire colonne -> tableau (codes int16 pour les colonnes
+            catégorielles) et "categories" -> libellés par colonne
+        """
+        meta = self._read_meta()
+        if not self.is_fresh(meta):
+            meta = self.rebuild()
+
+        columns = {"categories": meta["categories"]}
+        for column in COLUMNS:
+            columns[column] = np.load(os.path.join(self.cache_dir, f"{meta['build']}_{column}.npy"),
+                                      mmap_mode="r")
+        return columns
+
+    def frame(self) -> pd.DataFrame:
+        """Retourne le jeu de données complet (colonnes catégorielles)"""
+        columns = self.columns()
+        data = {}
+        for column in CATEGORICAL_COLUMNS:
+            data[column] = pd.Categorical.from_codes(columns[column], columns["categories"][column])
+        for column in NUMERIC_COLUMNS:
+            data[column] = columns[column]
+        return pd.DataFrame(data, copy=False)
+
+
+def load_dataset(data_dir: str = DEFAULT_DATA_DIR, metric: Optional[str] = None,
+                 source: Optional[str] = None) -> pd.DataFrame:
+    """
+    Charge les données normalisées, éventuellement filtrées
+
+    Args:
+        metric: Ne garder qu'une métrique (ex. "Latency (ms)")
+        source: Ne garder qu'un fichier source (ex. "Lifetime_Realistic")
+    """
+    frame = DatasetCache(data_dir).frame()
+    if metric is not None:
+        frame = frame[frame["metric"] == metric]
+    if source is not None:
+        frame = frame[frame["source"] == source]
+    return frame
+
+
+def main():
+    frame = load_dataset()
+    print(f"{len(frame)} lignes, {frame['source'].nunique()} sources, {frame['metric'].nunique()} métriques")
+    print(frame.groupby(["source", "metric", "axis_name"], observed=True).size().to_string())
+
+
+if __name__ == "__main__":
+    main()
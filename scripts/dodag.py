@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Topologie DODAG vectorisée pour les modèles RPL-AER
+Voisinages radio, rangs en sauts, choix du parent par score et cumul de
+la charge des sous-arbres, pour un lot de configurations à la fois ;
+variante mutable réparée localement lors des déplacements de nœuds
+"""
+
+import heapq
+from collections import deque
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+
+from placement import SpatialHashGrid
+
+
+def link_prr(distance: np.ndarray, radio_range: float) -> np.ndarray:
+    """Taux de réception d'un lien selon sa longueur (sigmoïde proche de la portée)"""
+    return 1.0 / (1.0 + np.exp(10.0 * (np.asarray(distance) / radio_range - 0.85)))
+
+
+def link_rssi(distance: np.ndarray, path_loss_exponent: float = 2.2,
+              reference_loss: float = 40.0) -> np.ndarray:
+    """RSSI moyen (dBm, émission à 0 dBm) selon le modèle log-distance"""
+    return -reference_loss - 10.0 * path_loss_exponent * np.log10(np.maximum(distance, 1.0))
+
+
+class DodagTopology:
+    def __init__(self, positions: np.ndarray, sink: Tuple[float, float], radio_range: float):
+        """
+        Structure statique d'un DODAG ancré au sink
+
+        Les nœuds sont indexés 0..n-1 et le sink porte l'indice n. Chaque nœud
+        de rang h ne peut choisir son parent que parmi ses voisins de rang
+        h - 1 (parents candidats, stockés dans une matrice complétée par -1).
+
+        Args:
+            positions: Positions (n, 2) des nœuds
+            sink: Position du sink
+            radio_range: Portée radio en mètres
+        """
+        self.positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        self.sink = (float(sink[0]), float(sink[1]))
+        self.radio_range = float(radio_range)
+        self.num_nodes = len(self.positions)
+        self.sink_index = self.num_nodes
+        self._build()
+
+    def _build(self):
+        n = self.num_nodes
+        points = np.vstack([self.positions, np.asarray(self.sink)])
+        grid = SpatialHashGrid(points, self.radio_range)
+
+        # Rang en sauts par parcours en largeur depuis le sink
+        hops = np.full(n + 1, -1, dtype=np.int32)
+        hops[n] = 0
+        neighbors: List[np.ndarray] = [np.empty(0, dtype=np.int64)] * (n + 1)
+        queue = deque([n])
+        while queue:
+            current = queue.popleft()
+            found = grid.query_radius(points[current], self.radio_range)
+            found = found[found != current]
+            neighbors[current] = found
+            fresh = found[hops[found] < 0]
+            hops[fresh] = hops[current] + 1
+            queue.extend(fresh.tolist())
+
+        self.hops = hops
+        self.reachable = hops[:n] >= 0
+        depth = int(hops.max())
+        self.levels = [np.nonzero(hops[:n] == h)[0] for h in range(1, depth + 1)]
+
+        # Parents candidats : voisins du rang précédent
+        lists = []
+        for i in range(n):
+            if hops[i] <= 0:
+                lists.append(np.empty(0, dtype=np.int64))
+                continue
+            nb = neighbors[i]
+            lists.append(nb[hops[nb] == hops[i] - 1])
+        width = max(1, max(len(c) for c in lists))
+        self.candidates = np.full((n, width), -1, dtype=np.int64)
+        for i, c in enumerate(lists):
+            self.candidates[i, :len(c)] = c
+        self.candidate_mask = self.candidates >= 0
+
+        safe = np.where(self.candidate_mask, self.candidates, n)
+        delta = points[safe] - self.positions[:, None, :]
+        self.candidate_distance = np.where(self.candidate_mask, np.hypot(delta[..., 0], delta[..., 1]), np.inf)
+
+    def select_parents(self, scores: np.ndarray, alive: Optional[np.ndarray] = None,
+                       link_scores: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Choisit pour chaque nœud le parent candidat de meilleur score
+
+        Args:
+            scores: Scores (W, n) des nœuds (ex. MCS), un lot par ligne
+            alive: Masque (W, n) des nœuds en vie (tous par défaut)
+            link_scores: Termes (W, n, K) ajoutés au score de chaque candidat
+                         (même disposition que candidates), finis
+
+        Returns:
+            Parents (W, n), -1 pour un nœud sans parent disponible
+        """
+        scores = np.atleast_2d(scores)
+        batch = len(scores)
+        n = self.num_nodes
+        # Le sink (colonne n) est toujours disponible et préféré
+        full = np.full((batch, n + 1), np.inf)
+        full[:, :n] = scores
+        if alive is not None:
+            full[:, :n] = np.where(np.atleast_2d(alive), full[:, :n], -np.inf)
+
+        safe = np.where(self.candidate_mask, self.candidates, n)
+        candidate_scores = np.where(self.candidate_mask, full[:, safe], -np.inf)
+        if link_scores is not None:
+            candidate_scores = candidate_scores + link_scores
+        best = np.argmax(candidate_scores, axis=2)
+        parents = np.take_along_axis(np.broadcast_to(safe, candidate_scores.shape),
+                                     best[..., None], axis=2)[..., 0]
+        usable = np.take_along_axis(candidate_scores, best[..., None], axis=2)[..., 0] > -np.inf
+        if alive is not None:
+            usable &= np.atleast_2d(alive)
+        return np.where(usable, parents, -1)
+
+    def select_min_cost(self, link_costs: np.ndarray, alive: Optional[np.ndarray] = None):
+        """
+        Choisit les parents minimisant un coût additif jusqu'au sink (ETX du chemin)
+
+        Les rangs sont parcourus du sink vers les feuilles : le coût du chemin
+        de chaque candidat est connu quand le rang suivant est traité, ce qui
+        donne directement le DODAG convergé.
+
+        Args:
+            link_costs: Coûts (n, K) ou (W, n, K) des liens vers les candidats
+            alive: Masque (W, n) des nœuds en vie (tous par défaut)
+
+        Returns:
+            Parents (W, n), -1 sans parent, et coût du chemin (W, n), inf si déconnecté
+        """
+        n = self.num_nodes
+        alive = np.ones((1, n), dtype=bool) if alive is None else np.atleast_2d(alive)
+        batch = len(alive)
+        link_costs = np.broadcast_to(link_costs, (batch,) + self.candidates.shape)
+        cost = np.full((batch, n + 1), np.inf)
+        cost[:, n] = 0.0
+        parents = np.full((batch, n), -1, dtype=np.int64)
+        safe = np.where(self.candidate_mask, self.candidates, n)
+        for level in self.levels:
+            total = np.where(self.candidate_mask[level], cost[:, safe[level]] + link_costs[:, level], np.inf)
+            best = np.argmin(total, axis=2)
+            best_cost = np.take_along_axis(total, best[..., None], axis=2)[..., 0]
+            usable = np.isfinite(best_cost) & alive[:, level]
+            chosen = np.take_along_axis(np.broadcast_to(safe[level], total.shape), best[..., None], axis=2)[..., 0]
+            parents[:, level] = np.where(usable, chosen, -1)
+            cost[:, level] = np.where(usable, best_cost, np.inf)
+        return parents, cost[:, :n]
+
+    def parent_distance(self, parents: np.ndarray) -> np.ndarray:
+        """Longueur (W, n) du lien vers le parent, inf sans parent"""
+        parents = np.atleast_2d(parents)
+        points = np.vstack([self.positions, np.asarray(self.sink)])
+        delta = points[np.maximum(parents, 0)] - self.positions[None, :, :]
+        return np.where(parents >= 0, np.hypot(delta[..., 0], delta[..., 1]), np.inf)
+
+    def accumulate_load(self, parents: np.ndarray, own: np.ndarray) -> np.ndarray:
+        """
+        Trafic traversant chaque nœud (le sien plus celui de son sous-arbre)
+
+        Les rangs sont traités du plus profond au plus proche du sink ; à
+        chaque rang, la charge des nœuds est ajoutée à celle de leurs parents
+        pour tous les lots à la fois (np.add.at sur les indices aplatis).
+
+        Returns:
+            Charge (W, n + 1), la dernière colonne étant le trafic reçu par le sink
+        """
+        parents = np.atleast_2d(parents)
+        batch = len(parents)
+        width = self.num_nodes + 1
+        load = np.zeros((batch, width))
+        load[:, :self.num_nodes] = np.broadcast_to(own, (batch, self.num_nodes))
+        rows = np.arange(batch)[:, None] * width
+        flat = load.reshape(-1)
+        for level in reversed(self.levels):
+            p = parents[:, level]
+            linked = p >= 0
+            np.add.at(flat, (rows + p)[linked], load[:, level][linked])
+        return load
+
+    def path_product(self, parents: np.ndarray, factor: np.ndarray) -> np.ndarray:
+        """
+        Produit d'un facteur par nœud le long du chemin vers le sink
+
+        Args:
+            factor: Facteur (W, n) appliqué au saut nœud -> parent
+
+        Returns:
+            Produit (W, n), 0 pour un nœud déconnecté
+        """
+        return self._along_path(parents, factor, np.multiply, 1.0, 0.0)
+
+    def path_sum(self, parents: np.ndarray, term: np.ndarray) -> np.ndarray:
+        """Somme d'un terme par nœud le long du chemin (inf si déconnecté)"""
+        return self._along_path(parents, term, np.add, 0.0, np.inf)
+
+    def _along_path(self, parents, values, combine, identity, orphan):
+        parents = np.atleast_2d(parents)
+        values = np.broadcast_to(values, parents.shape)
+        result = np.full((len(parents), self.num_nodes + 1), orphan, dtype=np.float64)
+        result[:, self.num_nodes] = identity
+        for level in self.levels:
+            p = parents[:, level]
+            upstream = np.take_along_axis(result, np.maximum(p, 0), axis=1)
+            result[:, level] = np.where(p >= 0, combine(values[:, level], upstream), orphan)
+        return result[:, :self.num_nodes]
+
+
+UNREACHABLE = 1 << 30
+
+
+class IncrementalDodag:
+    def __init__(self, positions: np.ndarray, sink: Tuple[float, float], radio_range: float,
+                 scores: Optional[np.ndarray] = None):
+        """
+        DODAG mutable dont les rangs et parents sont réparés localement
+
+        Un déplacement ne met à jour que la cellule du nœud dans l'index
+        spatial et les voisinages qu'il quitte ou rejoint ; les rangs puis
+        les parents ne sont recalculés que pour les nœuds marqués (ensemble
+        sale) et le sous-DODAG réellement touché.
+
+        Args:
+            positions: Positions initiales (n, 2) des nœuds (le sink porte l'indice n)
+            sink: Position fixe du sink
+            radio_range: Portée radio en mètres
+            scores: Score (n,) des nœuds comme parents (ex. MCS) ; à score
+                    égal, le plus petit indice est choisi
+        """
+        self.num_nodes = len(positions)
+        self.sink_index = self.num_nodes
+        self.radio_range = float(radio_range)
+        points = np.vstack([np.asarray(positions, dtype=np.float64).reshape(-1, 2), np.asarray(sink)])
+        self.grid = SpatialHashGrid(points, self.radio_range)
+        self.scores = [0.0] * self.num_nodes if scores is None else [float(v) for v in scores]
+        self.neighbors: List[Set[int]] = [self._query(i) for i in range(self.num_nodes + 1)]
+        self.parent_changes = 0
+        self.evaluated = 0
+
+        # Construction initiale : parcours en largeur depuis le sink
+        self.hops = [UNREACHABLE] * (self.num_nodes + 1)
+        self.hops[self.sink_index] = 0
+        queue = deque([self.sink_index])
+        while queue:
+            current = queue.popleft()
+            for other in self.neighbors[current]:
+                if self.hops[other] == UNREACHABLE:
+                    self.hops[other] = self.hops[current] + 1
+                    queue.append(other)
+        self.parents = [self._choose(i) for i in range(self.num_nodes)]
+
+    def _query(self, index: int) -> Set[int]:
+        found = set(self.grid.query_radius(self.grid.positions[index], self.radio_range).tolist())
+        found.discard(index)
+        return found
+
+    def _choose(self, node: int) -> int:
+        """Meilleur voisin de rang h - 1 (le sink est toujours préféré)"""
+        hop = self.hops[node]
+        if hop >= UNREACHABLE:
+            return -1
+        best, best_score = -1, -np.inf
+        for other in self.neighbors[node]:
+            if self.hops[other] != hop - 1:
+                continue
+            if other == self.sink_index:
+                return other
+            score = self.scores[other]
+            if score > best_score or (score == best_score and other < best):
+                best, best_score = other, score
+        return best
+
+    def move(self, node: int, point) -> Set[int]:
+        """
+        Applique le déplacement d'un nœud et répare le DODAG
+
+        Returns:
+            Nœuds dont le parent a changé
+        """
+        before = self.neighbors[node]
+        self.grid.move(node, point)
+        after = self._query(node)
+        entered, left = after - before, before - after
+        if not entered and not left:
+            return set()
+        for other in entered:
+            self.neighbors[other].add(node)
+        for other in left:
+            self.neighbors[other].discard(node)
+        self.neighbors[node] = after
+        return self._repair({node} | entered | left)
+
+    def update_scores(self, nodes, values) -> Set[int]:
+        """Met à jour des scores ; seuls les voisins des nœuds concernés rechoisissent"""
+        dirty = set()
+        for node, value in zip(np.atleast_1d(nodes).tolist(), np.atleast_1d(values).tolist()):
+            if self.scores[node] != value:
+                self.scores[node] = float(value)
+                dirty |= self.neighbors[node]
+        return self._reselect(dirty)
+
+    def _repair(self, touched: Set[int]) -> Set[int]:
+        hops, neighbors, sink = self.hops, self.neighbors, self.sink_index
+        touched.discard(sink)
+
+        # 1. Nœuds ayant perdu tout voisin de rang h - 1 ; la perte se propage
+        #    aux voisins de rang h + 1 qui s'appuyaient sur eux
+        affected: Set[int] = set()
+        stack = [u for u in touched if hops[u] < UNREACHABLE]
+        while stack:
+            u = stack.pop()
+            if u in affected:
+                continue
+            hop = hops[u]
+            if any(hops[v] == hop - 1 and v not in affected for v in neighbors[u]):
+                continue
+            affected.add(u)
+            stack.extend(w for w in neighbors[u] if w != sink and hops[w] == hop + 1)
+
+        previous = {u: hops[u] for u in affected}
+        for u in affected:
+            hops[u] = UNREACHABLE
+
+        # 2. Rangs recalculés depuis les voisins sains, puis propagation des
+        #    diminutions (plus court chemin par tas, poids unitaires)
+        heap = []
+        for u in affected | touched:
+            best = min((hops[v] for v in neighbors[u]), default=UNREACHABLE) + 1
+            if best < hops[u]:
+                previous.setdefault(u, hops[u])
+                hops[u] = best
+                heap.append((best, u))
+        heapq.heapify(heap)
+        while heap:
+            hop, u = heapq.heappop(heap)
+            if hop != hops[u]:
+                continue
+            for w in neighbors[u]:
+                if w != sink and hop + 1 < hops[w]:
+                    previous.setdefault(w, hops[w])
+                    hops[w] = hop + 1
+                    heapq.heappush(heap, (hop + 1, w))
+
+        # 3. Parents : nœuds touchés, nœuds dont le rang a changé et leurs
+        #    voisins (leurs candidats de rang h - 1 ont pu changer)
+        changed = [u for u, hop in previous.items() if hops[u] != hop]
+        dirty = set(touched)
+        for u in changed:
+            dirty.add(u)
+            dirty |= neighbors[u]
+        return self._reselect(dirty)
+
+    def _reselect(self, dirty: Set[int]) -> Set[int]:
+        dirty.discard(self.sink_index)
+        self.evaluated += len(dirty)
+        switched = set()
+        for u in dirty:
+            parent = self._choose(u)
+            if parent != self.parents[u]:
+                self.parents[u] = parent
+                switched.add(u)
+        self.parent_changes += len(switched)
+        return switched
+
+    def hop_counts(self) -> np.ndarray:
+        """Rangs en sauts (n,), -1 pour un nœud déconnecté"""
+        hops = np.array(self.hops[:self.num_nodes], dtype=np.int64)
+        return np.where(hops >= UNREACHABLE, -1, hops)
+
+    def parent_array(self) -> np.ndarray:
+        """Parents (n,), -1 sans parent, n pour le sink"""
+        return np.array(self.parents, dtype=np.int64)
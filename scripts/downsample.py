@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Sous-échantillonnage des séries temporelles avant tracé
+Largest-Triangle-Three-Buckets (LTTB) ou min/max par intervalle, pour que le
+coût des figures ne dépende plus de la durée simulée
+"""
+
+from typing import Optional
+
+import numpy as np
+
+METHODS = ("lttb", "minmax")
+
+# Nombre de points tracés par série par défaut (ordre de grandeur de la
+# largeur en pixels d'un panneau à 300 dpi)
+DEFAULT_MAX_POINTS = 2000
+
+
+def lttb(x: np.ndarray, y: np.ndarray, num_points: int) -> np.ndarray:
+    """
+    Indices des points retenus par Largest-Triangle-Three-Buckets
+
+    Le premier et le dernier point sont conservés ; dans chaque intervalle
+    intermédiaire, le point formant le plus grand triangle avec le point
+    retenu précédemment et la moyenne de l'intervalle suivant est gardé.
+    Les valeurs non finies sont ignorées.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    finite = np.nonzero(np.isfinite(x) & np.isfinite(y))[0]
+    n = len(finite)
+    if num_points >= n or num_points < 3:
+        return finite
+    xs, ys = x[finite], y[finite]
+
+    # num_points - 2 intervalles sur les points 1 .. n - 2
+    bounds = np.linspace(1, n - 1, num_points - 1).astype(np.int64)
+    cum_x = np.concatenate([[0.0], np.cumsum(xs)])
+    cum_y = np.concatenate([[0.0], np.cumsum(ys)])
+    counts = np.maximum(bounds[1:] - bounds[:-1], 1)
+    mean_x = (cum_x[bounds[1:]] - cum_x[bounds[:-1]]) / counts
+    mean_y = (cum_y[bounds[1:]] - cum_y[bounds[:-1]]) / counts
+    # Cible du dernier intervalle : le dernier point
+    mean_x = np.append(mean_x[1:], xs[-1])
+    mean_y = np.append(mean_y[1:], ys[-1])
+
+    selected = np.empty(num_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(num_points - 2):
+        start, stop = bounds[bucket], bounds[bucket + 1]
+        ax, ay = xs[previous], ys[previous]
+        area = np.abs((ax - mean_x[bucket]) * (ys[start:stop] - ay)
+                      - (ax - xs[start:stop]) * (mean_y[bucket] - ay))
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return finite[selected]
+
+
+def minmax(y: np.ndarray, num_points: int) -> np.ndarray:
+    """
+    Indices des minimum et maximum de chaque intervalle (num_points / 2 intervalles)
+
+    Conserve l'enveloppe de la série : adapté aux séries bruitées dont les
+    pics doivent rester visibles. Les NaN sont ignorés.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    buckets = max(1, num_points // 2)
+    if 2 * buckets >= n:
+        return np.arange(n)
+    width = -(-n // buckets)
+    padded = np.full(buckets * width, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(buckets, width)
+    offsets = np.arange(buckets) * width
+    low = offsets + np.argmin(np.where(np.isnan(blocks), np.inf, blocks), axis=1)
+    high = offsets + np.argmax(np.where(np.isnan(blocks), -np.inf, blocks), axis=1)
+    indices = np.unique(np.concatenate([[0, n - 1], low, high]))
+    return indices[indices < n]
+
+
+def downsample(x: np.ndarray, y: np.ndarray, max_points: int = DEFAULT_MAX_POINTS,
+               method: str = "lttb"):
+    """
+    Réduit une série à au plus max_points points en préservant sa forme
+
+    Returns:
+        (x, y) sous-échantillonnés
+    """
+    if method not in METHODS:
+        raise ValueError(f"Méthode inconnue: {method} (choix: {', '.join(METHODS)})")
+    x = np.asarray(x)
+    y = np.asarray(y)
+    if len(x) <= max_points:
+        return x, y
+    indices = lttb(x, y, max_points) if method == "lttb" else minmax(y, max_points)
+    return x[indices], y[indices]
+
+
+def plot_series(ax, x: np.ndarray, y: np.ndarray, *args, max_points: Optional[int] = DEFAULT_MAX_POINTS,
+                method: str = "lttb", **kwargs):
+    """
+    ax.plot d'une série sous-échantillonnée
+
+    Une série plus longue que max_points est tracée en mode rasterisé : elle
+    devient une image dans les sorties vectorielles (PDF, SVG) au lieu de
+    milliers de segments. max_points=None trace tous les points.
+    """
+    if max_points is None or len(x) <= max_points:
+        return ax.plot(x, y, *args, **kwargs)
+    kwargs.setdefault("rasterized", True)
+    x, y = downsample(x, y, max_points, method)
+    return ax.plot(x, y, *args, **kwargs)
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Modèle d'énergie par état (CPU, LPM, écoute, émission, réception)
+Temps passé dans chaque état par nœud et par pas, déduit du trafic propre,
+relayé, de contrôle et des retransmissions dues aux attaques, puis converti
+en charge (mAh) par opérations sur des tableaux (pas, nœuds)
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from dodag import DodagTopology, link_prr
+from firmware_emulator import read_firmware_defines
+from placement import SpatialHashGrid
+from powertracker import DEFAULT_RADIO_MODEL, RADIO_POWER_MODELS
+
+ENERGY_STATES = ("cpu", "lpm", "listen", "tx", "rx")
+
+# Courants du microcontrôleur (mA) : MSP430F1611 du Tmote Sky à 3 V
+MCU_CURRENTS = {"cpu": 1.8, "lpm": 0.0545}
+
+# Paramètres absents de project-conf.h : MAC à échantillonnage de canal
+# (ContikiMAC), trames 802.15.4 et coût logiciel des traitements
+ENERGY_DEFAULTS = {
+    "CHANNEL_CHECK_RATE": 8.0,          # Hz
+    "CHANNEL_CHECK_TIME": 0.001,        # s de radio allumée par échantillonnage
+    "BITRATE": 250000.0,                # bit/s
+    "DATA_FRAME_BYTES": 80,             # trame UDP avec en-têtes 6LoWPAN
+    "CONTROL_FRAME_BYTES": 60,          # DIO
+    "ACK_BYTES": 5,
+    "CPU_PER_PACKET": 0.002,            # s par trame émise ou reçue
+    "CPU_PER_TIMER": 0.003,             # s par expiration de temporisateur
+    "SELECTIVE_FORWARDING_DROP": 0.5,   # part des paquets écartés par l'attaquant
+}
+
+# Temporisateurs périodiques du firmware (rpl-aer.h, project-conf.h)
+FIRMWARE_TIMERS = ("RPL_AER_MCS_UPDATE_INTERVAL", "RPL_AER_ENERGY_UPDATE_INTERVAL",
+                   "RPL_AER_SECURITY_UPDATE_INTERVAL", "RPL_AER_PERFORMANCE_UPDATE_INTERVAL",
+                   "LSTM_UPDATE_INTERVAL")
+
+
+class NodeEnergyModel:
+    def __init__(self, positions: np.ndarray, sink, radio_range: float, step: float = 60.0,
+                 radio: str = DEFAULT_RADIO_MODEL, random_seed: int = 12345, **overrides):
+        """
+        Consommation de chaque nœud d'après le trafic qui le traverse
+
+        Le DODAG est celui de l'émulateur (parent de meilleure énergie
+        résiduelle parmi les voisins du rang précédent) ; la charge des
+        relais est cumulée sur leur sous-arbre avec les retransmissions
+        MAC (UDP_CLIENT_CONF_RETRANSMISSIONS) du lien vers leur parent.
+
+        Args:
+            positions: Positions (n, 2) des nœuds
+            sink: Position du sink
+            radio_range: Portée radio en mètres
+            step: Durée d'un pas en secondes
+            radio: Modèle de courants radio de powertracker.RADIO_POWER_MODELS
+            random_seed: Graine du choix des nœuds attaquants
+            overrides: Valeurs remplaçant celles de project-conf.h ou d'ENERGY_DEFAULTS
+        """
+        if radio not in RADIO_POWER_MODELS:
+            raise ValueError(f"Modèle radio inconnu: {radio} (choix: {', '.join(RADIO_POWER_MODELS)})")
+        self.config = {**ENERGY_DEFAULTS, **read_firmware_defines(), **overrides}
+        self.currents = {**MCU_CURRENTS, **{state: RADIO_POWER_MODELS[radio][state]
+                                            for state in ("listen", "tx", "rx")}}
+        self.step = float(step)
+        self.topology = DodagTopology(positions, sink, radio_range)
+        self.rng = np.random.default_rng(random_seed)
+        c = self.config
+
+        # Voisins à portée (réception des DIO diffusés)
+        points = self.topology.positions
+        grid = SpatialHashGrid(points, radio_range)
+        self.degree = np.array([len(grid.query_radius(p, radio_range)) - 1 for p in points], dtype=np.float64)
+
+        # Trafic de référence par pas : paquets applicatifs, DIO du Trickle
+        # à son intervalle maximal (régime établi) et temporisateurs
+        self.packets_per_step = self.step / c["UDP_CLIENT_INTERVAL"]
+        imax = 2.0 ** (c["RPL_CONF_DEFAULT_DIO_INTERVAL_MIN"] + c["RPL_CONF_DEFAULT_DIO_INTERVAL_DOUBLINGS"]) / 1000.0
+        self.dio_per_step = self.step / imax
+        self.timers_per_step = sum(self.step / c[name] for name in FIRMWARE_TIMERS if c.get(name))
+
+        # Durées d'occupation radio (s) : un envoi unicast répète la trame
+        # pendant en moyenne une demi-période d'échantillonnage, un envoi
+        # diffusé pendant une période entière
+        airtime = 8.0 / c["BITRATE"]
+        self.ack_time = c["ACK_BYTES"] * airtime
+        self.unicast_time = 0.5 / c["CHANNEL_CHECK_RATE"]
+        self.broadcast_time = 1.0 / c["CHANNEL_CHECK_RATE"]
+        self.data_rx_time = 1.5 * c["DATA_FRAME_BYTES"] * airtime
+        self.control_rx_time = 1.5 * c["CONTROL_FRAME_BYTES"] * airtime
+        self.listen_time = min(c["CHANNEL_CHECK_RATE"] * c["CHANNEL_CHECK_TIME"], 1.0) * self.step
+
+        self.parents = np.full(self.topology.num_nodes, -1, dtype=np.int64)
+        self._attack_extra: Dict[int, tuple] = {}
+
+    def _link_traffic(self, parents: np.ndarray, own: np.ndarray):
+        """Trames émises (avec retransmissions) et reçues par pas pour un trafic propre donné"""
+        n = self.topology.num_nodes
+        load = self.topology.accumulate_load(parents, own)[0, :n]
+        linked = parents >= 0
+        distance = np.where(linked, self.topology.parent_distance(parents)[0], 0.0)
+        prr = link_prr(distance, self.topology.radio_range)
+        attempts = 1 + self.config["UDP_CLIENT_CONF_RETRANSMISSIONS"]
+        success = 1.0 - (1.0 - prr) ** attempts
+        transmissions = np.where(prr > 0, success / np.maximum(prr, 1e-12), attempts)
+        tx = np.where(linked, load * transmissions, 0.0)
+        rx = np.bincount(parents[linked], weights=(load * success)[linked], minlength=n + 1)[:n]
+        return tx, rx
+
+    def update_routes(self, alive: np.ndarray, scores: np.ndarray):
+        """
+        Choisit les parents (score le plus élevé, ex. énergie résiduelle)
+        et calcule le trafic de référence des nœuds en vie
+
+        Les nœuds dont le chemin vers le sink passe par un nœud mort
+        n'émettent plus de données (ils restent à l'écoute).
+        """
+        alive = np.asarray(alive, dtype=bool)
+        parents = self.topology.select_parents(np.asarray(scores, dtype=np.float64)[None], alive[None])[0]
+        connected = self.topology.path_product(parents, np.ones(len(parents)))[0] > 0
+        self.parents = np.where(connected, parents, -1)
+        self.alive = alive
+        self.connected = connected
+        self.own = np.where(connected, self.packets_per_step, 0.0)
+        self.tx, self.rx = self._link_traffic(self.parents, self.own)
+        self._attack_extra.clear()
+
+    def attack_traffic(self, attacker: int):
+        """
+        Trafic supplémentaire (tx, rx) par pas quand attacker écarte une part
+        des paquets qu'il relaie (selective forwarding)
+
+        Chaque source de son sous-arbre renvoie ses paquets perdus jusqu'à
+        UDP_CLIENT_CONF_RETRANSMISSIONS fois ; les renvois traversent tous
+        les sauts jusqu'à l'attaquant, qui les écarte à nouveau.
+        """
+        if attacker not in self._attack_extra:
+            drop = self.config["SELECTIVE_FORWARDING_DROP"]
+            retries = self.config["UDP_CLIENT_CONF_RETRANSMISSIONS"]
+            resends = sum(drop ** k for k in range(1, int(retries) + 1))
+            clean = np.ones(len(self.parents))
+            clean[attacker] = 0.0
+            below = self.connected & (self.topology.path_product(self.parents, clean)[0] == 0)
+            below[attacker] = False
+            cut = self.parents.copy()
+            cut[attacker] = -1
+            self._attack_extra[attacker] = self._link_traffic(cut, np.where(below, self.own * resends, 0.0))
+        return self._attack_extra[attacker]
+
+    def draw_attackers(self, count: int) -> np.ndarray:
+        """Nœuds attaquants tirés parmi les relais en vie (-1 sans relais)"""
+        relays = np.flatnonzero(np.bincount(self.parents[self.parents >= 0],
+                                            minlength=len(self.parents) + 1)[:len(self.parents)] > 0)
+        if not len(relays):
+            return np.full(count, -1, dtype=np.int64)
+        return self.rng.choice(relays, size=count)
+
+    def state_seconds(self, tx: np.ndarray, rx: np.ndarray,
+                      control_tx: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Temps (s) passé dans chaque état d'ENERGY_STATES pendant un pas
+
+        Args:
+            tx: Trames de données émises par pas, retransmissions comprises (..., n)
+            rx: Trames de données reçues par pas (..., n)
+            control_tx: DIO émis par pas (..., n), régime établi du Trickle si None
+        """
+        tx = np.asarray(tx, dtype=np.float64)
+        rx = np.asarray(rx, dtype=np.float64)
+        alive = self.alive
+        if control_tx is None:
+            control_tx = np.where(alive, self.dio_per_step, 0.0)
+        # DIO reçus : émis par les voisins (en moyenne autant que soi-même)
+        control_rx = control_tx * self.degree
+
+        busy_tx = tx * self.unicast_time + rx * self.ack_time + control_tx * self.broadcast_time
+        busy_rx = rx * self.data_rx_time + control_rx * self.control_rx_time
+        listen = np.where(alive, self.listen_time, 0.0)
+        # Radio saturée : les temps sont ramenés à la durée du pas
+        scale = np.minimum(1.0, self.step / np.maximum(busy_tx + busy_rx + listen, 1e-12))
+
+        cpu = np.where(alive, self.timers_per_step * self.config["CPU_PER_TIMER"], 0.0)
+        cpu = np.minimum(cpu + (tx + rx + control_tx + control_rx) * self.config["CPU_PER_PACKET"], self.step)
+        return {
+            "cpu": cpu,
+            "lpm": np.where(alive, self.step - cpu, 0.0),
+            "listen": listen * scale,
+            "tx": busy_tx * scale,
+            "rx": busy_rx * scale,
+        }
+
+    def control_frame_charge(self):
+        """Charge (mAh) d'un DIO/DIS diffusé, côté émetteur et côté récepteur"""
+        cpu = self.currents["cpu"] * self.config["CPU_PER_PACKET"]
+        tx = self.currents["tx"] * self.broadcast_time + cpu
+        rx = self.currents["rx"] * self.control_rx_time + cpu
+        return tx / 3600.0, rx / 3600.0
+
+    def charge_mah(self, seconds: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Charge consommée (mAh) par état, et "total" : courant (mA) × durée (h)"""
+        charge = {state: self.currents[state] * seconds[state] / 3600.0 for state in ENERGY_STATES}
+        charge["total"] = sum(charge.values())
+        return charge
+
+    def charge_profile(self, attackers: Sequence[int]):
+        """
+        Charge consommée par pas selon l'attaque en cours, avec les routes courantes
+
+        Les pas ne diffèrent que par l'attaquant actif : la charge est calculée
+        une fois par situation distincte (sans attaque, puis chaque attaquant)
+        et chaque pas la désigne par un indice.
+
+        Args:
+            attackers: Nœud attaquant de chaque pas, -1 sans attaque (num_steps,)
+
+        Returns:
+            (états d'ENERGY_STATES et "total" -> tableau (situations, n) en mAh,
+            indice de la situation de chaque pas (num_steps,))
+        """
+        attackers = np.asarray(attackers, dtype=np.int64)
+        distinct, index = np.unique(np.concatenate([[-1], attackers]), return_inverse=True)
+        tx = np.tile(self.tx, (len(distinct), 1))
+        rx = np.tile(self.rx, (len(distinct), 1))
+        for row, attacker in enumerate(distinct.tolist()):
+            if attacker >= 0:
+                extra_tx, extra_rx = self.attack_traffic(attacker)
+                tx[row] += extra_tx
+                rx[row] += extra_rx
+        return self.charge_mah(self.state_seconds(tx, rx)), index[1:]
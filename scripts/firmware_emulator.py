@@ -0,0 +1,613 @@
+#!/usr/bin/env python3
+"""
+Émulateur de la logique firmware RPL-AER (sans Cooja)
+Reproduit rpl-aer.c, mcs_calculator.c, trust_module.c, harvest_module.c et
+attack_detector.c pour tous les nœuds à la fois, cadencés par les mêmes
+temporisateurs, et émet les mêmes traces [MCS]/[HARVEST]/[ATTACK]/[FP]
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, IO, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from dodag import DodagTopology, link_prr, link_rssi
+from generate_csc import CSCGenerator
+from irradiance import load_profile, profile_params
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+FIRMWARE_SOURCES = ("project-conf.h", "rpl-aer.h", "udp-client.c")
+
+# Paramètres absents des #define : constantes internes du firmware
+# (rpl_aer_energy_init, poids de trust_module_compute) et modèle du
+# réseau normalement fourni par Cooja (radio UDGM, coût des trames)
+EMULATOR_DEFAULTS = {
+    "CONSUMPTION_RATE": 0.1,            # rpl_aer_energy_init
+    "TRUST_DIRECT_WEIGHT": 0.4,         # ACK (confiance directe)
+    "TRUST_INDIRECT_WEIGHT": 0.3,       # relayage (confiance indirecte)
+    "TRUST_BEHAVIORAL_WEIGHT": 0.3,     # cohérence du rang
+    "RADIO_RANGE": 150.0,               # m
+    "PATH_LOSS_EXPONENT": 2.2,
+    "RSSI_NOISE": 3.0,                  # dB
+    "HOP_DELAY_MS": 15.0,
+    "QUEUE_DELAY_MS": 20.0,             # ms par paquet/s relayé par le parent
+    "TX_ENERGY": 0.02,                  # mWh par transmission
+    "RX_ENERGY": 0.01,                  # mWh par réception
+    "SELECTIVE_FORWARDING_DROP": 0.5,   # part des paquets écartés
+    # Indicateurs observés sur le parent (moyenne, écart-type gaussiens)
+    "SINKHOLE_ACK_MEAN": 0.15,          # ratio d'ACK vers un sinkhole
+    "SINKHOLE_ACK_STD": 0.10,
+    "ACK_STD": 0.05,                    # autour du succès du lien sinon
+    "SINKHOLE_FORWARDING_MEAN": 0.30,   # taux de relayage
+    "SELECTIVE_FORWARDING_MEAN": 0.55,
+    "ATTACK_FORWARDING_STD": 0.15,
+    "FORWARDING_MEAN": 0.95,
+    "FORWARDING_STD": 0.03,
+    "SINKHOLE_RANK_MEAN": 0.82,         # cohérence du rang
+    "SINKHOLE_RANK_STD": 0.06,
+    "RANK_MEAN": 0.97,
+    "RANK_STD": 0.02,
+}
+
+# Codes d'attaque de rpl-aer.h
+ATTACK_NONE, ATTACK_SINKHOLE, ATTACK_SELECTIVE_FORWARDING = 0, 1, 2
+
+RECORD_TYPES = ("MCS", "HARVEST", "ATTACK", "FP", "TRUST_ANOMALY", "PERF")
+
+# Fonctions objectif de choix du parent, comparables dans un même appel à run()
+OBJECTIVE_FUNCTIONS = ("mcs", "etx", "energy", "security")
+# Pénalité du score d'un parent soupçonné (fonction objectif "security")
+SUSPECT_PENALTY = 1e6
+
+_DEFINE = re.compile(r"^\s*#define\s+(\w+)\s+(.+?)\s*$")
+_NUMERIC_EXPRESSION = re.compile(r"^[0-9.eE+\-*/() ]+$")
+
+
+def read_firmware_defines(sources: Sequence[str] = FIRMWARE_SOURCES,
+                          root: str = REPO_ROOT) -> Dict[str, float]:
+    """
+    Lit les #define numériques des sources du firmware
+
+    Les suffixes flottants (0.4f) sont retirés et CLOCK_SECOND vaut 1 :
+    les intervalles des temporisateurs sont donc exprimés en secondes.
+    """
+    defines: Dict[str, float] = {}
+    for name in sources:
+        with open(os.path.join(root, name), "r", encoding="utf-8") as f:
+            for line in f:
+                match = _DEFINE.match(line.split("//")[0])
+                if match is None:
+                    continue
+                expression = re.sub(r"(\d)[fFuUlL]+\b", r"\1", match.group(2))
+                expression = expression.replace("CLOCK_SECOND", "1")
+                if not _NUMERIC_EXPRESSION.match(expression):
+                    continue
+                try:
+                    defines[match.group(1)] = float(eval(expression, {"__builtins__": {}}))
+                except (SyntaxError, ZeroDivisionError):
+                    continue
+    return defines
+
+
+def _clip01(values: np.ndarray) -> np.ndarray:
+    return np.clip(values, 0.0, 1.0)
+
+
+class FirmwareEmulator:
+    def __init__(self, num_clients: int = 39, simulation_duration: int = 3600,
+                 config: Optional[Dict[str, float]] = None,
+                 solar_ratio: float = 0.3, mobile_ratio: float = 0.3,
+                 area_size=(500, 500), sink_position=(50, 50), layout: str = "uniform",
+                 start_time: float = 8 * 3600, random_seed: int = 12345):
+        """
+        Prépare l'émulation d'un scénario identique à celui de generate_csc.py
+
+        Args:
+            num_clients: Nombre de nœuds clients
+            simulation_duration: Durée simulée en secondes
+            config: Valeurs remplaçant les #define (ex. {"NRE_WEIGHT": 0.5})
+                    ou les paramètres de EMULATOR_DEFAULTS
+            solar_ratio: Ratio de nœuds solaires
+            mobile_ratio: Ratio de nœuds mobiles
+            layout: Disposition des nœuds ("uniform", "poisson", "clustered")
+            start_time: Heure de début (secondes depuis minuit) pour l'irradiance
+            random_seed: Graine du scénario et des tirages
+        """
+        self.config = read_firmware_defines()
+        self.config.update(EMULATOR_DEFAULTS)
+        for key, value in (config or {}).items():
+            if key not in self.config:
+                raise ValueError(f"Paramètre inconnu: {key}")
+            self.config[key] = float(value)
+
+        self.num_nodes = num_clients
+        self.simulation_duration = int(simulation_duration)
+        self.start_time = start_time
+        self.random_seed = random_seed
+
+        self.scenario = CSCGenerator(num_clients=num_clients, solar_ratio=solar_ratio,
+                                     mobile_ratio=mobile_ratio, area_size=area_size,
+                                     sink_position=sink_position, random_seed=random_seed,
+                                     simulation_duration=simulation_duration, layout=layout,
+                                     radio_range=self.config["RADIO_RANGE"])
+        self.positions = self.scenario.generate_positions()
+        self.mote_ids = np.arange(1, num_clients + 1)
+        self.is_solar, self.is_mobile = self.scenario.mote_types(self.mote_ids)
+        # Identifiants Cooja : le sink est le nœud 1, le client k le nœud k + 1
+        self.cooja_ids = self.mote_ids + 1
+        self.topology = DodagTopology(self.positions, sink_position, self.config["RADIO_RANGE"])
+
+    def periods(self) -> Dict[str, int]:
+        """Périodes des temporisateurs du firmware, en secondes"""
+        c = self.config
+        return {
+            "energy": int(c["RPL_AER_ENERGY_UPDATE_INTERVAL"]),
+            "security": int(c["RPL_AER_SECURITY_UPDATE_INTERVAL"]),
+            "mcs": int(c["RPL_AER_MCS_UPDATE_INTERVAL"]),
+            "performance": int(c["RPL_AER_PERFORMANCE_UPDATE_INTERVAL"]),
+            "solar": int(c["SOLAR_UPDATE_INTERVAL"]),
+        }
+
+    def prepare(self) -> Dict[str, np.ndarray]:
+        """
+        Calcule les entrées indépendantes des poids MCS
+
+        Profil d'irradiance (cache partagé) et tirages de rpl_aer_detect_attacks
+        à chaque période de sécurité. Ces traces peuvent être réutilisées par
+        plusieurs appels à run().
+        """
+        c = self.config
+        periods = self.periods()
+        params = profile_params(self.num_nodes, math.ceil(self.simulation_duration / periods["solar"]) + 1,
+                                step=periods["solar"], start_time=self.start_time,
+                                panel_efficiency=c["SOLAR_PANEL_EFFICIENCY"], seed=self.random_seed)
+        profile = np.asarray(load_profile(params))
+
+        # random_rand() % 100 comparé aux seuils de rpl_aer_detect_attacks
+        rng = np.random.default_rng([self.random_seed, 0])
+        draws = rng.integers(0, 100, size=(self.simulation_duration // periods["security"], self.num_nodes),
+                             dtype=np.uint8)
+        attack_state = np.full(draws.shape, ATTACK_NONE, dtype=np.int8)
+        second = (c["ATTACK_PROBABILITY"] + c["SELECTIVE_FORWARDING_PROBABILITY"]) * 100
+        attack_state[draws < second] = ATTACK_SELECTIVE_FORWARDING
+        attack_state[draws < c["ATTACK_PROBABILITY"] * 100] = ATTACK_SINKHOLE
+
+        return {
+            "harvestable": profile,
+            "solar_factor": profile / max(params["peak_irradiance"] * params["panel_efficiency"], 1e-9),
+            "attack_state": attack_state,
+        }
+
+    def _link_quality(self, distance: np.ndarray):
+        """Succès par saut (avec retransmissions), transmissions attendues et RSSI moyen"""
+        prr = link_prr(distance, self.config["RADIO_RANGE"])
+        attempts = 1 + self.config["UDP_CLIENT_CONF_RETRANSMISSIONS"]
+        success = 1.0 - (1.0 - prr) ** attempts
+        transmissions = np.where(prr > 0, success / np.maximum(prr, 1e-12), attempts)
+        return success, transmissions, link_rssi(distance, self.config["PATH_LOSS_EXPONENT"])
+
+    def run(self, weights=None, traces: Optional[Dict[str, np.ndarray]] = None,
+            log: Optional[IO[str]] = None, record_indicators: bool = False,
+            objectives: Optional[Sequence[str]] = None) -> Dict:
+        """
+        Exécute l'émulation pour un ou plusieurs jeux de poids (NRE, PEC, ECS)
+
+        Tous les lots partagent les mêmes tirages (irradiance, attaques, bruit
+        des indicateurs) : leurs écarts ne viennent que du routage.
+
+        Args:
+            weights: Poids (3,) ou lot (W, 3) ; ceux de project-conf.h par défaut
+            traces: Résultat de prepare() (recalculé si absent)
+            log: Flux recevant les traces au format Cooja (un seul jeu de poids)
+            record_indicators: Conserver les indicateurs observés et leur
+                               vérité terrain (premier jeu de poids)
+            objectives: Fonction objectif de chaque lot parmi OBJECTIVE_FUNCTIONS
+                        ("mcs" par défaut) : MCS pondéré, ETX du chemin
+                        (MRHOF), énergie résiduelle seule, ou confiance des
+                        parents avec abandon immédiat d'un parent soupçonné
+
+        Returns:
+            Dictionnaire de métriques, chaque valeur ayant une entrée par jeu de poids
+        """
+        c = self.config
+        if weights is None:
+            weights = (c["NRE_WEIGHT"], c["PEC_WEIGHT"], c["ECS_WEIGHT"])
+        weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+        if objectives is None:
+            objectives = ("mcs",) * len(weights)
+        elif isinstance(objectives, str):
+            objectives = (objectives,) * len(weights)
+        if len(weights) == 1:
+            weights = np.repeat(weights, len(objectives), axis=0)
+        if len(objectives) != len(weights):
+            raise ValueError("Une fonction objectif par jeu de poids est attendue")
+        unknown = sorted(set(objectives) - set(OBJECTIVE_FUNCTIONS))
+        if unknown:
+            raise ValueError(f"Fonction objectif inconnue: {', '.join(unknown)}")
+        objectives = np.asarray(objectives)
+        rows = {name: np.nonzero(objectives == name)[0] for name in OBJECTIVE_FUNCTIONS}
+        batch, n = len(weights), self.num_nodes
+        if log is not None and batch > 1:
+            raise ValueError("Les traces ne peuvent être émises que pour un seul jeu de poids")
+        if traces is None:
+            traces = self.prepare()
+        periods = self.periods()
+        topology = self.topology
+
+        total = c["BATTERY_CAPACITY"] * 3.7
+        base_consumption = math.floor(np.float32(c["CONSUMPTION_RATE"]) * np.float32(10))
+        window = int(c["LSTM_WINDOW_SIZE"])
+        send_rate = 1.0 / c["UDP_CLIENT_INTERVAL"]
+        thresholds = (c["RSSI_THRESHOLD"], c["ACK_RATIO_THRESHOLD"], c["FORWARDING_RATIO_THRESHOLD"],
+                      c["RANK_CONSISTENCY_THRESHOLD"])
+        trust_weights = (c["TRUST_DIRECT_WEIGHT"], c["TRUST_INDIRECT_WEIGHT"], c["TRUST_BEHAVIORAL_WEIGHT"])
+
+        residual = np.full((batch, n), total)
+        history = np.full((batch, n, window), 0.5)
+        history_index = 0
+        alive = np.ones((batch, n), dtype=bool)
+        death_time = np.full((batch, n), np.nan)
+        stored = np.zeros((batch, n))
+        harvested_j = np.zeros((batch, n))
+        consumed_j = np.zeros((batch, n))
+        previous_trust = np.full((batch, n), np.nan)
+        attack_state = np.zeros(n, dtype=np.int8)
+        mcs = np.zeros((batch, n))
+        score = np.zeros((batch, n))
+        reputation = np.ones((batch, n))
+        suspect = np.zeros((batch,) + topology.candidates.shape, dtype=bool)
+        link_etx = 1.0 / np.maximum(link_prr(topology.candidate_distance, c["RADIO_RANGE"]), 1e-3)
+
+        def choose_parents(lots: np.ndarray) -> np.ndarray:
+            chosen = topology.select_parents(score[lots], alive[lots], -SUSPECT_PENALTY * suspect[lots])
+            etx = np.isin(lots, rows["etx"])
+            if etx.any():
+                chosen[etx] = topology.select_min_cost(link_etx, alive[lots[etx]])[0]
+            return chosen
+
+        parents = choose_parents(np.arange(batch))
+
+        sent = np.zeros(batch)
+        energy_used = np.zeros(batch)
+        delivered = np.zeros(batch)
+        latency_sum = np.zeros(batch)
+        window_sent = np.zeros(batch)
+        window_delivered = np.zeros(batch)
+        window_latency = np.zeros(batch)
+        confusion = {key: np.zeros(batch, dtype=np.int64) for key in ("tp", "fp", "fn", "tn")}
+        records = {key: np.zeros(batch, dtype=np.int64) for key in RECORD_TYPES}
+        attack_count = 0
+        indicators: Dict[str, List[np.ndarray]] = {}
+
+        def emit(t: int, ids: np.ndarray, lines: List[str]):
+            if log is not None and lines:
+                stamp = t * 1000
+                log.writelines(f"{stamp}\tID:{i}\t{line}\n" for i, line in zip(ids.tolist(), lines))
+
+        for t in range(1, self.simulation_duration + 1):
+            solar_step = min(t // periods["solar"], len(traces["harvestable"]) - 1)
+
+            if t % periods["energy"] == 0:
+                dt = periods["energy"]
+                distance = topology.parent_distance(parents)
+                hop_success, transmissions, _ = self._link_quality(distance)
+                routed = parents >= 0
+                own = alive * send_rate
+                load = topology.accumulate_load(parents, own * routed)
+
+                # rpl_aer_energy_update : consommation fixe plus le trafic
+                # émis (retransmissions comprises) et reçu pour les enfants
+                relayed = load[:, :n] - own * routed
+                consumption = base_consumption + dt * (
+                    load[:, :n] * transmissions * c["TX_ENERGY"] + relayed * c["RX_ENERGY"])
+                consumption = np.where(alive, consumption, 0.0)
+                depleted = alive & (residual <= consumption)
+                death_time[depleted] = t
+                alive &= ~depleted
+                residual -= np.where(alive, consumption, 0.0)
+
+                harvest = np.floor(traces["harvestable"][solar_step] * 0.01) * self.is_solar
+                harvest = np.where(alive, harvest, 0.0)
+                residual = np.minimum(residual + harvest, total)
+                harvested_j += harvest * 3.6
+                consumed_j += consumption * 3.6
+                energy_used += consumption.sum(axis=1)
+
+                history[:, :, history_index] = residual / total
+                history_index = (history_index + 1) % window
+
+                # Livraison de bout en bout : succès des sauts, paquets
+                # écartés par un parent malveillant, délai de file d'attente
+                parent_state = np.where((parents >= 0) & (parents < n),
+                                        attack_state[np.minimum(np.maximum(parents, 0), n - 1)], ATTACK_NONE)
+                forwarded = np.select([parent_state == ATTACK_SINKHOLE,
+                                       parent_state == ATTACK_SELECTIVE_FORWARDING],
+                                      [0.0, 1.0 - c["SELECTIVE_FORWARDING_DROP"]], 1.0)
+                success = topology.path_product(parents, hop_success * forwarded)
+                parent_load = np.take_along_axis(load, np.maximum(parents, 0), axis=1)
+                parent_load = np.where(parents == topology.sink_index, 0.0, parent_load)
+                latency = topology.path_sum(parents, c["HOP_DELAY_MS"] * transmissions
+                                            + c["QUEUE_DELAY_MS"] * parent_load)
+
+                generated = own * dt
+                arrived = generated * success
+                window_sent += generated.sum(axis=1)
+                window_delivered += arrived.sum(axis=1)
+                window_latency += np.where(arrived > 0, arrived * latency, 0.0).sum(axis=1)
+
+            if t % periods["security"] == 0:
+                tick = t // periods["security"] - 1
+                attack_state = traces["attack_state"][min(tick, len(traces["attack_state"]) - 1)]
+                attack_count += int(np.count_nonzero(attack_state))
+
+                noise_rng = np.random.default_rng([self.random_seed, 1, tick])
+                z_ack, z_fwd, z_rank, z_rssi = noise_rng.standard_normal((4, n))
+                u_ack = noise_rng.random(n)
+
+                observed = alive & (parents >= 0)
+                parent_state = np.where((parents >= 0) & (parents < n),
+                                        attack_state[np.minimum(np.maximum(parents, 0), n - 1)], ATTACK_NONE)
+                sinkhole = parent_state == ATTACK_SINKHOLE
+                selective = parent_state == ATTACK_SELECTIVE_FORWARDING
+                hop_success, _, rssi_mean = self._link_quality(topology.parent_distance(parents))
+
+                # Indicateurs de trust_attack_indicators_t vus par chaque nœud sur son parent
+                ack_ratio = _clip01(np.where(sinkhole, c["SINKHOLE_ACK_MEAN"] + c["SINKHOLE_ACK_STD"] * z_ack,
+                                             hop_success + c["ACK_STD"] * z_ack))
+                attack_fwd = c["ATTACK_FORWARDING_STD"] * z_fwd
+                forwarding = _clip01(np.select([sinkhole, selective],
+                                               [c["SINKHOLE_FORWARDING_MEAN"] + attack_fwd,
+                                                c["SELECTIVE_FORWARDING_MEAN"] + attack_fwd],
+                                               c["FORWARDING_MEAN"] + c["FORWARDING_STD"] * z_fwd))
+                rank = _clip01(np.where(sinkhole, c["SINKHOLE_RANK_MEAN"] + c["SINKHOLE_RANK_STD"] * z_rank,
+                                        c["RANK_MEAN"] + c["RANK_STD"] * z_rank))
+                rssi = rssi_mean + c["RSSI_NOISE"] * z_rssi
+                ack = u_ack < ack_ratio
+
+                # detect_attack, trust_module_anomaly_detect et report_attack_event
+                sinkhole_alarm = observed & (ack_ratio < thresholds[1])
+                rules = np.stack([rssi < thresholds[0], ~ack, forwarding < thresholds[2], rank < thresholds[3]])
+                anomaly = observed & rules.any(axis=0)
+                confidence = rules.mean(axis=0)
+                reported = anomaly & (confidence >= c["ATTACK_CONFIDENCE_THRESHOLD"])
+                false_alarm = anomaly & ~reported
+
+                trust = trust_weights[0] * ack_ratio + trust_weights[1] * forwarding + trust_weights[2] * rank
+                variation = np.nan_to_num(np.abs(trust - previous_trust))
+                previous_trust = np.where(observed, trust, np.nan)
+                trust_anomaly = observed & (variation > c["TRUST_VARIATION_THRESHOLD"])
+
+                label = observed & (parent_state != ATTACK_NONE)
+                detected = sinkhole_alarm | reported
+                confusion["tp"] += (detected & label).sum(axis=1)
+                confusion["fp"] += (detected & observed & ~label).sum(axis=1)
+                confusion["fn"] += (~detected & label).sum(axis=1)
+                confusion["tn"] += (~detected & observed & ~label).sum(axis=1)
+                records["ATTACK"] += sinkhole_alarm.sum(axis=1) + reported.sum(axis=1)
+                records["FP"] += false_alarm.sum(axis=1)
+                records["TRUST_ANOMALY"] += trust_anomaly.sum(axis=1)
+
+                secure = rows["security"]
+                if len(secure):
+                    # Réputation : confiance moyenne vue par les enfants de
+                    # chaque parent ; le parent soupçonné est quitté aussitôt
+                    seen = observed & (parents < n)
+                    flat = (np.arange(batch)[:, None] * n + parents)[seen]
+                    trust_sum = np.bincount(flat, weights=trust[seen], minlength=batch * n).reshape(batch, n)
+                    children = np.bincount(flat, minlength=batch * n).reshape(batch, n)
+                    reputation = np.where(children > 0, 0.7 * reputation + 0.3 * trust_sum / np.maximum(children, 1),
+                                          reputation)
+                    score[secure] = reputation[secure]
+                    doubted = detected[secure] & (parents[secure] >= 0) & (parents[secure] < n)
+                    suspect[secure] = (topology.candidates[None] == parents[secure][..., None]) & doubted[..., None]
+                    parents[secure] = choose_parents(secure)
+
+                if record_indicators:
+                    keep = observed[0]
+                    for key, values in (("ack_ratio", ack_ratio), ("forwarding_rate", forwarding),
+                                        ("rssi", rssi), ("rank_consistency", rank), ("ack", ack),
+                                        ("attack_state", parent_state)):
+                        indicators.setdefault(key, []).append(np.asarray(values[0])[keep])
+                    indicators.setdefault("time", []).append(np.full(int(keep.sum()), t, dtype=np.int32))
+
+                if log is not None:
+                    kinds = np.where(rules[1] | rules[3], "Sinkhole",
+                                     np.where(rules[2], "Selective Forwarding", "RSSI anomaly"))
+                    for mask, render in (
+                            (trust_anomaly[0], lambda i: "[TRUST_ANOMALY] trust_variation=%.2f" % variation[0, i]),
+                            (sinkhole_alarm[0], lambda i: "[ATTACK] Sinkhole detected (ack_ratio=%.2f)" % ack_ratio[0, i]),
+                            (reported[0], lambda i: "[ATTACK] %s detected (confidence=%.2f)" % (kinds[0, i], confidence[0, i])),
+                            (false_alarm[0], lambda i: "[FP] False positive: %s (confidence=%.2f)" % (kinds[0, i], confidence[0, i]))):
+                        index = np.nonzero(mask)[0]
+                        emit(t, self.cooja_ids[index], [render(i) for i in index])
+
+            if t % periods["mcs"] == 0:
+                # rpl_aer_calculate_mcs puis choix du parent de meilleur MCS
+                nre = residual / total
+                pec = 1.0 - history.mean(axis=2)
+                weather = np.where(self.is_solar, 0.8 + 0.2 * traces["solar_factor"][solar_step],
+                                   c["ECS_WEATHER_FACTOR"])
+                ecs = np.broadcast_to(weather * np.where(self.is_mobile, 0.6, c["ECS_MOBILITY_FACTOR"]), (batch, n))
+                mcs = weights[:, 0:1] * nre + weights[:, 1:2] * pec + weights[:, 2:3] * ecs
+                score = mcs.copy()
+                score[rows["energy"]] = nre[rows["energy"]]
+                score[rows["security"]] = reputation[rows["security"]]
+                parents = choose_parents(np.arange(batch))
+                records["MCS"] += alive.sum(axis=1)
+
+                if log is not None:
+                    # Format de mcs_calculator_log, appliqué aux critères NRE/PEC/ECS
+                    index = np.nonzero(alive[0])[0]
+                    w = weights[0]
+                    emit(t, self.cooja_ids[index], [
+                        "[MCS] MCS=%.3f | NRE=%.3f | ETXnorm=%.3f | Trust=%.3f | α=%.2f β=%.2f γ=%.2f"
+                        % (mcs[0, i], nre[0, i], pec[0, i], ecs[0, i], w[0], w[1], w[2]) for i in index])
+
+            if t % periods["solar"] == 0:
+                # update_harvested_energy sur la période écoulée
+                stored = np.maximum(stored + harvested_j - consumed_j, 0.0)
+                records["HARVEST"] += alive.sum(axis=1)
+                if log is not None:
+                    index = np.nonzero(alive[0])[0]
+                    emit(t, self.cooja_ids[index], [
+                        "[HARVEST] psolar=%.2fJ, stored=%.2fJ, consumed=%.2fJ"
+                        % (harvested_j[0, i], stored[0, i], consumed_j[0, i]) for i in index])
+                harvested_j[:] = 0.0
+                consumed_j[:] = 0.0
+
+            if t % periods["performance"] == 0:
+                pdr = np.divide(window_delivered, window_sent, out=np.zeros(batch), where=window_sent > 0)
+                mean_latency = np.divide(window_latency, window_delivered, out=np.zeros(batch),
+                                         where=window_delivered > 0)
+                records["PERF"] += 1
+                emit(t, np.array([1]), ["[PERF] PDR=%.2f%% Latency=%.2fms Throughput=%.2fpkts/s"
+                                        % (pdr[0] * 100, mean_latency[0],
+                                           window_delivered[0] / periods["performance"])])
+                sent += window_sent
+                delivered += window_delivered
+                latency_sum += window_latency
+                window_sent[:] = window_delivered[:] = window_latency[:] = 0.0
+
+        sent += window_sent
+        delivered += window_delivered
+        latency_sum += window_latency
+
+        # Durée de vie projetée : énergie nette consommée extrapolée
+        drained = total - residual
+        projected = np.where(drained > 0, self.simulation_duration * total / np.maximum(drained, 1e-12), np.inf)
+        projected = np.where(np.isnan(death_time), projected, death_time)
+
+        tp, fp, fn, tn = (confusion[k].astype(np.float64) for k in ("tp", "fp", "fn", "tn"))
+        precision = np.divide(tp, tp + fp, out=np.zeros(batch), where=(tp + fp) > 0)
+        recall = np.divide(tp, tp + fn, out=np.zeros(batch), where=(tp + fn) > 0)
+        results = {
+            "weights": weights,
+            "objective": objectives,
+            "pdr": np.divide(delivered, sent, out=np.zeros(batch), where=sent > 0),
+            "latency_ms": np.divide(latency_sum, delivered, out=np.zeros(batch), where=delivered > 0),
+            "lifetime": projected.min(axis=1),
+            "median_lifetime": np.median(projected, axis=1),
+            "network_lifetime": np.percentile(projected, 20, axis=1, method="lower"),
+            "first_death": np.where(np.isnan(death_time), np.inf, death_time).min(axis=1),
+            "alive_fraction": alive.mean(axis=1),
+            "residual_energy": residual.mean(axis=1),
+            "throughput": delivered / (self.simulation_duration / 60.0) / n,
+            "energy_per_packet": np.divide(energy_used, delivered, out=np.full(batch, np.inf), where=delivered > 0),
+            "attacks": np.full(batch, attack_count),
+            "precision": precision,
+            "recall": recall,
+            "f1": np.divide(2 * precision * recall, precision + recall, out=np.zeros(batch),
+                            where=(precision + recall) > 0),
+            "fpr": np.divide(fp, fp + tn, out=np.zeros(batch), where=(fp + tn) > 0),
+        }
+        results.update({f"records_{key.lower()}": value for key, value in records.items()})
+        if record_indicators:
+            results["indicators"] = {key: np.concatenate(values) if values else np.empty(0)
+                                     for key, values in indicators.items()}
+        return results
+
+
+def summarize(results: Dict, index: int = 0) -> Dict:
+    """Ligne de résultats scalaires d'un jeu de poids"""
+    row = {}
+    for key, value in results.items():
+        if key == "indicators":
+            continue
+        if key == "weights":
+            row.update(zip(("nre_weight", "pec_weight", "ecs_weight"), value[index].tolist()))
+        elif key == "objective":
+            row[key] = str(value[index])
+        else:
+            row[key] = float(value[index])
+    return row
+
+
+def _screen_one(config: Dict, num_clients: int, simulation_duration: int, random_seed: int) -> Dict:
+    emulator = FirmwareEmulator(num_clients=num_clients, simulation_duration=simulation_duration,
+                                config=config, random_seed=random_seed)
+    row = dict(config)
+    row.update(summarize(emulator.run()))
+    return row
+
+
+def screen_configurations(configs: List[Dict], num_clients: int = 39, simulation_duration: int = 3600,
+                          random_seed: int = 12345, workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    Émule une liste de configurations (surcharges de #define) et compare les résultats
+
+    Chaque configuration est émulée sur le même scénario ; avec workers > 1,
+    les émulations sont réparties sur un pool de processus.
+    """
+    count = len(configs)
+    args = ([num_clients] * count, [simulation_duration] * count, [random_seed] * count)
+    if not workers or workers <= 1:
+        rows = list(map(_screen_one, configs, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rows = list(pool.map(_screen_one, configs, *args))
+    return pd.DataFrame(rows)
+
+
+def _parse_assignment(text: str):
+    key, _, value = text.partition("=")
+    if not value:
+        raise argparse.ArgumentTypeError(f"Format attendu NOM=VALEUR: {text}")
+    return key.strip(), float(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Émulateur de la logique firmware RPL-AER")
+    parser.add_argument("-n", "--nodes", type=int, default=39,
+                       help="Nombre de nœuds clients (défaut: 39)")
+    parser.add_argument("-d", "--duration", type=int, default=3600,
+                       help="Durée simulée en secondes (défaut: 3600)")
+    parser.add_argument("-s", "--seed", type=int, default=12345,
+                       help="Graine aléatoire (défaut: 12345)")
+    parser.add_argument("--set", type=_parse_assignment, action="append", default=[],
+                       metavar="NOM=VALEUR", help="Remplace un #define (répétable)")
+    parser.add_argument("--log", type=str, default=None,
+                       help="Fichier recevant les traces au format Cooja")
+    parser.add_argument("--indicators", type=str, default=None,
+                       help="Fichier .npz recevant le flux d'indicateurs étiqueté")
+    parser.add_argument("--screen", type=str, default=None,
+                       help="Fichier JSON listant des configurations à comparer")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                       help="Nombre de processus pour --screen (défaut: un seul)")
+    parser.add_argument("-o", "--output", type=str, default=None,
+                       help="Fichier CSV des résultats de --screen")
+    args = parser.parse_args()
+
+    overrides = dict(args.set)
+    if args.screen:
+        with open(args.screen, "r", encoding="utf-8") as f:
+            configs = [{**overrides, **config} for config in json.load(f)]
+        table = screen_configurations(configs, args.nodes, args.duration, args.seed, args.workers)
+        if args.output:
+            table.to_csv(args.output, index=False)
+        print(table.to_string(index=False))
+        return
+
+    emulator = FirmwareEmulator(num_clients=args.nodes, simulation_duration=args.duration,
+                                config=overrides, random_seed=args.seed)
+    record = args.indicators is not None
+    if args.log:
+        with open(args.log, "w", encoding="utf-8", buffering=1 << 20) as log:
+            results = emulator.run(log=log, record_indicators=record)
+        print(f"Traces écrites dans {args.log}")
+    else:
+        results = emulator.run(record_indicators=record)
+    if record:
+        np.savez(args.indicators, **results["indicators"])
+        print(f"Flux d'indicateurs écrit dans {args.indicators}")
+    for key, value in summarize(results).items():
+        print(f"{key}: {value:.4f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,16 @@ Usage: python3 generate_csc.py [options]
 """
 
 import argparse
+import io
 import random
-import math
 import sys
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from csc_writer import CSCStreamWriter, ENERGY_TYPES, MOBILITY_TYPES
+from mobility_traces import MOBILITY_PAUSE_TIME, MOBILITY_SPEED, MobilityTraces, generate_random_waypoint
+from placement import LAYOUTS, generate_layout
 
 class CSCGenerator:
     def __init__(self,
@@ -17,7 +23,12 @@ class CSCGenerator:
                  area_size: Tuple[float, float] = (500, 500),
                  sink_position: Tuple[float, float] = (50, 50),
                  random_seed: int = 12345,
-                 simulation_duration: int = 3600):
+                 simulation_duration: int = 3600,
+                 layout: str = "uniform",
+                 min_spacing: float = 0.0,
+                 num_clusters: int = 5,
+                 cluster_std: float = 40.0,
+                 radio_range: Optional[float] = None):
         """
         Initialise le script de fichiers .csc
 
@@ -28,6 +39,12 @@ class CSCGenerator:
             area_size: Taille de la zone de simulation (width, height)
             sink_position: Position du nœud sink (x, y)
             simulation_duration: Durée de simulation en secondes
+            layout: Disposition des nœuds ("uniform", "poisson", "clustered")
+            min_spacing: Distance minimale entre nœuds (disposition "poisson")
+            num_clusters: Nombre de grappes (disposition "clustered")
+            cluster_std: Écart-type des grappes en mètres (disposition "clustered")
+            radio_range: Portée radio ; si fournie, la topologie générée
+                         garantit que chaque nœud atteint le sink
         """
         self.num_clients = num_clients
         self.solar_ratio = solar_ratio
@@ -36,6 +53,13 @@ class CSCGenerator:
         self.sink_position = sink_position
         self.random_seed = random_seed
         self.simulation_duration = simulation_duration
+        self.layout = layout
+        self.min_spacing = min_spacing
+        self.num_clusters = num_clusters
+        self.cluster_std = cluster_std
+        self.radio_range = radio_range
+        self.positions = None
+        self.mobility_positions = None
 
         # Calcul des nombres de nœuds par type
         self.num_solar = int(num_clients * solar_ratio)
@@ -44,146 +68,87 @@ class CSCGenerator:
         # Initialisation du script aléatoire
         random.seed(random_seed)
 
-    def generate_random_position(self, min_distance: float = 20.0) -> Tuple[float, float]:
-        """Génère une position aléatoire avec distance minimale du sink"""
-        while True:
-            x = random.uniform(0, self.area_size[0])
-            y = random.uniform(0, self.area_size[1])
-
-            # Vérifier la distance minimale du sink
-            distance = math.sqrt((x - self.sink_position[0])**2 + (y - self.sink_position[1])**2)
-            if distance >= min_distance:
-                return (x, y)
+    def generate_positions(self, min_distance: float = 20.0):
+        """Génère les positions de tous les clients (distance minimale du sink incluse)"""
+        self.positions = generate_layout(
+            self.num_clients, self.area_size, self.sink_position,
+            layout=self.layout,
+            seed=self.random_seed,
+            min_sink_distance=min_distance,
+            min_spacing=self.min_spacing,
+            num_clusters=self.num_clusters,
+            cluster_std=self.cluster_std,
+            radio_range=self.radio_range
+        )
+        return self.positions
+
+    def mote_types(self, mote_ids) -> Tuple[np.ndarray, np.ndarray]:
+        """Retourne les masques (solaire, mobile) d'un ensemble de nœuds"""
+        ids = np.asarray(mote_ids)
+        return ids < self.num_solar, ids < self.num_mobile
 
     def generate_mote_attributes(self, mote_id: int) -> str:
         """Génère les attributs d'un nœud mote"""
-        # Déterminer le type d'énergie
-        if mote_id < self.num_solar:
-            energy_type = "solar"
-        else:
-            energy_type = "battery"
-
-        # Déterminer la mobilité
-        if mote_id < self.num_mobile:
-            mobility_type = "mobile"
-        else:
-            mobility_type = "static"
-
-        return f"energy={energy_type};mobility={mobility_type};type=client;id={mote_id}"
+        is_solar, is_mobile = self.mote_types(mote_id)
+        return (f"energy={ENERGY_TYPES[int(is_solar)]};mobility={MOBILITY_TYPES[int(is_mobile)]};"
+                f"type=client;id={mote_id}")
 
     def generate_client_mote(self, mote_id: int) -> str:
         """Génère le XML pour un nœud client"""
-        position = self.generate_random_position()
-        attributes = self.generate_mote_attributes(mote_id)
-
-        return f"""      <!-- Client {mote_id}: {attributes.split(';')[0].split('=')[1].title()} + {attributes.split(';')[1].split('=')[1].title()} -->
-      <mote>
-        <motetype_identifier>RPL_AER_CLIENT</motetype_identifier>
-        <interface_config>
-          <interface_class>org.contikios.cooja.interfaces.Position</interface_class>
-          <x>{position[0]:.1f}</x>
-          <y>{position[1]:.1f}</y>
-        </interface_config>
-        <interface_config>
-          <interface_class>org.contikios.cooja.interfaces.MoteAttributes</interface_class>
-          <attributes>{attributes}</attributes>
-        </interface_config>
-      </mote>"""
+        buffer = io.StringIO()
+        with CSCStreamWriter(buffer) as writer:
+            self._write_client_motes(writer, mote_id - 1, mote_id)
+        return buffer.getvalue().lstrip("\n")
+
+    def _write_client_motes(self, writer: CSCStreamWriter, start: int, stop: int):
+        if self.positions is None:
+            self.generate_positions()
+        ids = np.arange(start + 1, stop + 1)
+        is_solar, is_mobile = self.mote_types(ids)
+        writer.write_motes(ids, self.positions[start:stop], is_solar, is_mobile)
+
+    def generate_mobility_trace(self, trace_path: str, positions_path: Optional[str] = None,
+                                speed: float = MOBILITY_SPEED, pause: float = MOBILITY_PAUSE_TIME,
+                                step: float = 1.0) -> MobilityTraces:
+        """
+        Génère la trace Random Waypoint des nœuds mobiles
+
+        La trace binaire (trace_path) est réutilisable par le simulateur
+        Python ; si positions_path est fourni, elle est aussi exportée au
+        format du plugin Mobility, que le scénario .csc référence alors.
+        """
+        if self.positions is None:
+            self.generate_positions()
+
+        ids = np.arange(1, self.num_clients + 1)
+        mobile_ids = ids[self.mote_types(ids)[1]]
+        traces = generate_random_waypoint(mobile_ids, self.positions[mobile_ids - 1],
+                                          self.area_size, self.simulation_duration,
+                                          speed=speed, pause=pause, seed=self.random_seed)
+        traces.save(trace_path)
+
+        if positions_path:
+            traces.write_cooja_positions(positions_path, step=step)
+            self.mobility_positions = positions_path
+        return traces
+
+    def write_csc(self, writer: CSCStreamWriter):
+        """Écrit le scénario complet dans un CSCStreamWriter ouvert"""
+        writer.write_header(self.random_seed, self.sink_position)
+        self._write_client_motes(writer, 0, self.num_clients)
+        writer.write_footer(self.simulation_duration, self.mobility_positions)
 
     def generate_csc_content(self) -> str:
-        """Génère le contenu complet du fichier .csc"""
-        # En-tête du fichier
-        header = f'''<?xml version="1.0" encoding="UTF-8"?>
-<simconf xmlns="http://www.sics.se/contiki/cooja">
-  <simulation>
-    <title>RPL-AER Simulation (Generated)</title>
-    <randomseed>{self.random_seed}</randomseed>
-    <motedelay_us>10000</motedelay_us>
-    <radiomedium>org.contikios.cooja.radiomediums.UDGM</radiomedium>
-    <motetype>
-      <identifier>RPL_AER_CLIENT</identifier>
-      <description>RPL-AER UDP Client</description>
-      <source>udp-client.c</source>
-      <firmware>rpl-aer-client.csc</firmware>
-    </motetype>
-    <motetype>
-      <identifier>RPL_AER_SERVER</identifier>
-      <description>RPL-AER UDP Server (Sink)</description>
-      <source>rpl-aer-sink.c</source>
-      <firmware>rpl-aer-sink.csc</firmware>
-    </motetype>
-    <motes>
-      <!-- Sink node -->
-      <mote>
-        <motetype_identifier>RPL_AER_SERVER</motetype_identifier>
-        <interface_config>
-          <interface_class>org.contikios.cooja.interfaces.Position</interface_class>
-          <x>{self.sink_position[0]:.1f}</x>
-          <y>{self.sink_position[1]:.1f}</y>
-        </interface_config>
-      </mote>'''
-
-        # Génération des nœuds clients
-        client_motes = []
-        for i in range(self.num_clients):
-            client_motes.append(self.generate_client_mote(i + 1))
-
-        # Fin du fichier
-        footer = f'''
-    </motes>
-    <events>
-      <!-- Démarrage de la simulation -->
-      <event>
-        <time>0</time>
-        <command>log.log("=== RPL-AER Simulation démarrée (Generated) ===\\n");</command>
-      </event>
-      <!-- Arrêt de la simulation après {self.simulation_duration}s -->
-      <event>
-        <time>{self.simulation_duration * 1000}</time>
-        <command>log.log("=== RPL-AER Simulation terminée ===\\n"); sim.stop();</command>
-      </event>
-    </events>
-    <plugin>
-      <classname>org.contikios.cooja.plugins.LogListener</classname>
-      <plugin_config/>
-      <width>800</width>
-      <height>200</height>
-      <location_x>0</location_x>
-      <location_y>0</location_y>
-    </plugin>
-    <plugin>
-      <classname>org.contikios.cooja.plugins.PowerTracker</classname>
-      <plugin_config/>
-      <width>400</width>
-      <height>200</height>
-      <location_x>0</location_x>
-      <location_y>210</location_y>
-    </plugin>
-    <plugin>
-      <classname>org.contikios.cooja.plugins.PacketLossTracker</classname>
-      <plugin_config/>
-      <width>400</width>
-      <height>200</height>
-      <location_x>410</location_x>
-      <location_y>210</location_y>
-    </plugin>
-    <plugin>
-      <classname>org.contikios.cooja.plugins.Visualizer</classname>
-      <plugin_config/>
-      <width>800</width>
-      <height>600</height>
-      <location_x>0</location_x>
-      <location_y>420</location_y>
-    </plugin>
-  </simulation>
-</simconf>'''
-
-        return header + '\n'.join(client_motes) + footer
+        """Génère le contenu complet du fichier .csc (en mémoire, petits scénarios)"""
+        buffer = io.StringIO()
+        with CSCStreamWriter(buffer) as writer:
+            self.write_csc(writer)
+        return buffer.getvalue()
 
     def save_to_file(self, filename: str):
-        content = self.generate_csc_content()
-        with open(filename, 'w') as f:
-            f.write(content)
+        """Écrit le scénario en flux (compressé si filename se termine par .gz)"""
+        with CSCStreamWriter(filename) as writer:
+            self.write_csc(writer)
         print(f"Configuration: {self.num_clients} clients, {self.num_solar} solaires, {self.num_mobile} mobiles")
 
 def main():
@@ -201,8 +166,23 @@ def main():
     parser.add_argument("-d", "--duration", type=int, default=3600,
                        help="Durée de simulation en secondes (défaut: 3600)")
     parser.add_argument("-r", "--random-seed", type=int, default=12345,
+                       help="Seed aléatoire (défaut: 12345)")
+    parser.add_argument("-l", "--layout", type=str, default="uniform", choices=LAYOUTS,
+                       help="Disposition des nœuds (défaut: uniform)")
+    parser.add_argument("--min-spacing", type=float, default=0.0,
+                       help="Distance minimale entre nœuds pour la disposition poisson (défaut: 0)")
+    parser.add_argument("--clusters", type=int, default=5,
+                       help="Nombre de grappes pour la disposition clustered (défaut: 5)")
+    parser.add_argument("--cluster-std", type=float, default=40.0,
+                       help="Écart-type des grappes en mètres (défaut: 40)")
+    parser.add_argument("--radio-range", type=float, default=None,
+                       help="Portée radio ; garantit que chaque nœud atteint le sink")
+    parser.add_argument("--mobility-trace", type=str, default=None,
+                       help="Génère la trace Random Waypoint binaire des nœuds mobiles")
+    parser.add_argument("--mobility-positions", type=str, default=None,
+                       help="Exporte la trace pour le plugin Mobility de Cooja (référencé dans le .csc)")
     parser.add_argument("-o", "--output", type=str, default="rpl-aer-simulation-generated.csc",
-                       help="Nom du fichier de sortie (défaut: rpl-aer-simulation-generated.csc)")
+                       help="Nom du fichier de sortie, .csc ou .csc.gz (défaut: rpl-aer-simulation-generated.csc)")
 
     args = parser.parse_args()
 
@@ -222,9 +202,26 @@ def main():
         mobile_ratio=args.mobile_ratio,
         area_size=(args.width, args.height),
         simulation_duration=args.duration,
-        random_seed=args.random_seed
+        random_seed=args.random_seed,
+        layout=args.layout,
+        min_spacing=args.min_spacing,
+        num_clusters=args.clusters,
+        cluster_std=args.cluster_std,
+        radio_range=args.radio_range
     )
 
+    try:
+        generator.generate_positions()
+    except ValueError as e:
+        print(f"Erreur: {e}")
+        sys.exit(1)
+
+    if args.mobility_trace:
+        generator.generate_mobility_trace(args.mobility_trace, args.mobility_positions)
+    elif args.mobility_positions:
+        print("Erreur: --mobility-positions nécessite --mobility-trace")
+        sys.exit(1)
+
     generator.save_to_file(args.output)
 
     # Affichage des statistiques
@@ -233,6 +230,7 @@ def main():
     print(f"- Nœuds solaires: {generator.num_solar} ({args.solar_ratio*100:.1f}%)")
     print(f"- Nœuds mobiles: {generator.num_mobile} ({args.mobile_ratio*100:.1f}%)")
     print(f"- Zone de simulation: {args.width}x{args.height}")
+    print(f"- Disposition: {args.layout}")
     print(f"- Durée: {args.duration} secondes")
     print(f"- Seed aléatoire: {args.random_seed}")
 
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Profils d'irradiance solaire par nœud pour RPL-AER
+Génération vectorisée (cycle jour/nuit, nébulosité, rendement du panneau)
+et cache sur disque indexé par empreinte des paramètres
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+import numpy as np
+
+# Valeur de project-conf.h (SOLAR_PANEL_EFFICIENCY)
+SOLAR_PANEL_EFFICIENCY = 0.15
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 "..", ".cache", "irradiance")
+
+# Nombre de pas traités par produit matriciel pour le bruit nuageux
+_AR_BLOCK = 256
+
+
+def profile_params(num_nodes: int, num_steps: int, step: float = 60.0,
+                   start_time: float = 0.0, day_length: float = 12 * 3600,
+                   solar_noon: float = 12 * 3600, peak_irradiance: float = 1000.0,
+                   cloud_noise: float = 0.2, cloud_correlation: float = 0.95,
+                   panel_efficiency: float = SOLAR_PANEL_EFFICIENCY,
+                   seed: int = 12345) -> Dict:
+    """
+    Rassemble les paramètres d'un profil (et sert de clé de cache)
+
+    Args:
+        num_nodes: Nombre de nœuds (un profil par nœud)
+        num_steps: Nombre de pas de temps
+        step: Pas de temps en secondes
+        start_time: Heure de début de la simulation (secondes depuis minuit)
+        day_length: Durée du jour en secondes (irradiance nulle la nuit)
+        solar_noon: Heure du zénith en secondes depuis minuit
+        peak_irradiance: Irradiance ciel clair au zénith (W/m²)
+        cloud_noise: Amplitude de la variation nuageuse (0 = ciel clair)
+        cloud_correlation: Corrélation d'un pas à l'autre du bruit nuageux (AR(1))
+        panel_efficiency: Rendement du panneau solaire
+        seed: Graine aléatoire
+    """
+    return {
+        "num_nodes": int(num_nodes),
+        "num_steps": int(num_steps),
+        "step": float(step),
+        "start_time": float(start_time),
+        "day_length": float(day_length),
+        "solar_noon": float(solar_noon),
+        "peak_irradiance": float(peak_irradiance),
+        "cloud_noise": float(cloud_noise),
+        "cloud_correlation": float(cloud_correlation),
+        "panel_efficiency": float(panel_efficiency),
+        "seed": int(seed)
+    }
+
+
+def params_hash(params: Dict) -> str:
+    """Empreinte stable d'un jeu de paramètres"""
+    payload = json.dumps(params, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def clear_sky(times: np.ndarray, day_length: float, solar_noon: float,
+              peak_irradiance: float) -> np.ndarray:
+    """Irradiance ciel clair (W/m²) : demi-sinusoïde entre lever et coucher"""
+    hour = np.mod(times, 24 * 3600) - (solar_noon - day_length / 2)
+    daylight = (hour >= 0) & (hour <= day_length)
+    return np.where(daylight, peak_irradiance * np.sin(np.pi * np.clip(hour, 0, day_length) / day_length), 0.0)
+
+
+def cloud_factor(num_steps: int, num_nodes: int, noise: float, correlation: float,
+                 rng: np.random.Generator, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Transmittance nuageuse par nœud et par pas, processus AR(1) autour de 1
+
+    La récurrence est résolue par blocs : dans un bloc de L pas, l'état est
+    la contribution de l'état initial (puissances de ρ) plus le produit
+    d'une matrice de Toeplitz triangulaire par les innovations. Si out est
+    fourni (ex. fichier projeté en mémoire), il est rempli bloc par bloc.
+    """
+    factor = np.empty((num_steps, num_nodes), dtype=np.float32) if out is None else out
+    if noise <= 0 or num_steps == 0:
+        factor[:] = 1.0
+        return factor
+
+    rho = float(correlation)
+    lags = np.arange(_AR_BLOCK)
+    kernel = np.tril(rho ** np.maximum(lags[:, None] - lags[None, :], 0))
+    kernel *= np.sqrt(1 - rho * rho)
+    decay = rho ** (lags + 1)
+
+    state = rng.standard_normal(num_nodes)
+    for start in range(0, num_steps, _AR_BLOCK):
+        length = min(_AR_BLOCK, num_steps - start)
+        innovations = rng.standard_normal((length, num_nodes))
+        block = kernel[:length, :length] @ innovations + decay[:length, None] * state
+        factor[start:start + length] = np.clip(1.0 + noise * block, 0.0, None)
+        state = block[-1]
+    return factor
+
+
+def generate_profile(params: Dict, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Génère la puissance solaire récoltable par nœud (W/m² de panneau)
+
+    Args:
+        out: Tableau (num_steps, num_nodes) float32 à remplir (alloué sinon)
+
+    Returns:
+        Tableau float32 (num_steps, num_nodes) = irradiance × nébulosité × rendement
+    """
+    rng = np.random.default_rng(params["seed"])
+    times = params["start_time"] + params["step"] * np.arange(params["num_steps"])
+    sky = clear_sky(times, params["day_length"], params["solar_noon"], params["peak_irradiance"])
+    clouds = cloud_factor(params["num_steps"], params["num_nodes"],
+                          params["cloud_noise"], params["cloud_correlation"], rng, out=out)
+    scale = (sky * params["panel_efficiency"]).astype(np.float32)
+    for start in range(0, params["num_steps"], _AR_BLOCK):
+        clouds[start:start + _AR_BLOCK] *= scale[start:start + _AR_BLOCK, None]
+    return clouds
+
+
+def load_profile(params: Dict, cache_dir: Optional[str] = DEFAULT_CACHE_DIR) -> np.ndarray:
+    """
+    Retourne le profil des paramètres donnés, depuis le cache si possible
+
+    Le profil est stocké en .npy sous le nom de l'empreinte des paramètres
+    puis relu en projection mémoire, partagée par toutes les exécutions
+    d'un balayage. cache_dir=None désactive le cache.
+    """
+    if cache_dir is None:
+        return generate_profile(params)
+
+    path = os.path.join(cache_dir, f"{params_hash(params)}.npy")
+    if not os.path.exists(path):
+        os.makedirs(cache_dir, exist_ok=True)
+        # Écrit directement dans le fichier : le profil n'est jamais entier en mémoire
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        profile = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32,
+                                            shape=(params["num_steps"], params["num_nodes"]))
+        generate_profile(params, out=profile)
+        profile.flush()
+        del profile
+        os.replace(tmp_path, path)
+
+    return np.load(path, mmap_mode="r")
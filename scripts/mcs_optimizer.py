@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Optimisation des poids MCS (NRE, PEC, ECS) de RPL-AER
+Recherche sur le simplexe des poids, évaluation par lots avec l'émulateur
+du firmware et front de Pareto durée de vie / PDR
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from firmware_emulator import FirmwareEmulator, summarize
+
+OBJECTIVES = ("lifetime", "pdr")
+
+
+def simplex_grid(resolution: int) -> np.ndarray:
+    """Tous les poids (a, b, c) de somme 1, multiples de 1/resolution"""
+    a, b = np.meshgrid(np.arange(resolution + 1), np.arange(resolution + 1), indexing="ij")
+    keep = a + b <= resolution
+    a, b = a[keep], b[keep]
+    return np.column_stack([a, b, resolution - a - b]) / resolution
+
+
+def pareto_front(objectives: np.ndarray) -> np.ndarray:
+    """
+    Masque des points non dominés (objectifs à maximiser)
+
+    Args:
+        objectives: Tableau (P, K)
+    """
+    objectives = np.asarray(objectives, dtype=np.float64)
+    geq = (objectives[:, None, :] >= objectives[None, :, :]).all(axis=2)
+    gt = (objectives[:, None, :] > objectives[None, :, :]).any(axis=2)
+    dominated = (geq & gt).any(axis=0)
+    return ~dominated
+
+
+def knee_point(objectives: np.ndarray, front: np.ndarray) -> int:
+    """Indice du point du front le plus équilibré (somme des objectifs normalisés)"""
+    objectives = np.asarray(objectives, dtype=np.float64)
+    low = objectives[front].min(axis=0)
+    span = np.maximum(objectives[front].max(axis=0) - low, 1e-12)
+    score = np.where(front, ((objectives - low) / span).sum(axis=1), -np.inf)
+    return int(np.argmax(score))
+
+
+def _evaluate_chunk(emulator: FirmwareEmulator, traces: Dict, weights: np.ndarray) -> list:
+    results = emulator.run(weights, traces=traces)
+    return [summarize(results, i) for i in range(len(weights))]
+
+
+class WeightOptimizer:
+    def __init__(self, emulator: FirmwareEmulator, workers: Optional[int] = None,
+                 batch_size: int = 64):
+        """
+        Évalue des jeux de poids MCS sur un même réseau émulé
+
+        Les traces indépendantes des poids (irradiance, tirages d'attaques)
+        sont calculées une seule fois ; chaque lot ne rejoue que le routage
+        et le bilan énergétique, vectorisés sur l'axe des poids.
+
+        Args:
+            emulator: Émulateur du scénario à optimiser
+            workers: Nombre de processus évaluant les lots (défaut: un seul)
+            batch_size: Nombre de jeux de poids par lot
+        """
+        self.emulator = emulator
+        self.workers = workers
+        self.batch_size = batch_size
+        self.traces = emulator.prepare()
+        self.evaluations = 0
+
+    def evaluate(self, weights: np.ndarray) -> pd.DataFrame:
+        """Évalue une population (P, 3) de poids, lot par lot"""
+        weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+        chunks = [weights[i:i + self.batch_size] for i in range(0, len(weights), self.batch_size)]
+        if not self.workers or self.workers <= 1:
+            parts = [_evaluate_chunk(self.emulator, self.traces, chunk) for chunk in chunks]
+        else:
+            # Lots plus petits pour occuper tous les processus
+            size = max(1, -(-len(weights) // self.workers))
+            chunks = [weights[i:i + min(size, self.batch_size)]
+                      for i in range(0, len(weights), min(size, self.batch_size))]
+            count = len(chunks)
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                parts = list(pool.map(_evaluate_chunk, [self.emulator] * count,
+                                      [self.traces] * count, chunks))
+        self.evaluations += len(weights)
+        return pd.DataFrame([row for part in parts for row in part])
+
+    def optimize(self, resolution: int = 10, generations: int = 3, offspring: int = 64,
+                 concentration: float = 50.0, seed: int = 12345) -> pd.DataFrame:
+        """
+        Recherche du front de Pareto durée de vie / PDR
+
+        Une grille régulière du simplexe sert de population initiale ; chaque
+        génération tire ensuite des descendants de Dirichlet centrés sur les
+        points du front courant.
+
+        Args:
+            resolution: Pas de la grille initiale (1/resolution)
+            generations: Nombre de générations de raffinement
+            offspring: Nombre de descendants par génération
+            concentration: Concentration des tirages de Dirichlet (plus elle
+                           est grande, plus les descendants restent proches)
+
+        Returns:
+            Tous les points évalués, avec les colonnes "generation" et "pareto"
+        """
+        rng = np.random.default_rng(seed)
+        population = self.evaluate(simplex_grid(resolution))
+        population["generation"] = 0
+
+        for generation in range(1, generations + 1):
+            front = population[pareto_front(population[list(OBJECTIVES)].to_numpy())]
+            parents = front[["nre_weight", "pec_weight", "ecs_weight"]].to_numpy()
+            picks = parents[rng.integers(0, len(parents), offspring)]
+            children = np.array([rng.dirichlet(concentration * np.maximum(p, 1e-3)) for p in picks])
+            batch = self.evaluate(children)
+            batch["generation"] = generation
+            population = pd.concat([population, batch], ignore_index=True)
+
+        objectives = population[list(OBJECTIVES)].to_numpy()
+        population["pareto"] = pareto_front(objectives)
+        population["knee"] = False
+        population.loc[knee_point(objectives, population["pareto"].to_numpy()), "knee"] = True
+        return population
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimisation des poids MCS de RPL-AER")
+    parser.add_argument("-n", "--nodes", type=int, default=39,
+                       help="Nombre de nœuds clients (défaut: 39)")
+    parser.add_argument("-d", "--duration", type=int, default=3600,
+                       help="Durée émulée en secondes (défaut: 3600)")
+    parser.add_argument("-s", "--seed", type=int, default=12345,
+                       help="Graine aléatoire (défaut: 12345)")
+    parser.add_argument("-r", "--resolution", type=int, default=10,
+                       help="Pas de la grille initiale du simplexe (défaut: 10)")
+    parser.add_argument("-g", "--generations", type=int, default=3,
+                       help="Nombre de générations (défaut: 3)")
+    parser.add_argument("-p", "--offspring", type=int, default=64,
+                       help="Descendants par génération (défaut: 64)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                       help="Nombre de processus (défaut: un seul)")
+    parser.add_argument("-o", "--output", type=str, default="mcs_weights.csv",
+                       help="Fichier CSV des points évalués (défaut: mcs_weights.csv)")
+    args = parser.parse_args()
+
+    emulator = FirmwareEmulator(num_clients=args.nodes, simulation_duration=args.duration,
+                                random_seed=args.seed)
+    optimizer = WeightOptimizer(emulator, workers=args.workers)
+    population = optimizer.optimize(args.resolution, args.generations, args.offspring, seed=args.seed)
+    population.to_csv(args.output, index=False)
+
+    columns = ["nre_weight", "pec_weight", "ecs_weight", "lifetime", "pdr", "latency_ms"]
+    front = population[population["pareto"]].sort_values("lifetime")
+    print(f"{optimizer.evaluations} jeux de poids évalués, {len(front)} sur le front de Pareto")
+    print(front[columns].to_string(index=False))
+    knee = population[population["knee"]].iloc[0]
+    print(f"Compromis retenu: NRE={knee['nre_weight']:.2f} PEC={knee['pec_weight']:.2f} "
+          f"ECS={knee['ecs_weight']:.2f} (durée de vie {knee['lifetime']:.0f}s, PDR {knee['pdr'] * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Exposition des métriques des simulations RPL-AER au format texte Prometheus
+Serveur HTTP local (127.0.0.1) optionnel, suivi des exécutions d'une
+campagne et analyse incrémentale des logs Cooja au moment de la collecte
+"""
+
+import os
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows : pas de getrusage
+    resource = None
+
+DEFAULT_PORT = 9464
+RUN_STATES = ("queued", "running", "finished", "failed")
+
+# Nom -> (type Prometheus, description)
+METRICS = {
+    "rpl_aer_runs": ("gauge", "Exécutions par état"),
+    "rpl_aer_run_simulated_seconds": ("gauge", "Temps simulé atteint par l'exécution"),
+    "rpl_aer_run_progress_ratio": ("gauge", "Part de la durée simulée déjà atteinte"),
+    "rpl_aer_stage_duration_seconds": ("gauge", "Durée (temps réel) des étapes terminées"),
+    "rpl_aer_log_lines_total": ("counter", "Lignes de log analysées"),
+    "rpl_aer_parse_lines_per_second": ("gauge", "Débit de la dernière analyse incrémentale"),
+    "rpl_aer_pdr_ratio": ("gauge", "PDR moyen sur les dernières fenêtres [PERF]"),
+    "rpl_aer_latency_ms": ("gauge", "Latence moyenne sur les dernières fenêtres [PERF]"),
+    "rpl_aer_attacks_total": ("counter", "Attaques signalées ([ATTACK])"),
+    "rpl_aer_false_positives_total": ("counter", "Faux positifs signalés ([FP])"),
+    "rpl_aer_peak_rss_bytes": ("gauge", "Pic de mémoire résidente"),
+}
+
+# Traces du firmware (mêmes motifs que analyze_logs.py)
+_TIMESTAMP = re.compile(r"^\s*(\d+)\s")
+_PERF = re.compile(r"\[PERF\].*PDR=([0-9.]+)%.*Latency=([0-9.]+)")
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """Valeurs courantes des métriques, partagées entre threads"""
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Dict[Tuple, float]] = {name: {} for name in METRICS}
+        self._collectors: List[Callable[[], None]] = []
+        self.run_states: Dict[str, str] = {}
+
+    def set(self, name: str, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._samples[name][key] = float(value)
+
+    def inc(self, name: str, amount: float = 1.0, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            samples = self._samples[name]
+            samples[key] = samples.get(key, 0.0) + amount
+
+    def set_state(self, run_id: str, state: str):
+        if state not in RUN_STATES:
+            raise ValueError(f"État inconnu: {state}")
+        with self._lock:
+            self.run_states[run_id] = state
+
+    def add_collector(self, collector: Callable[[], None]):
+        """Fonction appelée avant chaque rendu (analyse paresseuse des logs)"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def remove_collector(self, collector: Callable[[], None]):
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def render(self) -> str:
+        """Texte d'exposition Prometheus (version 0.0.4)"""
+        with self._lock:
+            collectors = list(self._collectors)
+        for collector in collectors:
+            collector()
+
+        with self._lock:
+            for state in RUN_STATES:
+                count = sum(1 for s in self.run_states.values() if s == state)
+                self._samples["rpl_aer_runs"][(("state", state),)] = float(count)
+        if resource is not None:
+            # ru_maxrss est en kilo-octets sous Linux
+            self.set("rpl_aer_peak_rss_bytes", resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+                     process="self")
+            self.set("rpl_aer_peak_rss_bytes", resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * 1024,
+                     process="children")
+
+        lines = []
+        with self._lock:
+            for name, (kind, description) in METRICS.items():
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key, value in sorted(self._samples[name].items()):
+                    labels = ",".join(f'{k}="{_escape(v)}"' for k, v in key)
+                    lines.append(f"{name}{{{labels}}} {value!r}" if labels else f"{name} {value!r}")
+        return "\n".join(lines) + "\n"
+
+
+class LogTail:
+    def __init__(self, path: str, monitor: "RunMonitor", block_size: int = 1 << 22):
+        """
+        Analyse incrémentale d'un log en cours d'écriture
+
+        Seules les lignes complètes ajoutées depuis l'appel précédent sont
+        lues, par blocs de block_size octets : la mémoire reste bornée
+        quelle que soit la taille du log.
+        """
+        self.path = path
+        self.monitor = monitor
+        self.block_size = block_size
+        self.offset = 0
+        self._lock = threading.Lock()
+
+    def poll(self) -> int:
+        """Analyse les nouvelles lignes et retourne leur nombre"""
+        with self._lock:
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                return 0
+            if size < self.offset:
+                # Log réécrit (nouvelle tentative) : reprise au début
+                self.offset = 0
+            if size == self.offset:
+                return 0
+
+            started = time.perf_counter()
+            count = 0
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                while self.offset < size:
+                    block = f.read(min(self.block_size, size - self.offset))
+                    end = block.rfind(b"\n")
+                    if end < 0:
+                        if len(block) < self.block_size:
+                            break  # ligne en cours d'écriture
+                        end = len(block) - 1  # ligne plus longue qu'un bloc
+                    self.offset += end + 1
+                    f.seek(self.offset)
+                    lines = block[:end + 1].decode("utf-8", "replace").splitlines()
+                    count += len(lines)
+                    self._parse(lines)
+
+            elapsed = time.perf_counter() - started
+            self.monitor.registry.inc("rpl_aer_log_lines_total", count, run=self.monitor.run_id)
+            if elapsed > 0:
+                self.monitor.registry.set("rpl_aer_parse_lines_per_second", count / elapsed,
+                                          run=self.monitor.run_id)
+            return count
+
+    def _parse(self, lines: List[str]):
+        attacks = false_positives = 0
+        last_time = None
+        for line in lines:
+            if "[" not in line:
+                continue
+            match = _TIMESTAMP.match(line)
+            if match:
+                last_time = match.group(1)
+            if "[PERF]" in line:
+                perf = _PERF.search(line)
+                if perf:
+                    self.monitor.observe_qos(float(perf.group(1)) / 100.0, float(perf.group(2)))
+            elif "[ATTACK]" in line:
+                attacks += 1
+            elif "[FP]" in line:
+                false_positives += 1
+        if attacks:
+            self.monitor.count("attacks", attacks)
+        if false_positives:
+            self.monitor.count("false_positives", false_positives)
+        if last_time is not None:
+            # Horodatage Cooja en millisecondes
+            self.monitor.progress(int(last_time) / 1000.0)
+
+
+class RunMonitor:
+    def __init__(self, registry: MetricsRegistry, run_id: str, duration: Optional[float] = None,
+                 window: int = 10):
+        """
+        Suivi d'une exécution (simulation Cooja ou RPLAERSimulator)
+
+        Args:
+            registry: Registre exposé
+            run_id: Identifiant de l'exécution (empreinte de configuration)
+            duration: Durée simulée attendue en secondes (progression)
+            window: Nombre de fenêtres [PERF] des moyennes glissantes
+        """
+        self.registry = registry
+        self.run_id = run_id
+        self.duration = duration
+        self._pdr = deque(maxlen=window)
+        self._latency = deque(maxlen=window)
+        self._tails: List[LogTail] = []
+        self.registry.set_state(run_id, "queued")
+
+    def start(self):
+        self.registry.set_state(self.run_id, "running")
+
+    def finish(self, success: bool = True):
+        # Dernière analyse des logs suivis, qui ne sont plus relus ensuite
+        for tail in self._tails:
+            tail.poll()
+            self.registry.remove_collector(tail.poll)
+        self._tails = []
+        self.registry.set_state(self.run_id, "finished" if success else "failed")
+
+    def progress(self, simulated_seconds: float):
+        self.registry.set("rpl_aer_run_simulated_seconds", simulated_seconds, run=self.run_id)
+        if self.duration:
+            self.registry.set("rpl_aer_run_progress_ratio", min(simulated_seconds / self.duration, 1.0),
+                              run=self.run_id)
+
+    def observe_qos(self, pdr: float, latency_ms: float):
+        """Ajoute une fenêtre PDR (0..1) / latence aux moyennes glissantes"""
+        self._pdr.append(pdr)
+        self._latency.append(latency_ms)
+        self.registry.set("rpl_aer_pdr_ratio", sum(self._pdr) / len(self._pdr), run=self.run_id)
+        self.registry.set("rpl_aer_latency_ms", sum(self._latency) / len(self._latency), run=self.run_id)
+
+    def count(self, kind: str, amount: int = 1):
+        """kind : "attacks" ou "false_positives" """
+        self.registry.inc(f"rpl_aer_{kind}_total", amount, run=self.run_id)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Mesure la durée d'une étape (compilation, simulation, analyse...)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registry.set("rpl_aer_stage_duration_seconds", time.perf_counter() - started,
+                              run=self.run_id, stage=name)
+
+    def follow(self, path: str) -> LogTail:
+        """Analyse le log au fil de l'eau, à chaque collecte, jusqu'à finish()"""
+        tail = LogTail(path, self)
+        self._tails.append(tail)
+        self.registry.add_collector(tail.poll)
+        return tail
+
+
+class MetricsExporter:
+    def __init__(self, registry: MetricsRegistry, port: int = DEFAULT_PORT, host: str = "127.0.0.1"):
+        """
+        Point de collecte HTTP GET /metrics
+
+        Args:
+            port: Port d'écoute (0 : port libre choisi par le système)
+            host: Adresse d'écoute, locale par défaut
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def start(self) -> "MetricsExporter":
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-exporter", daemon=True)
+        self._thread.start()
+        print(f" Métriques exposées sur http://{self.host}:{self.port}/metrics")
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "MetricsExporter":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Traces de mobilité Random Waypoint pour RPL-AER
+Génération vectorisée des segments, stockage binaire compact (tableaux
+séparés, projetables en mémoire) et recherche de position en O(log n)
+"""
+
+import struct
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+# Valeurs de project-conf.h (MOBILITY_SPEED, MOBILITY_PAUSE_TIME)
+MOBILITY_SPEED = 5.0        # m/s
+MOBILITY_PAUSE_TIME = 10.0  # secondes
+
+TRACE_MAGIC = b"RPLAERMT"
+TRACE_VERSION = 1
+# magic, version, nœuds, segments, durée, vitesse, pause, largeur, hauteur
+HEADER_FORMAT = "<8sIIQddddd"
+ALIGNMENT = 64
+
+# Tableaux du fichier, dans l'ordre d'écriture
+_FIELDS = (
+    ("node_ids", np.int32),
+    ("offsets", np.int64),
+    ("t_start", np.float64),
+    ("t_arrive", np.float64),
+    ("x0", np.float32),
+    ("y0", np.float32),
+    ("x1", np.float32),
+    ("y1", np.float32),
+)
+
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class MobilityTraces:
+    def __init__(self, node_ids, offsets, t_start, t_arrive, x0, y0, x1, y1,
+                 duration: float, speed: float, pause: float,
+                 area_size: Tuple[float, float]):
+        """
+        Segments Random Waypoint de plusieurs nœuds (structure de tableaux)
+
+        Le segment k part de (x0, y0) à t_start[k], atteint (x1, y1) à
+        t_arrive[k] puis y reste jusqu'au début du segment suivant. Les
+        segments du nœud node_ids[i] occupent offsets[i]:offsets[i + 1].
+        """
+        self.node_ids = node_ids
+        self.offsets = offsets
+        self.t_start = t_start
+        self.t_arrive = t_arrive
+        self.x0, self.y0, self.x1, self.y1 = x0, y0, x1, y1
+        self.duration = float(duration)
+        self.speed = float(speed)
+        self.pause = float(pause)
+        self.area_size = area_size
+        self._keys = None
+        self._rank = {int(node_id): i for i, node_id in enumerate(np.asarray(node_ids).tolist())}
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_segments(self) -> int:
+        return len(self.t_start)
+
+    def _search_keys(self) -> np.ndarray:
+        # Clé globale croissante : rang du nœud * durée + instant de départ
+        if self._keys is None:
+            counts = np.diff(np.asarray(self.offsets))
+            rank = np.repeat(np.arange(self.num_nodes, dtype=np.float64), counts)
+            self._keys = rank * self.duration + np.asarray(self.t_start)
+        return self._keys
+
+    def ranks_of(self, node_ids: Sequence[int]) -> np.ndarray:
+        """Convertit des identifiants de nœuds en rangs dans la trace"""
+        return np.array([self._rank[int(n)] for n in node_ids], dtype=np.int64)
+
+    def positions_at(self, t: float, ranks: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Positions des nœuds à l'instant t (recherche dichotomique)
+
+        Args:
+            t: Instant en secondes (ramené dans [0, durée])
+            ranks: Rangs des nœuds voulus (tous par défaut)
+
+        Returns:
+            Tableau (len(ranks), 2) des positions
+        """
+        if ranks is None:
+            ranks = np.arange(self.num_nodes)
+        t = min(max(float(t), 0.0), np.nextafter(self.duration, 0.0))
+        seg = np.searchsorted(self._search_keys(), ranks * self.duration + t, side="right") - 1
+
+        t_start = np.asarray(self.t_start)[seg]
+        t_arrive = np.asarray(self.t_arrive)[seg]
+        travel = np.maximum(t_arrive - t_start, 1e-9)
+        frac = np.clip((t - t_start) / travel, 0.0, 1.0)
+
+        x0, y0 = np.asarray(self.x0)[seg], np.asarray(self.y0)[seg]
+        x1, y1 = np.asarray(self.x1)[seg], np.asarray(self.y1)[seg]
+        return np.column_stack([x0 + (x1 - x0) * frac, y0 + (y1 - y0) * frac])
+
+    def position_of(self, node_id: int, t: float) -> Tuple[float, float]:
+        """Position d'un seul nœud à l'instant t"""
+        x, y = self.positions_at(t, np.array([self._rank[int(node_id)]]))[0]
+        return float(x), float(y)
+
+    def save(self, path: str):
+        """Écrit la trace au format binaire (en-tête puis tableaux alignés)"""
+        header = struct.pack(HEADER_FORMAT, TRACE_MAGIC, TRACE_VERSION,
+                             self.num_nodes, self.num_segments, self.duration,
+                             self.speed, self.pause,
+                             float(self.area_size[0]), float(self.area_size[1]))
+        with open(path, "wb") as f:
+            f.write(header)
+            for name, dtype in _FIELDS:
+                f.write(b"\0" * (_aligned(f.tell()) - f.tell()))
+                f.write(np.ascontiguousarray(getattr(self, name), dtype=dtype).tobytes())
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "MobilityTraces":
+        """Ouvre une trace ; les tableaux sont projetés en mémoire par défaut"""
+        size = struct.calcsize(HEADER_FORMAT)
+        with open(path, "rb") as f:
+            magic, version, num_nodes, num_segments, duration, speed, pause, width, height = \
+                struct.unpack(HEADER_FORMAT, f.read(size))
+        if magic != TRACE_MAGIC or version != TRACE_VERSION:
+            raise ValueError(f"Fichier de trace invalide: {path}")
+
+        lengths = {"node_ids": num_nodes, "offsets": num_nodes + 1}
+        arrays = {}
+        offset = size
+        for name, dtype in _FIELDS:
+            count = lengths.get(name, num_segments)
+            offset = _aligned(offset)
+            if mmap and count > 0:
+                arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(count,))
+            else:
+                arrays[name] = np.fromfile(path, dtype=dtype, count=count, offset=offset)
+            offset += count * np.dtype(dtype).itemsize
+
+        return cls(duration=duration, speed=speed, pause=pause,
+                   area_size=(width, height), **arrays)
+
+    def write_cooja_positions(self, path: str, step: float = 1.0, mote_indices=None):
+        """
+        Exporte la trace pour le plugin Mobility de Cooja
+
+        Une ligne "index temps x y" est écrite à chaque pas pour les seuls
+        nœuds dont la position a changé ; l'export se fait au fil de l'eau.
+
+        Args:
+            step: Pas d'échantillonnage en secondes
+            mote_indices: Indice Cooja de chaque nœud (par défaut son identifiant,
+                          le sink occupant l'indice 0)
+        """
+        indices = np.asarray(self.node_ids if mote_indices is None else mote_indices)
+        last = None
+        with open(path, "w") as f:
+            f.write("# RPL-AER Random Waypoint (index time x y)\n")
+            for t in np.arange(0.0, self.duration, step):
+                current = self.positions_at(t)
+                changed = np.ones(len(current), dtype=bool) if last is None else \
+                    np.any(np.abs(current - last) > 1e-3, axis=1)
+                f.writelines(f"{i} {t:.3f} {x:.2f} {y:.2f}\n" for i, (x, y) in
+                             zip(indices[changed].tolist(), current[changed].tolist()))
+                last = current
+
+
+def generate_random_waypoint(node_ids: Sequence[int], start_positions: np.ndarray,
+                             area_size: Tuple[float, float], duration: float,
+                             speed: float = MOBILITY_SPEED, pause: float = MOBILITY_PAUSE_TIME,
+                             seed: Optional[int] = None) -> MobilityTraces:
+    """
+    Génère les segments Random Waypoint de tous les nœuds mobiles
+
+    Les destinations sont tirées par blocs de segments pour tous les nœuds
+    à la fois ; les instants sont obtenus par somme cumulée des durées
+    (trajet à vitesse constante puis pause).
+    """
+    rng = np.random.default_rng(seed)
+    node_ids = np.asarray(node_ids, dtype=np.int32)
+    n = len(node_ids)
+    start = np.asarray(start_positions, dtype=np.float64).reshape(n, 2)
+
+    # Nombre de segments par bloc estimé à partir de la distance moyenne
+    mean_leg = 0.52 * float(np.hypot(*area_size)) / speed + pause
+    block = int(min(max(8, 1.2 * duration / max(mean_leg, 1e-9)), 4096))
+
+    # Bloc vide initial : trace vide (mais valide) sans nœud mobile
+    pieces = [(np.empty(0, dtype=np.int64), np.empty(0), np.empty(0),
+               np.empty((0, 2)), np.empty((0, 2)))]
+    position = start.copy()
+    now = np.zeros(n)
+    active = np.arange(n)
+    while len(active):
+        dest = rng.uniform((0.0, 0.0), area_size, size=(len(active), block, 2))
+        origin = np.concatenate([position[active, None, :], dest[:, :-1, :]], axis=1)
+        travel = np.linalg.norm(dest - origin, axis=2) / speed
+        ends = now[active, None] + np.cumsum(travel + pause, axis=1)
+        starts = ends - travel - pause
+
+        keep = starts < duration
+        rows = np.nonzero(keep)[0]
+        pieces.append((active[rows], starts[keep], starts[keep] + travel[keep],
+                       origin[keep], dest[keep]))
+
+        position[active] = dest[:, -1, :]
+        now[active] = ends[:, -1]
+        active = active[now[active] < duration]
+
+    node = np.concatenate([p[0] for p in pieces])
+    t_start = np.concatenate([p[1] for p in pieces])
+    t_arrive = np.concatenate([p[2] for p in pieces])
+    origin = np.concatenate([p[3] for p in pieces])
+    dest = np.concatenate([p[4] for p in pieces])
+
+    order = np.lexsort((t_start, node))
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(node, minlength=n))
+
+    return MobilityTraces(
+        node_ids=node_ids,
+        offsets=offsets,
+        t_start=t_start[order],
+        t_arrive=t_arrive[order],
+        x0=origin[order, 0].astype(np.float32),
+        y0=origin[order, 1].astype(np.float32),
+        x1=dest[order, 0].astype(np.float32),
+        y1=dest[order, 1].astype(np.float32),
+        duration=duration, speed=speed, pause=pause, area_size=area_size
+    )
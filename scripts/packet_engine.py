@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Moteur à événements discrets du trafic UDP client -> sink de RPL-AER
+Envois périodiques (udp-client.c), relayage saut par saut avec files
+d'attente bornées, ACK du sink (udp-server.c) et retransmissions sur
+expiration de ACK_TIMEOUT, ordonnancés dans un tas d'entiers ; les paquets
+et messages sont des enregistrements de tableaux réutilisés
+"""
+
+import argparse
+import heapq
+import random
+import time
+from array import array
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+
+from dodag import DodagTopology, link_prr
+from energy_model import ENERGY_DEFAULTS
+from firmware_emulator import read_firmware_defines
+from placement import generate_layout
+
+# Paramètres absents des sources du firmware
+PACKET_DEFAULTS = {
+    "QUEUEBUF_NUM": 8,              # paquets en file par nœud (QUEUEBUF_CONF_NUM de Contiki-NG)
+    "CSMA_MAX_FRAME_RETRIES": 7,    # réémissions d'une trame non acquittée par saut
+    "SINK_PROCESSING": 0.005,       # s de traitement d'un paquet par le sink avant l'ACK
+    "ACK_FRAME_BYTES": 40,          # réponse "ACK-<n>" avec en-têtes
+}
+
+# Types d'événements : envoi périodique (nœud), fin d'émission d'un saut
+# (paquet), expiration de l'attente de l'ACK (message)
+EVENT_SEND, EVENT_HOP, EVENT_TIMEOUT = range(3)
+_KIND_BITS = 2
+_SLOT_BITS = 28
+_SLOT_MASK = (1 << _SLOT_BITS) - 1
+
+# Drapeaux des messages
+_DELIVERED, _DONE = 1, 2
+
+
+class RecordPool:
+    def __init__(self, fields: Sequence[str], capacity: int = 1024):
+        """
+        Enregistrements à champs entiers stockés en colonnes (array 'q')
+
+        Les emplacements libérés sont réutilisés (pile libre) ; la capacité
+        double quand la pile est vide. Les colonnes sont étendues sur place :
+        les références gardées par l'appelant restent valides.
+        """
+        self.columns = {name: array("q", bytes(8 * capacity)) for name in fields}
+        self.free = list(range(capacity - 1, -1, -1))
+        self.capacity = capacity
+        self.in_use = 0
+        self.peak = 0
+
+    def allocate(self) -> int:
+        if not self.free:
+            extra = self.capacity
+            for column in self.columns.values():
+                column.extend(array("q", bytes(8 * extra)))
+            self.free.extend(range(self.capacity + extra - 1, self.capacity - 1, -1))
+            self.capacity += extra
+        self.in_use += 1
+        if self.in_use > self.peak:
+            self.peak = self.in_use
+        return self.free.pop()
+
+    def release(self, slot: int):
+        self.in_use -= 1
+        self.free.append(slot)
+
+    def nbytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in self.columns.values())
+
+
+class PacketEngine:
+    def __init__(self, positions: np.ndarray, sink, radio_range: float,
+                 scores: Optional[np.ndarray] = None, config: Optional[Dict[str, float]] = None,
+                 random_seed: int = 12345):
+        """
+        Trafic applicatif d'un réseau de n clients et d'un sink (indice n)
+
+        Chaque client choisit le parent de meilleur score (à score égal,
+        le lien de plus faible ETX) ; les chemins vers le sink sont fixes.
+
+        Args:
+            positions: Positions (n, 2) des clients
+            sink: Position du sink
+            radio_range: Portée radio en mètres
+            scores: Score (n,) des nœuds comme parents (ex. énergie résiduelle)
+            config: #define du firmware (lus dans les sources si None),
+                    complétés par ENERGY_DEFAULTS et PACKET_DEFAULTS
+            random_seed: Graine des phases, pertes et durées d'émission
+        """
+        defines = read_firmware_defines() if config is None else config
+        self.config = {**ENERGY_DEFAULTS, **PACKET_DEFAULTS, **defines}
+        self.random_seed = random_seed
+        topology = DodagTopology(positions, sink, radio_range)
+        n = topology.num_nodes
+        self.num_nodes = n
+        self.sink_index = n
+
+        etx = 1.0 / np.maximum(link_prr(topology.candidate_distance, radio_range), 1e-3)
+        scores = np.zeros(n) if scores is None else np.asarray(scores, dtype=np.float64)
+        parents = topology.select_parents(scores[None], link_scores=-etx[None])[0]
+        connected = topology.path_product(parents, np.ones(n))[0] > 0
+        self.parents = np.where(connected, parents, -1)
+        distance = np.where(self.parents >= 0, topology.parent_distance(self.parents)[0], 0.0)
+        self.link_prr = np.where(self.parents >= 0, link_prr(distance, radio_range), 0.0)
+
+        # Chemin de chaque client jusqu'au sink (vide si déconnecté)
+        self.paths = []
+        for node in range(n):
+            path = [node]
+            if connected[node]:
+                while path[-1] != n:
+                    path.append(int(self.parents[path[-1]]))
+            self.paths.append(path if connected[node] else [])
+        self.hops = np.array([max(len(p) - 1, 0) for p in self.paths])
+
+    def run(self, duration: float, death_times: Optional[np.ndarray] = None, bin_size: float = 60.0,
+            on_bin: Optional[Callable] = None) -> Dict:
+        """
+        Simule duration secondes de trafic
+
+        Un client envoie un message toutes les UDP_CLIENT_INTERVAL s (phase
+        aléatoire). Chaque saut passe par la file FIFO du nœud émetteur
+        (QUEUEBUF_NUM places, paquet écarté si elle est pleine), une trame non
+        acquittée étant réémise jusqu'à CSMA_MAX_FRAME_RETRIES fois ; une émission
+        vers un nœud en veille dure une période d'échantillonnage tirée
+        uniformément (préambule ContikiMAC), vers le sink toujours allumé la
+        seule durée de la trame. Le sink accuse réception de chaque copie ;
+        sans ACK après ACK_TIMEOUT, le client renvoie le message jusqu'à
+        UDP_CLIENT_CONF_RETRANSMISSIONS fois. Un message est compté perdu
+        lorsque le client l'a abandonné et que sa dernière copie en vol a
+        disparu sans atteindre le sink ; une copie tardive livrée après
+        l'abandon compte comme livrée, jamais comme les deux.
+
+        Args:
+            duration: Durée simulée en secondes
+            death_times: Instant de mort (s) de chaque client, inf s'il survit
+            bin_size: Largeur des intervalles des séries (s)
+            on_bin: Fonction (intervalle, envoyés, livrés, somme des latences
+                    en ms), appelée pour chaque intervalle avec des tableaux (n,)
+
+        Returns:
+            Séries par intervalle ("generated", "delivered", "latency_ms"
+            moyenne, "acked", "retransmissions", "lost", "queue_drops",
+            "link_losses"), "max_queue" par nœud, "events", "elapsed" (s),
+            "peak_packets", "pool_bytes"
+        """
+        started = time.perf_counter()
+        c = self.config
+        rng = random.Random(self.random_seed)
+        draw = rng.random
+        n = self.num_nodes
+        sink = self.sink_index
+        end = int(duration * 1e6)
+        bin_us = int(bin_size * 1e6)
+        num_bins = max(1, -(-end // bin_us))
+
+        period = int(c["UDP_CLIENT_INTERVAL"] * 1e6)
+        ack_timeout = int(c["ACK_TIMEOUT"] * 1e6)
+        max_attempts = 1 + int(c["UDP_CLIENT_CONF_RETRANSMISSIONS"])
+        mac_attempts = 1 + int(c["CSMA_MAX_FRAME_RETRIES"])
+        capacity = int(c["QUEUEBUF_NUM"])
+        processing = int(c["SINK_PROCESSING"] * 1e6)
+        bit_us = 8e6 / c["BITRATE"]
+        data_airtime = int(c["DATA_FRAME_BYTES"] * bit_us)
+        ack_airtime = int(c["ACK_FRAME_BYTES"] * bit_us)
+        wake_period = int(1e6 / c["CHANNEL_CHECK_RATE"])
+
+        if death_times is None:
+            death = [end + 1] * (n + 1)
+        else:
+            death = [min(int(t * 1e6), end + 1) if np.isfinite(t) else end + 1 for t in death_times] + [end + 1]
+        paths = self.paths
+        prr = self.link_prr.tolist()
+
+        # Enregistrements : messages (un par envoi applicatif) et paquets
+        # (copies de données ou ACK en vol, refs = paquets du message en vol)
+        messages = RecordPool(("src", "created", "attempts", "timeout", "flags", "refs"))
+        packets = RecordPool(("msg", "hop", "dir", "tries"))
+        m_src, m_created, m_attempts = (messages.columns[f] for f in ("src", "created", "attempts"))
+        m_timeout, m_flags, m_refs = (messages.columns[f] for f in ("timeout", "flags", "refs"))
+        p_msg, p_hop, p_dir, p_tries = (packets.columns[f] for f in ("msg", "hop", "dir", "tries"))
+
+        queued = [0] * (n + 1)
+        max_queue = [0] * (n + 1)
+        busy_until = [0] * (n + 1)
+
+        series = {name: [0] * num_bins for name in ("generated", "delivered", "acked", "retransmissions",
+                                                    "lost", "queue_drops", "link_losses")}
+        latency_sum = [0.0] * num_bins
+        bin_generated = [0] * n
+        bin_delivered = [0] * n
+        bin_latency = [0.0] * n
+        current_bin = 0
+        bin_end = bin_us
+
+        heap = []
+        shift_slot = _KIND_BITS
+        shift_time = _KIND_BITS + _SLOT_BITS
+        heappush, heappop = heapq.heappush, heapq.heappop
+
+        def release_message(m):
+            # Abandonné sans qu'aucune copie n'ait atteint le sink : perdu
+            if not m_flags[m] & _DELIVERED:
+                series["lost"][current_bin] += 1
+            messages.release(m)
+
+        def release_packet(p):
+            m = p_msg[p]
+            packets.release(p)
+            m_refs[m] -= 1
+            if m_refs[m] == 0 and m_flags[m] & _DONE:
+                release_message(m)
+
+        def finish(m):
+            m_flags[m] |= _DONE
+            m_timeout[m] = -1
+            if m_refs[m] == 0:
+                release_message(m)
+
+        def transmit(p, node, now):
+            """Planifie la fin d'émission du paquet par le nœud (FIFO, un émetteur)"""
+            path = paths[m_src[p_msg[p]]]
+            receiver = path[p_hop[p] + p_dir[p]]
+            airtime = data_airtime if p_dir[p] > 0 else ack_airtime
+            service = airtime if receiver == sink else airtime + int(draw() * wake_period)
+            start = busy_until[node] if busy_until[node] > now else now
+            busy_until[node] = start + service
+            heappush(heap, ((start + service) << shift_time) | (p << shift_slot) | EVENT_HOP)
+
+        def enqueue(p, node, now):
+            """Place le paquet dans la file du nœud (écarté si elle est pleine)"""
+            if now >= death[node] or queued[node] >= capacity:
+                series["queue_drops"][current_bin] += 1
+                release_packet(p)
+                return
+            queued[node] += 1
+            if queued[node] > max_queue[node]:
+                max_queue[node] = queued[node]
+            p_tries[p] = 1
+            transmit(p, node, now)
+
+        def send(m, now):
+            """Nouvelle tentative d'envoi du message depuis sa source"""
+            m_attempts[m] += 1
+            m_timeout[m] = now + ack_timeout
+            heappush(heap, ((now + ack_timeout) << shift_time) | (m << shift_slot) | EVENT_TIMEOUT)
+            p = packets.allocate()
+            p_msg[p] = m
+            p_hop[p] = 0
+            p_dir[p] = 1
+            m_refs[m] += 1
+            enqueue(p, m_src[m], now)
+
+        for node in range(n):
+            if paths[node]:
+                heappush(heap, (int(draw() * period) << shift_time) | (node << shift_slot) | EVENT_SEND)
+
+        processed = 0
+        while heap:
+            event = heappop(heap)
+            now = event >> shift_time
+            if now >= end:
+                break
+            slot = (event >> shift_slot) & _SLOT_MASK
+            kind = event & 3
+            processed += 1
+
+            while now >= bin_end:
+                if on_bin is not None:
+                    on_bin(current_bin, np.array(bin_generated), np.array(bin_delivered), np.array(bin_latency))
+                bin_generated = [0] * n
+                bin_delivered = [0] * n
+                bin_latency = [0.0] * n
+                current_bin += 1
+                bin_end += bin_us
+
+            if kind == EVENT_HOP:
+                p = slot
+                m = p_msg[p]
+                src = m_src[m]
+                path = paths[src]
+                hop = p_hop[p]
+                direction = p_dir[p]
+                sender = path[hop]
+                hop += direction
+                # Le lien est celui du nœud le plus éloigné du sink
+                if draw() >= prr[sender if direction > 0 else path[hop]] or now >= death[path[hop]]:
+                    if p_tries[p] < mac_attempts and now < death[sender]:
+                        # Trame non acquittée : réémise après celles déjà planifiées
+                        p_tries[p] += 1
+                        transmit(p, sender, now)
+                        continue
+                    queued[sender] -= 1
+                    series["link_losses"][current_bin] += 1
+                    release_packet(p)
+                    continue
+                queued[sender] -= 1
+                p_hop[p] = hop
+                if direction > 0 and path[hop] == sink:
+                    if not m_flags[m] & _DELIVERED:
+                        m_flags[m] |= _DELIVERED
+                        latency = (now - m_created[m]) * 1e-3
+                        series["delivered"][current_bin] += 1
+                        latency_sum[current_bin] += latency
+                        bin_delivered[src] += 1
+                        bin_latency[src] += latency
+                    # La copie devient l'ACK du sink, renvoyé par le chemin inverse
+                    p_dir[p] = -1
+                    enqueue(p, sink, now + processing)
+                elif direction < 0 and hop == 0:
+                    if not m_flags[m] & _DONE:
+                        series["acked"][current_bin] += 1
+                        finish(m)
+                    release_packet(p)
+                else:
+                    enqueue(p, path[hop], now)
+
+            elif kind == EVENT_SEND:
+                node = slot
+                if now >= death[node]:
+                    continue
+                heappush(heap, ((now + period) << shift_time) | (node << shift_slot) | EVENT_SEND)
+                m = messages.allocate()
+                m_src[m] = node
+                m_created[m] = now
+                m_attempts[m] = 0
+                m_flags[m] = 0
+                m_refs[m] = 0
+                series["generated"][current_bin] += 1
+                bin_generated[node] += 1
+                send(m, now)
+
+            else:  # EVENT_TIMEOUT
+                m = slot
+                if m_timeout[m] != now or m_flags[m] & _DONE:
+                    continue
+                if m_attempts[m] < max_attempts and now < death[m_src[m]]:
+                    series["retransmissions"][current_bin] += 1
+                    send(m, now)
+                else:
+                    finish(m)
+
+        while current_bin < num_bins:
+            if on_bin is not None:
+                on_bin(current_bin, np.array(bin_generated), np.array(bin_delivered), np.array(bin_latency))
+            bin_generated = [0] * n
+            bin_delivered = [0] * n
+            bin_latency = [0.0] * n
+            current_bin += 1
+
+        result = {name: np.array(values, dtype=np.int64) for name, values in series.items()}
+        delivered = result["delivered"]
+        result["latency_ms"] = np.divide(latency_sum, delivered, out=np.full(num_bins, np.nan),
+                                         where=delivered > 0)
+        result["max_queue"] = np.array(max_queue, dtype=np.int64)
+        result["events"] = processed
+        result["elapsed"] = time.perf_counter() - started
+        result["peak_packets"] = packets.peak
+        result["pool_bytes"] = messages.nbytes() + packets.nbytes()
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trafic UDP client -> sink à l'échelle du paquet")
+    parser.add_argument("-n", "--nodes", type=int, default=40,
+                       help="Nombre de clients (défaut: 40)")
+    parser.add_argument("-d", "--duration", type=int, default=3600,
+                       help="Durée simulée en secondes (défaut: 3600)")
+    parser.add_argument("-a", "--area", type=float, default=500.0,
+                       help="Côté de la zone de déploiement en mètres (défaut: 500)")
+    parser.add_argument("-r", "--range", type=float, default=150.0,
+                       help="Portée radio en mètres (défaut: 150)")
+    parser.add_argument("-i", "--interval", type=float, default=None,
+                       help="Période d'envoi des clients en secondes (défaut: UDP_CLIENT_INTERVAL)")
+    parser.add_argument("-s", "--seed", type=int, default=12345,
+                       help="Graine aléatoire (défaut: 12345)")
+    args = parser.parse_args()
+
+    sink = (50.0, 50.0)
+    positions = generate_layout(args.nodes, (args.area, args.area), sink, seed=args.seed)
+    config = read_firmware_defines()
+    if args.interval is not None:
+        config["UDP_CLIENT_INTERVAL"] = args.interval
+    engine = PacketEngine(positions, sink, args.range, config=config, random_seed=args.seed)
+    result = engine.run(args.duration)
+
+    generated = result["generated"].sum()
+    delivered = result["delivered"].sum()
+    lost = result["lost"].sum()
+    print(f"{args.nodes} clients, {engine.hops.max()} sauts au plus, {args.duration} s simulées")
+    print(f"Messages: {generated}  livrés: {delivered} ({delivered / max(generated, 1) * 100:.1f} %)  "
+          f"perdus: {lost}  en cours: {generated - delivered - lost}  "
+          f"retransmissions: {result['retransmissions'].sum()}")
+    print(f"Latence moyenne: {np.nanmean(result['latency_ms']):.1f} ms  "
+          f"rejets en file: {result['queue_drops'].sum()}  file max: {result['max_queue'].max()}")
+    print(f"{result['events']} événements en {result['elapsed']:.2f} s "
+          f"({result['events'] / max(result['elapsed'], 1e-9) * 60:,.0f} événements/min), "
+          f"{result['peak_packets']} paquets en vol au plus, pool {result['pool_bytes'] / 1024:.0f} Kio")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Moteur de placement spatial des nœuds RPL-AER
+Grille de hachage spatiale, dispositions uniforme / Poisson-disk / en grappes
+et vérification de la connectivité radio vers le sink
+"""
+
+import math
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+LAYOUTS = ("uniform", "poisson", "clustered")
+
+
+class SpatialHashGrid:
+    def __init__(self, positions: np.ndarray, cell_size: float):
+        """
+        Index spatial par cellules carrées
+
+        Args:
+            positions: Tableau (n, 2) des positions indexées
+            cell_size: Côté des cellules (en général la portée radio)
+        """
+        self.cell_size = float(cell_size)
+        self.positions = np.array(positions, dtype=np.float64).reshape(-1, 2)
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+
+        cx, cy = self._cells_of(self.positions)
+        for i, key in enumerate(zip(cx.tolist(), cy.tolist())):
+            self.cells.setdefault(key, []).append(i)
+
+    def _cells_of(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        cells = np.floor(points / self.cell_size).astype(np.int64)
+        return cells[:, 0], cells[:, 1]
+
+    def cell_of(self, point) -> Tuple[int, int]:
+        """Retourne la cellule contenant un point"""
+        return (int(math.floor(point[0] / self.cell_size)),
+                int(math.floor(point[1] / self.cell_size)))
+
+    def move(self, index: int, point):
+        """Déplace un point indexé (seules ses deux cellules sont modifiées)"""
+        old = self.cell_of(self.positions[index])
+        new = self.cell_of(point)
+        self.positions[index] = point
+        if old != new:
+            members = self.cells[old]
+            members.remove(index)
+            if not members:
+                del self.cells[old]
+            self.cells.setdefault(new, []).append(index)
+
+    def candidates(self, point, radius: float) -> np.ndarray:
+        """Indices des points des cellules intersectant le disque (non filtrés)"""
+        reach = int(math.ceil(radius / self.cell_size))
+        cx, cy = self.cell_of(point)
+        found = []
+        for dx in range(-reach, reach + 1):
+            for dy in range(-reach, reach + 1):
+                members = self.cells.get((cx + dx, cy + dy))
+                if members:
+                    found.extend(members)
+        return np.array(found, dtype=np.int64)
+
+    def query_radius(self, point, radius: float) -> np.ndarray:
+        """Indices des points situés à une distance <= radius du point"""
+        idx = self.candidates(point, radius)
+        if len(idx) == 0:
+            return idx
+        delta = self.positions[idx] - np.asarray(point, dtype=np.float64)
+        return idx[np.einsum("ij,ij->i", delta, delta) <= radius * radius]
+
+
+def _far_from_sink(points: np.ndarray, sink: Tuple[float, float], min_distance: float) -> np.ndarray:
+    delta = points - np.asarray(sink, dtype=np.float64)
+    return np.einsum("ij,ij->i", delta, delta) >= min_distance * min_distance
+
+
+def uniform_positions(n: int, area: Tuple[float, float], rng: np.random.Generator,
+                      sink: Tuple[float, float] = (0.0, 0.0),
+                      min_sink_distance: float = 0.0, max_batches: int = 200) -> np.ndarray:
+    """Tire n positions uniformes, par lots, hors du disque de garde du sink"""
+    if n <= 0:
+        return np.empty((0, 2), dtype=np.float64)
+    accepted = []
+    count = 0
+    for _ in range(max_batches):
+        if count >= n:
+            break
+        batch = rng.uniform((0.0, 0.0), area, size=(max(2 * (n - count), 16), 2))
+        batch = batch[_far_from_sink(batch, sink, min_sink_distance)]
+        accepted.append(batch)
+        count += len(batch)
+
+    if count < n:
+        raise ValueError(f"Impossible de placer {n} nœuds hors du disque de garde du sink "
+                         f"({min_sink_distance} m) dans une zone {area[0]}x{area[1]} (placés: {count})")
+    return np.concatenate(accepted)[:n]
+
+
+def poisson_disk_positions(n: int, area: Tuple[float, float], min_spacing: float,
+                           rng: np.random.Generator,
+                           sink: Tuple[float, float] = (0.0, 0.0),
+                           min_sink_distance: float = 0.0,
+                           max_batches: int = 200) -> np.ndarray:
+    """
+    Tire n positions espacées d'au moins min_spacing (Poisson-disk)
+
+    Les candidats sont tirés par lots et testés de façon vectorisée contre
+    une grille d'occupation de pas min_spacing/√2 (au plus un point par
+    cellule) ; seuls les survivants sont insérés un par un.
+    """
+    if min_spacing <= 0:
+        return uniform_positions(n, area, rng, sink, min_sink_distance)
+
+    cell = min_spacing / math.sqrt(2)
+    grid_w = int(math.ceil(area[0] / cell)) + 1
+    grid_h = int(math.ceil(area[1] / cell)) + 1
+    # Marge de 2 cellules autour de la grille pour éviter les tests de bord
+    grid = np.full((grid_w + 4, grid_h + 4), -1, dtype=np.int64)
+    offsets = np.array([(dx, dy) for dx in range(-2, 3) for dy in range(-2, 3)], dtype=np.int64)
+
+    points = np.empty((n, 2), dtype=np.float64)
+    count = 0
+    spacing2 = min_spacing * min_spacing
+
+    for _ in range(max_batches):
+        if count >= n:
+            break
+
+        batch = uniform_positions(max(4 * (n - count), 64), area, rng, sink, min_sink_distance)
+        cells = np.floor(batch / cell).astype(np.int64) + 2
+
+        # Rejet vectorisé des candidats trop proches des points déjà placés
+        neigh = grid[cells[:, None, 0] + offsets[None, :, 0], cells[:, None, 1] + offsets[None, :, 1]]
+        occupied = neigh >= 0
+        delta = points[np.where(occupied, neigh, 0)] - batch[:, None, :]
+        too_close = occupied & (np.einsum("ijk,ijk->ij", delta, delta) < spacing2)
+        survivors = np.flatnonzero(~too_close.any(axis=1))
+
+        # Insertion séquentielle : les survivants d'un même lot peuvent se gêner
+        for i in survivors.tolist():
+            cx, cy = cells[i]
+            if grid[cx, cy] >= 0:
+                continue
+            block = grid[cx - 2:cx + 3, cy - 2:cy + 3]
+            placed = block[block >= 0]
+            if len(placed):
+                d = points[placed] - batch[i]
+                if np.min(np.einsum("ij,ij->i", d, d)) < spacing2:
+                    continue
+            points[count] = batch[i]
+            grid[cx, cy] = count
+            count += 1
+            if count >= n:
+                break
+
+    if count < n:
+        raise ValueError(f"Impossible de placer {n} nœuds espacés de {min_spacing} m "
+                         f"dans une zone {area[0]}x{area[1]} (placés: {count})")
+    return points
+
+
+def clustered_positions(n: int, area: Tuple[float, float], num_clusters: int,
+                        cluster_std: float, rng: np.random.Generator,
+                        sink: Tuple[float, float] = (0.0, 0.0),
+                        min_sink_distance: float = 0.0, max_batches: int = 200) -> np.ndarray:
+    """Tire n positions regroupées autour de centres uniformes (processus de Thomas)"""
+    if n <= 0:
+        return np.empty((0, 2), dtype=np.float64)
+    centers = rng.uniform((0.0, 0.0), area, size=(max(1, num_clusters), 2))
+    accepted = []
+    count = 0
+    for _ in range(max_batches):
+        if count >= n:
+            break
+        size = max(2 * (n - count), 16)
+        batch = centers[rng.integers(0, len(centers), size)] + rng.normal(0.0, cluster_std, size=(size, 2))
+        inside = (batch >= 0).all(axis=1) & (batch[:, 0] <= area[0]) & (batch[:, 1] <= area[1])
+        batch = batch[inside & _far_from_sink(batch, sink, min_sink_distance)]
+        accepted.append(batch)
+        count += len(batch)
+
+    if count < n:
+        raise ValueError(f"Impossible de placer {n} nœuds regroupés hors du disque de garde du sink "
+                         f"({min_sink_distance} m) dans une zone {area[0]}x{area[1]} (placés: {count})")
+    return np.concatenate(accepted)[:n]
+
+
+def reachable_from_sink(positions: np.ndarray, sink: Tuple[float, float],
+                        radio_range: float) -> np.ndarray:
+    """
+    Calcule les nœuds reliés au sink par une chaîne de liens radio
+
+    Parcours en largeur sur la grille de hachage : chaque nœud visité ne
+    teste que les nœuds des cellules voisines, soit un coût en O(n·k) au
+    lieu des O(n²) comparaisons par paires.
+
+    Returns:
+        Masque booléen (n,) des nœuds atteignant le sink
+    """
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+    n = len(positions)
+    grid = SpatialHashGrid(np.vstack([positions, np.asarray(sink, dtype=np.float64)]), radio_range)
+
+    visited = np.zeros(n + 1, dtype=bool)
+    visited[n] = True
+    queue = deque([n])
+    while queue:
+        current = queue.popleft()
+        neighbors = grid.query_radius(grid.positions[current], radio_range)
+        fresh = neighbors[~visited[neighbors]]
+        visited[fresh] = True
+        queue.extend(fresh.tolist())
+
+    return visited[:n]
+
+
+def generate_layout(n: int, area: Tuple[float, float], sink: Tuple[float, float],
+                    layout: str = "uniform", seed: Optional[int] = None,
+                    min_sink_distance: float = 20.0, min_spacing: float = 0.0,
+                    num_clusters: int = 5, cluster_std: float = 40.0,
+                    radio_range: Optional[float] = None, max_attempts: int = 20) -> np.ndarray:
+    """
+    Génère une topologie de n nœuds
+
+    Args:
+        layout: "uniform", "poisson" (espacement minimal min_spacing) ou "clustered"
+        radio_range: Si fourni, la topologie est retirée jusqu'à ce que tous
+                     les nœuds atteignent le sink (au plus max_attempts tirages)
+
+    Returns:
+        Tableau (n, 2) des positions
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Disposition inconnue: {layout} (choix: {', '.join(LAYOUTS)})")
+
+    rng = np.random.default_rng(seed)
+    for _ in range(max_attempts):
+        if layout == "uniform":
+            positions = uniform_positions(n, area, rng, sink, min_sink_distance)
+        elif layout == "poisson":
+            positions = poisson_disk_positions(n, area, min_spacing, rng, sink, min_sink_distance)
+        else:
+            positions = clustered_positions(n, area, num_clusters, cluster_std, rng, sink, min_sink_distance)
+
+        if radio_range is None or reachable_from_sink(positions, sink, radio_range).all():
+            return positions
+
+    raise ValueError(f"Aucune topologie connexe trouvée en {max_attempts} tirages "
+                     f"(portée radio {radio_range} m)")
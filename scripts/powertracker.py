@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Analyse en flux des statistiques radio du plugin PowerTracker de Cooja
+Temps radio allumé / émission / réception / interférence par mote et par
+fenêtre, stockés en tableaux typés, et conversion vectorisée en mJ
+"""
+
+import argparse
+import gzip
+import re
+from typing import Dict, Optional
+
+import numpy as np
+
+# Modèles de puissance radio : tension (V) et courants (mA) par état.
+# "listen" couvre le temps allumé hors émission/réception (écoute passive).
+RADIO_POWER_MODELS = {
+    "cc2420": {"voltage": 3.0, "tx": 17.4, "rx": 18.8, "interfered": 18.8, "listen": 18.8},
+    "cc2538": {"voltage": 3.0, "tx": 24.0, "rx": 20.0, "interfered": 20.0, "listen": 20.0},
+}
+DEFAULT_RADIO_MODEL = "cc2420"
+
+STATES = ("monitored", "on", "tx", "rx", "interfered")
+_STATE_FIELDS = {b"MONITORED": 0, b"ON": 1, b"TX": 2, b"RX": 3, b"INT": 4}
+
+# Sortie de PowerTracker.radioStatistics() : "<mote> <ÉTAT> <durée> us [<part> %]",
+# le nom du mote se terminant par son identifiant (ex. "Sky 3", "sky_3")
+_STAT = re.compile(rb"[A-Za-z][A-Za-z0-9]*?[ _]?(\d+)\s+(MONITORED|ON|TX|RX|INT)\s+(\d+)\s*us")
+
+def _open(path: str):
+    return gzip.open(path, "rb") if path.endswith(".gz") else open(path, "rb")
+
+
+def _compact(values: np.ndarray) -> np.ndarray:
+    """Plus petit type entier non signé contenant les valeurs"""
+    top = int(values.max()) if values.size else 0
+    for dtype in (np.uint32, np.uint64):
+        if top <= np.iinfo(dtype).max:
+            return values.astype(dtype)
+    return values
+
+
+class RadioTable:
+    def __init__(self, mote_ids: np.ndarray, times: Dict[str, np.ndarray]):
+        """
+        Temps radio par fenêtre (lignes) et par mote (colonnes), en microsecondes
+
+        Args:
+            mote_ids: Identifiants Cooja des motes (M,)
+            times: États de STATES -> tableau (W, M)
+        """
+        self.mote_ids = np.asarray(mote_ids)
+        self.times = times
+
+    @property
+    def num_windows(self) -> int:
+        return len(self.times["monitored"])
+
+    def seconds(self, state: str) -> np.ndarray:
+        """Temps passé dans un état (ou "listen"), en secondes (W, M)"""
+        if state == "listen":
+            busy = self.seconds("tx") + self.seconds("rx") + self.seconds("interfered")
+            return np.maximum(self.seconds("on") - busy, 0.0)
+        return self.times[state].astype(np.float64) * 1e-6
+
+    def duty_cycle(self) -> np.ndarray:
+        """Part du temps radio allumé par fenêtre (W, M), NaN sans mesure"""
+        monitored = self.seconds("monitored")
+        return np.divide(self.seconds("on"), monitored, out=np.full(monitored.shape, np.nan),
+                         where=monitored > 0)
+
+    def window_start(self) -> np.ndarray:
+        """Début de chaque fenêtre en secondes (durée mesurée la plus longue)"""
+        lengths = self.seconds("monitored").max(axis=1) if self.mote_ids.size else np.zeros(self.num_windows)
+        return np.concatenate([[0.0], np.cumsum(lengths)[:-1]])
+
+    def energy_mj(self, model: str = DEFAULT_RADIO_MODEL, **overrides) -> Dict[str, np.ndarray]:
+        """
+        Énergie radio (mJ) par état, fenêtre et mote
+
+        Args:
+            model: Nom d'un modèle de RADIO_POWER_MODELS
+            overrides: Valeurs remplaçant celles du modèle (ex. voltage=3.3, tx=20.0)
+
+        Returns:
+            États "tx", "rx", "interfered", "listen" et "total" -> tableau (W, M)
+        """
+        if model not in RADIO_POWER_MODELS:
+            raise ValueError(f"Modèle radio inconnu: {model} (choix: {', '.join(RADIO_POWER_MODELS)})")
+        params = dict(RADIO_POWER_MODELS[model])
+        for key, value in overrides.items():
+            if key not in params:
+                raise ValueError(f"Paramètre inconnu: {key}")
+            params[key] = float(value)
+
+        # V × mA × s = mJ
+        energy = {state: params["voltage"] * params[state] * self.seconds(state)
+                  for state in ("tx", "rx", "interfered", "listen")}
+        energy["total"] = sum(energy.values())
+        return energy
+
+    def save(self, path: str):
+        np.savez_compressed(path, mote_ids=self.mote_ids, **self.times)
+
+    @classmethod
+    def load(cls, path: str) -> "RadioTable":
+        with np.load(path) as data:
+            return cls(data["mote_ids"], {state: data[state] for state in STATES})
+
+
+class PowerTrackerParser:
+    def __init__(self, cumulative: Optional[bool] = None):
+        """
+        Analyseur incrémental des blocs radioStatistics()
+
+        Chaque ligne MONITORED ouvre un nouveau relevé pour son mote ; le
+        k-ième relevé d'un mote forme la fenêtre k. Les valeurs sont gardées
+        sous forme de triplets entiers (mote, fenêtre, état, durée) : la
+        mémoire ne dépend que du nombre de relevés, pas de la taille du log.
+
+        Args:
+            cumulative: Relevés cumulés depuis le début (différenciés fenêtre
+                        par fenêtre) ou remis à zéro après chaque affichage ;
+                        détecté d'après MONITORED si None
+        """
+        self.cumulative = cumulative
+        self._chunks = []
+        self._windows: Dict[int, int] = {}
+        self.lines = 0
+
+    def feed(self, block: bytes):
+        """Analyse un bloc de lignes complètes (bytes) ; seules celles contenant " us" sont examinées"""
+        lines = block.split(b"\n")
+        self.lines += len(lines) - 1
+        matches = _STAT.findall(b"\n".join([line for line in lines if b" us" in line]))
+        if not matches:
+            return
+        motes, states, durations = zip(*matches)
+        motes = np.array(motes).astype(np.int64)
+        fields = np.array([_STATE_FIELDS[state] for state in states], dtype=np.int64)
+        durations = np.array(durations).astype(np.int64)
+
+        # Fenêtre de chaque valeur : nombre de MONITORED déjà vus pour son
+        # mote (blocs précédents compris), moins un
+        unique, group = np.unique(motes, return_inverse=True)
+        opened = (fields == 0).astype(np.int64)
+        order = np.argsort(group, kind="stable")
+        running = np.cumsum(opened[order])
+        starts = np.searchsorted(group[order], np.arange(len(unique)))
+        before = np.concatenate([[0], running])[starts]
+        carried = np.array([self._windows.get(m, 0) for m in unique.tolist()], dtype=np.int64)
+        windows = np.empty_like(motes)
+        windows[order] = carried[group[order]] + running - before[group[order]] - 1
+        for mote, count in zip(unique.tolist(), (carried + np.bincount(group, weights=opened,
+                                                                        minlength=len(unique)).astype(np.int64)).tolist()):
+            self._windows[mote] = count
+
+        keep = windows >= 0
+        self._chunks.append(np.column_stack([motes, windows, fields, durations])[keep])
+
+    def finish(self) -> RadioTable:
+        """Construit la table dense (fenêtres × motes)"""
+        records = np.concatenate(self._chunks) if self._chunks else np.zeros((0, 4), dtype=np.int64)
+        motes, column = np.unique(records[:, 0], return_inverse=True)
+        num_windows = int(records[:, 1].max()) + 1 if len(records) else 0
+
+        grid = np.zeros((len(STATES), num_windows, len(motes)), dtype=np.int64)
+        grid[records[:, 2], records[:, 1], column] = records[:, 3]
+
+        cumulative = self.cumulative
+        if cumulative is None:
+            # MONITORED strictement croissant pour chaque mote : relevés cumulés
+            cumulative = num_windows > 1 and bool((np.diff(grid[0], axis=0) > 0).all())
+        if cumulative:
+            grid = np.diff(grid, axis=1, prepend=0)
+            np.maximum(grid, 0, out=grid)
+
+        return RadioTable(motes, {state: _compact(grid[i]) for i, state in enumerate(STATES)})
+
+
+def parse_powertracker(path: str, cumulative: Optional[bool] = None,
+                       block_size: int = 1 << 22) -> RadioTable:
+    """
+    Lit un log Cooja (éventuellement .gz) contenant des sorties PowerTracker
+
+    Le fichier est lu par blocs de block_size octets coupés à la dernière
+    fin de ligne : la mémoire reste bornée quelle que soit sa taille.
+    """
+    parser = PowerTrackerParser(cumulative)
+    pending = b""
+    with _open(path) as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            block = pending + block
+            end = block.rfind(b"\n") + 1
+            pending = block[end:]
+            parser.feed(block[:end])
+    if pending:
+        parser.feed(pending + b"\n")
+    return parser.finish()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps radio PowerTracker par mote et par fenêtre")
+    parser.add_argument("log", type=str,
+                       help="Log Cooja contenant les sorties de PowerTracker (.log ou .log.gz)")
+    parser.add_argument("-m", "--model", choices=sorted(RADIO_POWER_MODELS), default=DEFAULT_RADIO_MODEL,
+                       help=f"Modèle de puissance radio (défaut: {DEFAULT_RADIO_MODEL})")
+    parser.add_argument("--voltage", type=float, default=None,
+                       help="Tension d'alimentation en V (défaut: celle du modèle)")
+    parser.add_argument("--cumulative", choices=("auto", "yes", "no"), default="auto",
+                       help="Relevés cumulés depuis le début de la simulation (défaut: auto)")
+    parser.add_argument("-o", "--output", type=str, default=None,
+                       help="Fichier .npz de la table radio (défaut: aucun)")
+    args = parser.parse_args()
+
+    cumulative = {"auto": None, "yes": True, "no": False}[args.cumulative]
+    table = parse_powertracker(args.log, cumulative)
+    if not table.mote_ids.size:
+        print("Aucune statistique PowerTracker trouvée")
+        return
+    if args.output:
+        table.save(args.output)
+
+    overrides = {} if args.voltage is None else {"voltage": args.voltage}
+    energy = table.energy_mj(args.model, **overrides)["total"].sum(axis=0)
+    duty = np.nanmean(table.duty_cycle(), axis=0)
+    print(f"{len(table.mote_ids)} motes, {table.num_windows} fenêtres")
+    print("Mote  Duty cycle (%)  Énergie radio (mJ)")
+    for mote, d, e in zip(table.mote_ids.tolist(), duty.tolist(), energy.tolist()):
+        print(f"{mote:4d}  {d * 100:14.2f}  {e:18.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Stockage sur disque des matrices de résultats du simulateur RPL-AER
+Fichiers np.memmap (pas de temps × nœuds) en précision réduite, écrits par
+blocs de temps, et réductions par blocs pour une lecture paresseuse
+"""
+
+import json
+import os
+from typing import Dict, Sequence
+
+import numpy as np
+
+DTYPES = ("float64", "float32", "float16")
+META_FILE = "meta.json"
+
+# Nombre de lignes (pas stockés) lues à la fois par les réductions
+DEFAULT_CHUNK_ROWS = 4096
+
+
+class ResultStore:
+    def __init__(self, directory: str, mode: str = "r"):
+        """
+        Ouvre un dossier de résultats existant
+
+        Args:
+            directory: Dossier contenant meta.json et un fichier .dat par métrique
+            mode: "r" (lecture seule) ou "r+" (modification)
+        """
+        self.directory = directory
+        self.mode = mode
+        with open(os.path.join(directory, META_FILE), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self._arrays: Dict[str, np.memmap] = {}
+
+    @classmethod
+    def create(cls, directory: str, num_rows: int, num_nodes: int, metrics: Sequence[str],
+               dtype: str = "float32", stride: int = 1, time_step: float = 60.0) -> "ResultStore":
+        """
+        Crée les fichiers, remplis de zéros
+
+        Args:
+            num_rows: Nombre de pas stockés
+            num_nodes: Nombre de nœuds (colonnes)
+            metrics: Noms des matrices (ex. "energy", "pdr")
+            dtype: "float64", "float32" ou "float16"
+            stride: Un pas simulé sur stride est stocké
+            time_step: Pas de simulation en secondes
+        """
+        if dtype not in DTYPES:
+            raise ValueError(f"Type non supporté: {dtype} (choix: {', '.join(DTYPES)})")
+        os.makedirs(directory, exist_ok=True)
+        meta = {"num_rows": int(num_rows), "num_nodes": int(num_nodes), "metrics": list(metrics),
+                "dtype": dtype, "stride": int(stride), "time_step": float(time_step)}
+        with open(os.path.join(directory, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+        for metric in metrics:
+            # Fichier creux de la taille finale : aucune page n'est écrite ici
+            with open(os.path.join(directory, f"{metric}.dat"), "wb") as f:
+                f.truncate(max(int(num_rows), 1) * int(num_nodes) * np.dtype(dtype).itemsize)
+        return cls(directory, mode="r+")
+
+    @property
+    def shape(self):
+        return self.meta["num_rows"], self.meta["num_nodes"]
+
+    @property
+    def stride(self) -> int:
+        return self.meta["stride"]
+
+    def times(self) -> np.ndarray:
+        """Instants (secondes) des pas stockés"""
+        return np.arange(self.meta["num_rows"]) * self.meta["stride"] * self.meta["time_step"]
+
+    def array(self, metric: str) -> np.memmap:
+        """Matrice (pas stockés, nœuds) d'une métrique, projetée en mémoire"""
+        if metric not in self._arrays:
+            self._arrays[metric] = np.memmap(os.path.join(self.directory, f"{metric}.dat"),
+                                             dtype=self.meta["dtype"], mode=self.mode,
+                                             shape=(max(self.meta["num_rows"], 1), self.meta["num_nodes"]))
+        return self._arrays[metric][:self.meta["num_rows"]]
+
+    def flush(self):
+        for array in self._arrays.values():
+            if self.mode != "r":
+                array.flush()
+
+    def truncate(self, num_rows: int):
+        """Réduit les fichiers aux num_rows premiers pas (arrêt anticipé)"""
+        self.flush()
+        self._arrays.clear()
+        itemsize = np.dtype(self.meta["dtype"]).itemsize
+        for metric in self.meta["metrics"]:
+            os.truncate(os.path.join(self.directory, f"{metric}.dat"),
+                        max(num_rows, 1) * self.meta["num_nodes"] * itemsize)
+        self.meta["num_rows"] = int(num_rows)
+        with open(os.path.join(self.directory, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(self.meta, f, indent=2)
+
+
+def row_mean(array: np.ndarray, columns=None, skip_nan: bool = False,
+             chunk_rows: int = DEFAULT_CHUNK_ROWS) -> np.ndarray:
+    """
+    Moyenne par pas (sur les nœuds), calculée bloc par bloc en float64
+
+    Args:
+        columns: Nœuds retenus (tranche ou indices ; tous par défaut)
+        skip_nan: Ignorer les NaN (NaN si toute la ligne l'est)
+    """
+    columns = slice(None) if columns is None else columns
+    result = np.empty(len(array))
+    for start in range(0, len(array), chunk_rows):
+        block = np.asarray(array[start:start + chunk_rows][:, columns], dtype=np.float64)
+        if skip_nan:
+            count = np.isfinite(block).sum(axis=1)
+            total = np.nansum(block, axis=1)
+            result[start:start + len(block)] = np.where(count > 0, total / np.maximum(count, 1), np.nan)
+        else:
+            result[start:start + len(block)] = block.mean(axis=1)
+    return result
+
+
+def column_min(array: np.ndarray, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> np.ndarray:
+    """Minimum de chaque nœud sur tous les pas, bloc par bloc"""
+    result = np.full(array.shape[1], np.inf)
+    for start in range(0, len(array), chunk_rows):
+        np.minimum(result, np.asarray(array[start:start + chunk_rows], dtype=np.float64).min(axis=0), out=result)
+    return result
+
+
+def overall_mean(array: np.ndarray, skip_nan: bool = False,
+                 chunk_rows: int = DEFAULT_CHUNK_ROWS) -> float:
+    """Moyenne de toute la matrice, bloc par bloc"""
+    total, count = 0.0, 0
+    for start in range(0, len(array), chunk_rows):
+        block = np.asarray(array[start:start + chunk_rows], dtype=np.float64)
+        if skip_nan:
+            finite = np.isfinite(block)
+            total += block[finite].sum()
+            count += int(finite.sum())
+        else:
+            total += block.sum()
+            count += block.size
+    return total / count if count else float("nan")
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Balayage des seuils des détecteurs d'attaques RPL-AER
+Précision, rappel, F1 et taux de faux positifs de tous les seuils candidats
+en un tri et une somme cumulée par indicateur, et grilles conjointes
+"""
+
+import argparse
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from firmware_emulator import ATTACK_NONE, FirmwareEmulator, read_firmware_defines
+
+# Indicateur -> (sens de l'alarme, #define du seuil firmware)
+# "below" : alarme si valeur < seuil ; "above" : alarme si valeur >= seuil
+FEATURE_RULES = {
+    "ack_ratio": ("below", "ACK_RATIO_THRESHOLD"),
+    "forwarding_rate": ("below", "FORWARDING_RATIO_THRESHOLD"),
+    "rank_consistency": ("below", "RANK_CONSISTENCY_THRESHOLD"),
+    "rssi": ("below", "RSSI_THRESHOLD"),
+    "confidence": ("above", "ATTACK_CONFIDENCE_THRESHOLD"),
+}
+
+
+def _metrics(tp: np.ndarray, alarms: np.ndarray, positives: int, negatives: int) -> Dict[str, np.ndarray]:
+    tp = np.asarray(tp, dtype=np.float64)
+    fp = np.asarray(alarms, dtype=np.float64) - tp
+    precision = np.divide(tp, tp + fp, out=np.zeros_like(tp), where=(tp + fp) > 0)
+    recall = tp / positives if positives else np.zeros_like(tp)
+    f1 = np.divide(2 * precision * recall, precision + recall, out=np.zeros_like(tp),
+                   where=(precision + recall) > 0)
+    return {
+        "tp": tp.astype(np.int64),
+        "fp": fp.astype(np.int64),
+        "fn": (positives - tp).astype(np.int64),
+        "tn": (negatives - fp).astype(np.int64),
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "fpr": fp / negatives if negatives else np.zeros_like(tp),
+    }
+
+
+def stream_labels(stream: Dict[str, np.ndarray], attack_type: Optional[int] = None) -> np.ndarray:
+    """Vérité terrain : parent malveillant (d'un type donné, ou de n'importe quel type)"""
+    state = np.asarray(stream["attack_state"])
+    return state != ATTACK_NONE if attack_type is None else state == attack_type
+
+
+def add_confidence(stream: Dict[str, np.ndarray], config: Optional[Dict[str, float]] = None) -> Dict:
+    """
+    Ajoute la confiance de report_attack_event (part des règles de
+    trust_module_anomaly_detect déclenchées aux seuils du firmware)
+    """
+    c = config or read_firmware_defines()
+    rules = (
+        np.asarray(stream["rssi"]) < c["RSSI_THRESHOLD"],
+        ~np.asarray(stream["ack"], dtype=bool),
+        np.asarray(stream["forwarding_rate"]) < c["FORWARDING_RATIO_THRESHOLD"],
+        np.asarray(stream["rank_consistency"]) < c["RANK_CONSISTENCY_THRESHOLD"],
+    )
+    stream = dict(stream)
+    stream["confidence"] = np.mean(rules, axis=0)
+    return stream
+
+
+def sweep_feature(values: np.ndarray, labels: np.ndarray, direction: str = "below",
+                  thresholds: Optional[np.ndarray] = None,
+                  max_thresholds: Optional[int] = None) -> pd.DataFrame:
+    """
+    Matrice de confusion et métriques de chaque seuil d'un indicateur
+
+    Les événements sont triés une fois ; la somme cumulée des étiquettes
+    donne, pour tout seuil, le nombre de vrais positifs parmi les valeurs
+    qui le franchissent (recherche dichotomique dans le tableau trié).
+
+    Args:
+        values: Valeurs de l'indicateur (un événement par entrée)
+        labels: Vérité terrain booléenne
+        direction: "below" (alarme si valeur < seuil) ou "above" (valeur >= seuil)
+        thresholds: Seuils à évaluer (par défaut : toutes les valeurs observées)
+        max_thresholds: Nombre maximal de seuils par défaut (quantiles)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    labels = np.asarray(labels, dtype=bool)
+    order = np.argsort(values, kind="stable")
+    ordered = values[order]
+    cumulative = np.concatenate([[0], np.cumsum(labels[order], dtype=np.int64)])
+    positives = int(cumulative[-1])
+    negatives = len(values) - positives
+
+    if thresholds is None:
+        candidates = np.unique(ordered)
+        if max_thresholds and len(candidates) > max_thresholds:
+            candidates = np.unique(candidates[np.linspace(0, len(candidates) - 1, max_thresholds).astype(np.int64)])
+        # Juste au-dessus de chaque valeur pour une règle stricte (valeur < seuil)
+        thresholds = np.nextafter(candidates, np.inf) if direction == "below" else candidates
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+
+    below = np.searchsorted(ordered, thresholds, side="left")
+    if direction == "below":
+        tp, alarms = cumulative[below], below
+    elif direction == "above":
+        tp, alarms = positives - cumulative[below], len(values) - below
+    else:
+        raise ValueError(f"Sens inconnu: {direction}")
+
+    table = pd.DataFrame({"threshold": thresholds})
+    for key, column in _metrics(tp, alarms, positives, negatives).items():
+        table[key] = column
+    return table
+
+
+def _cumulate(counts: np.ndarray, axis: int, reverse: bool) -> np.ndarray:
+    if reverse:
+        return np.flip(np.cumsum(np.flip(counts, axis), axis=axis), axis)
+    return np.cumsum(counts, axis=axis)
+
+
+def sweep_joint(stream: Dict[str, np.ndarray], labels: np.ndarray, grids: Dict[str, np.ndarray],
+                rule: str = "any", directions: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    Métriques de toutes les combinaisons de seuils de plusieurs indicateurs
+
+    Chaque événement est rangé dans une case de l'histogramme conjoint
+    (positifs et total par case) ; des sommes cumulées le long de chaque
+    axe donnent alors, pour chaque combinaison, le nombre d'événements
+    n'en franchissant aucun (règle "any", comme trust_module_anomaly_detect)
+    ou les franchissant tous (règle "all").
+
+    Args:
+        grids: Indicateur -> seuils candidats (croissants)
+        rule: "any" (alarme si un seuil est franchi) ou "all"
+        directions: Sens de chaque indicateur (défaut : FEATURE_RULES)
+
+    Returns:
+        Une ligne par combinaison : un seuil par indicateur puis les métriques
+    """
+    if rule not in ("any", "all"):
+        raise ValueError(f"Règle inconnue: {rule}")
+    names = list(grids)
+    grids = {name: np.sort(np.asarray(grids[name], dtype=np.float64)) for name in names}
+    directions = {name: (directions or {}).get(name, FEATURE_RULES.get(name, ("below",))[0]) for name in names}
+    labels = np.asarray(labels, dtype=bool)
+    shape = tuple(len(grids[name]) + 1 for name in names)
+
+    # Case d'un événement : nombre de seuils inférieurs ou égaux à sa valeur
+    cells = np.ravel_multi_index(
+        [np.searchsorted(grids[name], np.asarray(stream[name], dtype=np.float64), side="right") for name in names],
+        shape)
+    size = int(np.prod(shape))
+    total = np.bincount(cells, minlength=size).reshape(shape)
+    positive = np.bincount(cells, weights=labels, minlength=size).reshape(shape)
+
+    for axis, name in enumerate(names):
+        # Événement franchissant le seuil j : case <= j ("below") ou > j ("above")
+        crossing_low = directions[name] == "below"
+        reverse = crossing_low if rule == "any" else not crossing_low
+        keep = slice(1, None) if reverse else slice(None, -1)
+        index = [slice(None)] * len(names)
+        index[axis] = keep
+        total = _cumulate(total, axis, reverse)[tuple(index)]
+        positive = _cumulate(positive, axis, reverse)[tuple(index)]
+
+    count = len(labels)
+    positives = int(labels.sum())
+    if rule == "any":
+        alarms, tp = count - total, positives - positive
+    else:
+        alarms, tp = total, positive
+
+    mesh = np.meshgrid(*[grids[name] for name in names], indexing="ij")
+    table = pd.DataFrame({name: axis_values.ravel() for name, axis_values in zip(names, mesh)})
+    for key, column in _metrics(np.rint(tp).ravel(), alarms.ravel(), positives, count - positives).items():
+        table[key] = column
+    return table
+
+
+def quantile_grid(values: np.ndarray, bins: int) -> np.ndarray:
+    """Seuils candidats répartis sur les quantiles d'un indicateur"""
+    return np.unique(np.quantile(np.asarray(values, dtype=np.float64), np.linspace(0, 1, bins)))
+
+
+def operating_point(stream: Dict[str, np.ndarray], labels: np.ndarray,
+                    config: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """
+    Métriques du détecteur du firmware à ses seuils actuels
+
+    Alarme si detect_attack déclenche (ack_ratio < ACK_RATIO_THRESHOLD) ou si
+    report_attack_event classe l'anomalie en [ATTACK].
+    """
+    c = config or read_firmware_defines()
+    stream = add_confidence(stream, c)
+    alarm = (np.asarray(stream["ack_ratio"]) < c["ACK_RATIO_THRESHOLD"]) | \
+            (stream["confidence"] > 0) & (stream["confidence"] >= c["ATTACK_CONFIDENCE_THRESHOLD"])
+    labels = np.asarray(labels, dtype=bool)
+    positives = int(labels.sum())
+    metrics = _metrics(np.array([np.sum(alarm & labels)]), np.array([alarm.sum()]),
+                       positives, len(labels) - positives)
+    return {key: float(value[0]) for key, value in metrics.items()}
+
+
+def load_stream(path: str) -> Dict[str, np.ndarray]:
+    """Relit un flux d'indicateurs (.npz de firmware_emulator.py --indicators)"""
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Balayage des seuils des détecteurs RPL-AER")
+    parser.add_argument("--stream", type=str, default=None,
+                       help="Flux d'indicateurs .npz (défaut: émulé)")
+    parser.add_argument("-n", "--nodes", type=int, default=39,
+                       help="Nombre de nœuds clients émulés (défaut: 39)")
+    parser.add_argument("-d", "--duration", type=int, default=3600,
+                       help="Durée émulée en secondes (défaut: 3600)")
+    parser.add_argument("-f", "--features", nargs="+", default=list(FEATURE_RULES),
+                       help="Indicateurs à balayer (défaut: tous)")
+    parser.add_argument("--joint", nargs="+", default=None,
+                       help="Indicateurs de la grille conjointe (ex. forwarding_rate rank_consistency)")
+    parser.add_argument("--rule", choices=("any", "all"), default="any",
+                       help="Combinaison des seuils de la grille (défaut: any)")
+    parser.add_argument("-b", "--bins", type=int, default=32,
+                       help="Seuils par indicateur de la grille conjointe (défaut: 32)")
+    parser.add_argument("-o", "--output", type=str, default="threshold_sweep",
+                       help="Préfixe des fichiers CSV (défaut: threshold_sweep)")
+    args = parser.parse_args()
+
+    if args.stream:
+        stream = load_stream(args.stream)
+    else:
+        emulator = FirmwareEmulator(num_clients=args.nodes, simulation_duration=args.duration)
+        stream = emulator.run(record_indicators=True)["indicators"]
+    config = read_firmware_defines()
+    stream = add_confidence(stream, config)
+    labels = stream_labels(stream)
+    print(f"{len(labels)} événements, {int(labels.sum())} sous attaque")
+
+    point = operating_point(stream, labels, config)
+    print(f"Seuils firmware: précision={point['precision']:.3f} rappel={point['recall']:.3f} "
+          f"F1={point['f1']:.3f} FPR={point['fpr']:.3f}")
+
+    for name in args.features:
+        direction, define = FEATURE_RULES[name]
+        table = sweep_feature(stream[name], labels, direction)
+        table.to_csv(f"{args.output}_{name}.csv", index=False)
+        best = table.loc[table["f1"].idxmax()]
+        print(f"{name}: seuil actuel {config[define]:g}, meilleur F1={best['f1']:.3f} "
+              f"au seuil {best['threshold']:.3f} (FPR={best['fpr']:.3f})")
+
+    if args.joint:
+        grids = {name: quantile_grid(stream[name], args.bins) for name in args.joint}
+        table = sweep_joint(stream, labels, grids, rule=args.rule)
+        table.to_csv(f"{args.output}_joint.csv", index=False)
+        best = table.loc[table["f1"].idxmax()]
+        seuils = ", ".join(f"{name}={best[name]:.3f}" for name in args.joint)
+        print(f"Grille conjointe ({len(table)} combinaisons): meilleur F1={best['f1']:.3f} ({seuils})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Simulation à événements discrets du plan de contrôle RPL
+Temporisateurs Trickle (RFC 6206) de chaque nœud, compteurs de suppression,
+réinitialisations sur changement de parent et DIS des nœuds détachés,
+ordonnancés dans un tas d'entiers (date, nœud, type)
+"""
+
+import argparse
+import heapq
+import random
+import time
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from firmware_emulator import read_firmware_defines
+from placement import SpatialHashGrid, generate_layout
+
+# Types d'événements, dans l'ordre de traitement à date égale
+EVENT_DIO, EVENT_END, EVENT_DIS, EVENT_RESET, EVENT_DETACH = range(5)
+_KIND_BITS = 3
+_NODE_BITS = 24
+_NODE_MASK = (1 << _NODE_BITS) - 1
+_KIND_MASK = (1 << _KIND_BITS) - 1
+
+# Date « aucun événement prévu » des temporisateurs (ms)
+_NEVER = -1
+
+
+class ControlPlane:
+    def __init__(self, positions: np.ndarray, sink, radio_range: float,
+                 config: Optional[Dict[str, float]] = None, random_seed: int = 12345):
+        """
+        Plan de contrôle d'un réseau statique de n nœuds et d'un sink (indice n)
+
+        Les paramètres Trickle sont ceux de project-conf.h :
+        Imin = 2^RPL_CONF_DEFAULT_DIO_INTERVAL_MIN ms, Imax = Imin ×
+        2^RPL_CONF_DEFAULT_DIO_INTERVAL_DOUBLINGS, k = RPL_CONF_DEFAULT_DIO_REDUNDANCY,
+        et un nœud sans parent émet un DIS toutes les RPL_CONF_DEFAULT_DIS_INTERVAL s.
+
+        Args:
+            positions: Positions (n, 2) des nœuds
+            sink: Position du sink
+            radio_range: Portée radio en mètres (voisins recevant les diffusions)
+            config: #define du firmware (lus dans les sources si None)
+            random_seed: Graine des tirages des instants d'émission
+        """
+        c = read_firmware_defines() if config is None else config
+        self.imin = int(2 ** c["RPL_CONF_DEFAULT_DIO_INTERVAL_MIN"])
+        self.imax = self.imin << int(c["RPL_CONF_DEFAULT_DIO_INTERVAL_DOUBLINGS"])
+        self.redundancy = int(c["RPL_CONF_DEFAULT_DIO_REDUNDANCY"])
+        self.dis_interval = int(c["RPL_CONF_DEFAULT_DIS_INTERVAL"] * 1000)
+        self.random_seed = random_seed
+
+        # Voisinages en format CSR (le sink en dernière ligne)
+        points = np.vstack([np.asarray(positions, dtype=np.float64).reshape(-1, 2), np.asarray(sink)])
+        if len(points) > _NODE_MASK:
+            raise ValueError(f"Au plus {_NODE_MASK} nœuds")
+        grid = SpatialHashGrid(points, radio_range)
+        lists = []
+        for i, point in enumerate(points):
+            found = grid.query_radius(point, radio_range)
+            lists.append(found[found != i])
+        self.num_nodes = len(points) - 1
+        self.sink_index = self.num_nodes
+        self.offsets = np.concatenate([[0], np.cumsum([len(f) for f in lists])]).tolist()
+        self.neighbors = np.concatenate(lists).astype(np.int32) if lists else np.empty(0, dtype=np.int32)
+        self.degree = np.diff(self.offsets)
+
+        # Nœuds atteignant le sink au départ : les autres émettent des DIS
+        reached = np.zeros(len(points), dtype=bool)
+        reached[self.sink_index] = True
+        frontier = [self.sink_index]
+        while frontier:
+            nxt = np.concatenate([self.neighbors[self.offsets[i]:self.offsets[i + 1]] for i in frontier])
+            nxt = np.unique(nxt[~reached[nxt]])
+            reached[nxt] = True
+            frontier = nxt.tolist()
+        self.initially_joined = reached
+
+    def run(self, duration: float, bin_size: float = 60.0, parent_changes: Optional[Sequence] = None,
+            detachments: Optional[Sequence] = None) -> Dict[str, np.ndarray]:
+        """
+        Rejoue le plan de contrôle pendant duration secondes
+
+        Chaque nœud rattaché tire l'instant d'émission de son DIO dans la
+        seconde moitié de son intervalle I ; l'émission est supprimée s'il a
+        déjà entendu k DIO cohérents, puis I double jusqu'à Imax. Un
+        changement de parent (incohérence) ou un DIS reçu ramène I à Imin.
+        Les événements périmés (temporisateur réarmé entre-temps) sont
+        ignorés au dépilement plutôt que retirés du tas.
+
+        Args:
+            duration: Durée simulée en secondes
+            bin_size: Largeur des intervalles des séries temporelles (s)
+            parent_changes: Couples (instant s, nœud) de changement de parent
+                            ou de rattachement
+            detachments: Couples (instant s, nœud) de perte du parent
+
+        Returns:
+            Séries par intervalle ("dio", "dis", "suppressed", "received",
+            "resets"), totaux par nœud ("dio_per_node", "dis_per_node",
+            "received_per_node", sink en dernier), "events" et "elapsed" (s)
+        """
+        started = time.perf_counter()
+        rng = random.Random(self.random_seed)
+        end = int(duration * 1000)
+        bin_ms = int(bin_size * 1000)
+        num_bins = max(1, -(-end // bin_ms))
+        count = self.num_nodes + 1
+        imin, imax, k = self.imin, self.imax, self.redundancy
+        offsets, neighbors = self.offsets, self.neighbors
+
+        dio_bins = [0] * num_bins
+        dis_bins = [0] * num_bins
+        suppressed_bins = [0] * num_bins
+        received_bins = [0] * num_bins
+        reset_bins = [0] * num_bins
+        dio_sent = [0] * count
+        dis_sent = [0] * count
+
+        interval = [imin] * count
+        fire_at = [_NEVER] * count
+        end_at = [_NEVER] * count
+        dis_at = [_NEVER] * count
+        joined = self.initially_joined.tolist()
+        counter = np.zeros(count, dtype=np.int64)
+
+        heap = []
+        shift_node = _KIND_BITS
+        shift_time = _KIND_BITS + _NODE_BITS
+
+        def start_interval(node, now):
+            size = interval[node]
+            counter[node] = 0
+            fire = now + (size >> 1) + int(rng.random() * (size - (size >> 1)))
+            fire_at[node] = fire
+            end_at[node] = now + size
+            heapq.heappush(heap, (fire << shift_time) | (node << shift_node) | EVENT_DIO)
+
+        def schedule_dis(node, now):
+            at = now + self.dis_interval
+            dis_at[node] = at
+            heapq.heappush(heap, (at << shift_time) | (node << shift_node) | EVENT_DIS)
+
+        def reset(node, now):
+            # RFC 6206 : sans effet si I vaut déjà Imin (nœud rattaché)
+            if interval[node] != imin:
+                interval[node] = imin
+                start_interval(node, now)
+
+        # État initial : tous les nœuds rattachés démarrent à Imin avec une
+        # phase aléatoire, les autres sollicitent un DIO
+        for node in range(count):
+            if joined[node]:
+                interval[node] = imin
+                start_interval(node, int(rng.random() * imin))
+            else:
+                schedule_dis(node, int(rng.random() * self.dis_interval) - self.dis_interval)
+
+        for kind, events in ((EVENT_RESET, parent_changes), (EVENT_DETACH, detachments)):
+            for at, node in (events if events is not None else ()):
+                heap.append((int(at * 1000) << shift_time) | (int(node) << shift_node) | kind)
+        heapq.heapify(heap)
+
+        processed = 0
+        degree = self.degree.tolist()
+        heappop, heapreplace = heapq.heappop, heapq.heapreplace
+        draw = rng.random
+        while heap:
+            # Le prochain événement reste en tête du tas : il est remplacé
+            # par son successeur (un seul tamisage) ou retiré s'il est périmé
+            event = heap[0]
+            now = event >> shift_time
+            if now >= end:
+                break
+            node = (event >> shift_node) & _NODE_MASK
+            kind = event & _KIND_MASK
+            processed += 1
+
+            if kind == EVENT_DIO:
+                if fire_at[node] != now:
+                    heappop(heap)
+                    continue
+                fire_at[node] = _NEVER
+                heapreplace(heap, (end_at[node] << shift_time) | (node << shift_node) | EVENT_END)
+                slot = now // bin_ms
+                if counter[node] < k:
+                    dio_bins[slot] += 1
+                    dio_sent[node] += 1
+                    received_bins[slot] += degree[node]
+                    counter[neighbors[offsets[node]:offsets[node + 1]]] += 1
+                else:
+                    suppressed_bins[slot] += 1
+            elif kind == EVENT_END:
+                if end_at[node] != now or fire_at[node] != _NEVER:
+                    heappop(heap)
+                    continue
+                # Nouvel intervalle, deux fois plus long (au plus Imax)
+                size = interval[node] << 1
+                if size > imax:
+                    size = imax
+                interval[node] = size
+                counter[node] = 0
+                half = size >> 1
+                fire = now + half + int(draw() * (size - half))
+                fire_at[node] = fire
+                end_at[node] = now + size
+                heapreplace(heap, (fire << shift_time) | (node << shift_node) | EVENT_DIO)
+            else:
+                heappop(heap)
+                slot = now // bin_ms
+                if kind == EVENT_DIS:
+                    if dis_at[node] != now or joined[node]:
+                        continue
+                    dis_bins[slot] += 1
+                    dis_sent[node] += 1
+                    receivers = neighbors[offsets[node]:offsets[node + 1]]
+                    received_bins[slot] += len(receivers)
+                    # DIS multicast : les voisins rattachés réinitialisent leur Trickle
+                    for other in receivers.tolist():
+                        if joined[other]:
+                            reset(other, now)
+                    schedule_dis(node, now)
+                elif kind == EVENT_RESET:
+                    reset_bins[slot] += 1
+                    if not joined[node]:
+                        # Rattachement : premier intervalle Trickle à Imin
+                        joined[node] = True
+                        dis_at[node] = _NEVER
+                        interval[node] = imin
+                        start_interval(node, now)
+                    else:
+                        reset(node, now)
+                else:  # EVENT_DETACH
+                    if node == self.sink_index or not joined[node]:
+                        continue
+                    reset_bins[slot] += 1
+                    joined[node] = False
+                    fire_at[node] = end_at[node] = _NEVER
+                    schedule_dis(node, now - self.dis_interval + int(draw() * self.dis_interval))
+
+        # Trames reçues par nœud : émissions de ses voisins (liens symétriques)
+        sent = np.array(dio_sent, dtype=np.int64) + np.array(dis_sent, dtype=np.int64)
+        heard = np.bincount(neighbors, weights=np.repeat(sent, self.degree), minlength=count).astype(np.int64)
+
+        return {
+            "dio": np.array(dio_bins, dtype=np.int64),
+            "dis": np.array(dis_bins, dtype=np.int64),
+            "suppressed": np.array(suppressed_bins, dtype=np.int64),
+            "received": np.array(received_bins, dtype=np.int64),
+            "resets": np.array(reset_bins, dtype=np.int64),
+            "dio_per_node": np.array(dio_sent, dtype=np.int64),
+            "dis_per_node": np.array(dis_sent, dtype=np.int64),
+            "received_per_node": heard,
+            "events": processed,
+            "elapsed": time.perf_counter() - started,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan de contrôle RPL (Trickle/DIO/DIS) à événements discrets")
+    parser.add_argument("-n", "--nodes", type=int, default=40,
+                       help="Nombre de nœuds (défaut: 40)")
+    parser.add_argument("-d", "--duration", type=int, default=86400,
+                       help="Durée simulée en secondes (défaut: 86400)")
+    parser.add_argument("-a", "--area", type=float, default=500.0,
+                       help="Côté de la zone de déploiement en mètres (défaut: 500)")
+    parser.add_argument("-r", "--range", type=float, default=150.0,
+                       help="Portée radio en mètres (défaut: 150)")
+    parser.add_argument("-s", "--seed", type=int, default=12345,
+                       help="Graine aléatoire (défaut: 12345)")
+    args = parser.parse_args()
+
+    sink = (50.0, 50.0)
+    positions = generate_layout(args.nodes, (args.area, args.area), sink, seed=args.seed)
+    plane = ControlPlane(positions, sink, args.range, random_seed=args.seed)
+    result = plane.run(args.duration)
+    print(f"{args.nodes} nœuds, degré moyen {plane.degree.mean():.1f}, {args.duration} s simulées")
+    print(f"DIO émis: {result['dio'].sum()}  supprimés: {result['suppressed'].sum()}  DIS: {result['dis'].sum()}")
+    print(f"{result['events']} événements en {result['elapsed']:.2f} s "
+          f"({result['events'] / max(result['elapsed'], 1e-9):,.0f} événements/s, "
+          f"{args.duration / max(result['elapsed'], 1e-9):,.0f} s simulées par seconde)")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,8 +20,8 @@ int trust_module_anomaly_detect(float rssi, int ack, float forwarding_ratio, flo
     int anomaly = 0;
     if (rssi < RSSI_THRESHOLD) anomaly = 1;
     if (!ack) anomaly = 1;
-    if (forwarding_ratio < 0.8f) anomaly = 1;
-    if (rank_consistency < 0.9f) anomaly = 1;
+    if (forwarding_ratio < FORWARDING_RATIO_THRESHOLD) anomaly = 1;
+    if (rank_consistency < RANK_CONSISTENCY_THRESHOLD) anomaly = 1;
     return anomaly;
 }
 